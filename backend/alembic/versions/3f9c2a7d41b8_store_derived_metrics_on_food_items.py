@@ -0,0 +1,63 @@
+"""Store derived efficiency metrics on food_items
+
+Revision ID: 3f9c2a7d41b8
+Revises: create_meal_plans_001
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41b8'
+down_revision: Union[str, None] = 'create_meal_plans_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate() -> str:
+    # SQLite can't ALTER TABLE ADD a STORED column (or drop one), so it has the table rebuilt
+    return 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # As app.models.food_item.infinity spells +Infinity for each backend
+    infinity = "9e999" if op.get_bind().dialect.name == 'sqlite' else "CAST('Infinity' AS DOUBLE PRECISION)"
+    # Stored generated columns are computed for existing rows when added,
+    # so no separate backfill step is needed.
+    with op.batch_alter_table('food_items', recreate=_recreate()) as batch_op:
+        batch_op.add_column(sa.Column(
+            'calories_per_dollar', sa.Float(),
+            sa.Computed('CASE WHEN (price > 0) THEN calories / price ELSE 0 END', persisted=True),
+        ))
+        batch_op.add_column(sa.Column(
+            'protein_per_dollar', sa.Float(),
+            sa.Computed('CASE WHEN (price > 0) THEN protein / price ELSE 0 END', persisted=True),
+        ))
+        batch_op.add_column(sa.Column(
+            'fiber_to_sugar_ratio', sa.Float(),
+            sa.Computed(
+                "CASE WHEN (fiber IS NULL OR sugar IS NULL) THEN NULL "
+                f"WHEN (sugar = 0) THEN CASE WHEN (fiber > 0) THEN {infinity} ELSE 0 END "
+                "ELSE fiber / sugar END",
+                persisted=True,
+            ),
+        ))
+    op.create_index(op.f('ix_food_items_calories_per_dollar'), 'food_items', ['calories_per_dollar'], unique=False)
+    op.create_index(op.f('ix_food_items_protein_per_dollar'), 'food_items', ['protein_per_dollar'], unique=False)
+    op.create_index(op.f('ix_food_items_fiber_to_sugar_ratio'), 'food_items', ['fiber_to_sugar_ratio'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_food_items_fiber_to_sugar_ratio'), table_name='food_items')
+    op.drop_index(op.f('ix_food_items_protein_per_dollar'), table_name='food_items')
+    op.drop_index(op.f('ix_food_items_calories_per_dollar'), table_name='food_items')
+    with op.batch_alter_table('food_items', recreate=_recreate()) as batch_op:
+        batch_op.drop_column('fiber_to_sugar_ratio')
+        batch_op.drop_column('protein_per_dollar')
+        batch_op.drop_column('calories_per_dollar')
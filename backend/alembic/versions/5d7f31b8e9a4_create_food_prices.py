@@ -0,0 +1,44 @@
+"""Create food_prices history table
+
+Revision ID: 5d7f31b8e9a4
+Revises: c52a9e6f1d03
+Create Date: 2026-10-17 15:48:12.306551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7f31b8e9a4'
+down_revision: Union[str, None] = 'c52a9e6f1d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'food_prices',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('food_item_id', sa.Integer(), nullable=False),
+        sa.Column('store', sa.String(), nullable=False),
+        sa.Column('effective_date', sa.Date(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('price_per_unit', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['food_item_id'], ['food_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'uq_food_prices_food_store_date', 'food_prices',
+        ['food_item_id', 'store', 'effective_date'], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_food_prices_food_store_date', table_name='food_prices')
+    op.drop_table('food_prices')
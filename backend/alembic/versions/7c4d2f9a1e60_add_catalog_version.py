@@ -0,0 +1,34 @@
+"""Add catalog_version counter
+
+Revision ID: 7c4d2f9a1e60
+Revises: e8a3c6d2b917
+Create Date: 2026-10-17 18:02:37.440918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c4d2f9a1e60'
+down_revision: Union[str, None] = 'e8a3c6d2b917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    catalog_version = op.create_table(
+        'catalog_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(catalog_version, [{'id': 1, 'version': 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('catalog_version')
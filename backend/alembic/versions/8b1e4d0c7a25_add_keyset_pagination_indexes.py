@@ -0,0 +1,58 @@
+"""Add keyset pagination indexes to food_items
+
+Revision ID: 8b1e4d0c7a25
+Revises: 3f9c2a7d41b8
+Create Date: 2026-10-17 11:03:27.540913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b1e4d0c7a25'
+down_revision: Union[str, None] = '3f9c2a7d41b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, columns); every sort key is paired with id as a tie-breaker
+KEYSET_INDEXES = [
+    ('ix_food_items_calories_id', ['calories', 'id']),
+    ('ix_food_items_protein_id', ['protein', 'id']),
+    ('ix_food_items_price_id', ['price', 'id']),
+    ('ix_food_items_calories_per_dollar_id', ['calories_per_dollar', 'id']),
+    ('ix_food_items_protein_per_dollar_id', ['protein_per_dollar', 'id']),
+    ('ix_food_items_fiber_to_sugar_ratio_id', ['fiber_to_sugar_ratio', 'id']),
+    ('ix_food_items_store_id', ['store', 'id']),
+    ('ix_food_items_store_protein_per_dollar_id', ['store', 'protein_per_dollar', 'id']),
+    ('ix_food_items_brand_id', ['brand', 'id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The single-column metric indexes are superseded by the (metric, id) ones
+    op.drop_index(op.f('ix_food_items_fiber_to_sugar_ratio'), table_name='food_items')
+    op.drop_index(op.f('ix_food_items_protein_per_dollar'), table_name='food_items')
+    op.drop_index(op.f('ix_food_items_calories_per_dollar'), table_name='food_items')
+    # Both expressions end in ELSE 0 so are never NULL anyway; SQLite can only
+    # change nullability by copying the table, which it refuses for generated columns
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('food_items', 'calories_per_dollar', existing_type=sa.Float(), nullable=False)
+        op.alter_column('food_items', 'protein_per_dollar', existing_type=sa.Float(), nullable=False)
+    for name, columns in KEYSET_INDEXES:
+        op.create_index(name, 'food_items', columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, _ in reversed(KEYSET_INDEXES):
+        op.drop_index(name, table_name='food_items')
+    if op.get_bind().dialect.name != 'sqlite':
+        op.alter_column('food_items', 'protein_per_dollar', existing_type=sa.Float(), nullable=True)
+        op.alter_column('food_items', 'calories_per_dollar', existing_type=sa.Float(), nullable=True)
+    op.create_index(op.f('ix_food_items_calories_per_dollar'), 'food_items', ['calories_per_dollar'], unique=False)
+    op.create_index(op.f('ix_food_items_protein_per_dollar'), 'food_items', ['protein_per_dollar'], unique=False)
+    op.create_index(op.f('ix_food_items_fiber_to_sugar_ratio'), 'food_items', ['fiber_to_sugar_ratio'], unique=False)
@@ -0,0 +1,61 @@
+"""Add food_group to food_items
+
+Revision ID: b3e9f1c4d7a2
+Revises: 7c4d2f9a1e60
+Create Date: 2026-10-17 19:12:05.830517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e9f1c4d7a2'
+down_revision: Union[str, None] = '7c4d2f9a1e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Existing rows have no FDC category, so they're grouped by name prefix,
+# as the chart used to do; a re-import fills in the rest from categories.
+NAME_PREFIXES = [
+    ('proteins', ['chicken', 'salmon', 'ground beef', 'pork', 'tuna', 'ribeye', 'steak', 'turkey',
+                  'lamb', 'duck', 'bison', 'egg,', 'eggs', 'egg white', 'beef', 'fish', 'shrimp']),
+    ('dairy', ['greek yogurt', 'yogurt', 'milk', 'cheese', 'cottage cheese', 'ice cream', 'butter,']),
+    ('legumes', ['black beans', 'chickpeas', 'lentils', 'beans', 'tofu', 'edamame']),
+    ('nuts', ['almond', 'peanut', 'chia', 'walnut', 'cashew', 'pecan', 'pistachio', 'seeds']),
+    ('grains', ['white rice', 'brown rice', 'rice', 'oatmeal', 'oats', 'bread', 'quinoa', 'pasta',
+                'cereal', 'granola', 'tortilla', 'couscous', 'barley']),
+    ('vegetables', ['broccoli', 'sweet potato', 'potato', 'spinach', 'carrot', 'bell pepper', 'avocado',
+                    'cauliflower', 'kale', 'corn', 'tomato', 'lettuce', 'onion', 'cucumber', 'zucchini']),
+    ('fruits', ['banana', 'apple', 'orange', 'blueberr', 'strawberr', 'raspberr', 'mango', 'grape',
+                'pineapple', 'watermelon', 'pear', 'peach', 'raisin', 'cherr', 'kiwi', 'lemon']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'food_items',
+        sa.Column('food_group', sa.String(), server_default='other', nullable=False),
+    )
+
+    food_items = sa.table('food_items', sa.column('name', sa.String()), sa.column('food_group', sa.String()))
+    name = sa.func.lower(food_items.c.name)
+    op.execute(
+        food_items.update().values(food_group=sa.case(
+            *[
+                (sa.or_(*[name.like(f'{prefix}%') for prefix in prefixes]), group)
+                for group, prefixes in NAME_PREFIXES
+            ],
+            else_='other',
+        ))
+    )
+    op.create_index('ix_food_items_food_group_id', 'food_items', ['food_group', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_food_items_food_group_id', table_name='food_items')
+    op.drop_column('food_items', 'food_group')
@@ -0,0 +1,41 @@
+"""Add (name, brand) natural key to food_items
+
+Revision ID: c52a9e6f1d03
+Revises: 8b1e4d0c7a25
+Create Date: 2026-10-17 13:26:05.874310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52a9e6f1d03'
+down_revision: Union[str, None] = '8b1e4d0c7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicates may be referenced by meal plans, so refuse to guess which to keep
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT name, coalesce(brand, ''), count(*) FROM food_items "
+        "GROUP BY name, coalesce(brand, '') HAVING count(*) > 1 LIMIT 20"
+    )).fetchall()
+    if duplicates:
+        listing = ", ".join(f"{name!r}/{brand!r} x{count}" for name, brand, count in duplicates)
+        raise RuntimeError(f"Merge duplicate food items before upgrading: {listing}")
+
+    op.create_index(
+        'uq_food_items_name_brand', 'food_items',
+        ['name', sa.text("coalesce(brand, '')")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_food_items_name_brand', table_name='food_items')
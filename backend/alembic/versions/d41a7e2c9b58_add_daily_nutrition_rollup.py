@@ -0,0 +1,61 @@
+"""Add daily_nutrition rollup and meal_plans date index
+
+Revision ID: d41a7e2c9b58
+Revises: b3e9f1c4d7a2
+Create Date: 2026-10-17 19:48:22.613047
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a7e2c9b58'
+down_revision: Union[str, None] = 'b3e9f1c4d7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rollup column -> food_items column it sums, weighted by serving quantity
+ROLLUP_SUMS = [
+    ('calories', 'calories'),
+    ('protein', 'protein'),
+    ('carbohydrates', 'carbohydrates'),
+    ('fats', 'fats'),
+    ('fiber', 'fiber'),
+    ('sugar', 'sugar'),
+    ('cost', 'price_per_unit'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'daily_nutrition',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('meal_type', sa.String(), nullable=False),
+        sa.Column('foods', sa.Integer(), nullable=False),
+        *[sa.Column(name, sa.Float(), nullable=False) for name, _ in ROLLUP_SUMS],
+        sa.PrimaryKeyConstraint('day', 'meal_type')
+    )
+    op.create_index(op.f('ix_meal_plans_date'), 'meal_plans', ['date'], unique=False)
+
+    # Backfill from the existing meal plans
+    day = "date(p.date)" if op.get_bind().dialect.name == 'sqlite' else "CAST(p.date AS DATE)"
+    sums = ", ".join(f"SUM(COALESCE(f.quantity, 1.0) * COALESCE(i.{column}, 0))" for _, column in ROLLUP_SUMS)
+    op.execute(
+        f"INSERT INTO daily_nutrition (day, meal_type, foods, {', '.join(name for name, _ in ROLLUP_SUMS)}) "
+        f"SELECT {day}, COALESCE(f.meal_type, ''), COUNT(*), {sums} "
+        f"FROM meal_plans p "
+        f"JOIN meal_plan_foods f ON f.meal_plan_id = p.id "
+        f"JOIN food_items i ON i.id = f.food_item_id "
+        f"WHERE p.date IS NOT NULL "
+        f"GROUP BY {day}, COALESCE(f.meal_type, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_meal_plans_date'), table_name='meal_plans')
+    op.drop_table('daily_nutrition')
@@ -0,0 +1,38 @@
+"""Add trigram index on food_items name for search
+
+Revision ID: e8a3c6d2b917
+Revises: 5d7f31b8e9a4
+Create Date: 2026-10-17 16:40:51.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3c6d2b917'
+down_revision: Union[str, None] = '5d7f31b8e9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Other backends search with the in-process index instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_food_items_name_trgm', 'food_items',
+        [sa.text('lower(name) gin_trgm_ops')],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_food_items_name_trgm', table_name='food_items')
@@ -0,0 +1,39 @@
+"""Add meal_plan_foods primary key and foreign key indexes
+
+Revision ID: f6b2d8a4c1e9
+Revises: d41a7e2c9b58
+Create Date: 2026-10-17 21:12:40.318552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b2d8a4c1e9'
+down_revision: Union[str, None] = 'd41a7e2c9b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A surrogate key, as a plan may list the same food twice. PostgreSQL numbers
+    # the existing rows as the identity column is added; SQLite has the table
+    # rebuilt, keeping its ON DELETE CASCADE foreign keys, and numbers them by rowid.
+    with op.batch_alter_table('meal_plan_foods') as batch_op:
+        batch_op.add_column(sa.Column('id', sa.Integer(), sa.Identity(), nullable=False))
+        batch_op.create_primary_key('meal_plan_foods_pkey', ['id'])
+    op.create_index('ix_meal_plan_foods_meal_plan_id_meal_type', 'meal_plan_foods', ['meal_plan_id', 'meal_type'], unique=False)
+    op.create_index('ix_meal_plan_foods_food_item_id', 'meal_plan_foods', ['food_item_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_meal_plan_foods_food_item_id', table_name='meal_plan_foods')
+    op.drop_index('ix_meal_plan_foods_meal_plan_id_meal_type', table_name='meal_plan_foods')
+    with op.batch_alter_table('meal_plan_foods') as batch_op:
+        batch_op.drop_constraint('meal_plan_foods_pkey', type_='primary')
+        batch_op.drop_column('id')
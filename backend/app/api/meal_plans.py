@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
-from ..database import get_db
+from ..database import get_async_db, get_db
+from ..pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from ..models.meal_plan import MealPlan, meal_plan_foods
 from ..models.food_item import FoodItem
-from pydantic import BaseModel
-from typing import Optional, List
+from ..optimizer import NUTRIENTS, food_matrix, solve_basket
+from ..rollups import refresh_daily_nutrition
+from pydantic import BaseModel, Field
+from typing import Dict, Optional, List
 
 router = APIRouter()
 
@@ -43,47 +48,272 @@ class MealPlanResponse(BaseModel):
     total_fiber: float
     total_sugar: float
 
+class MealPlanOptimize(BaseModel):
+    """Targets for the whole basket; nutrient bounds are totals, not per 100g."""
+    min_calories: Optional[float] = None
+    max_calories: Optional[float] = None
+    min_protein: Optional[float] = None
+    max_protein: Optional[float] = None
+    min_carbohydrates: Optional[float] = None
+    max_carbohydrates: Optional[float] = None
+    min_fats: Optional[float] = None
+    max_fats: Optional[float] = None
+    min_fiber: Optional[float] = None
+    max_fiber: Optional[float] = None
+    min_sugar: Optional[float] = None
+    max_sugar: Optional[float] = None
+    budget: Optional[float] = Field(None, gt=0)
+    stores: Optional[List[str]] = None
+    max_grams_per_food: float = Field(500, gt=0)
+    # food id -> grams cap for that food; 0 leaves it out
+    food_caps: Dict[int, float] = {}
+    # Buy in whole multiples of this many grams (an integer program)
+    step_grams: Optional[float] = Field(None, gt=0)
+    meal_type: str = "Lunch"
+    # Save the basket as a meal plan with this name
+    save_as: Optional[str] = None
+
+class OptimizedFood(BaseModel):
+    food_id: int
+    name: str
+    grams: float
+    quantity: float  # in 100g servings, as stored on meal plans
+    meal_type: str
+    cost: float
+
+class MealPlanOptimizeResponse(BaseModel):
+    total_cost: float
+    totals: Dict[str, float]
+    foods: List[OptimizedFood]
+    meal_plan_id: Optional[int] = None
+
+# Nutrient columns summed into each plan's totals, weighted by serving quantity
+_PLAN_TOTALS = {
+    "total_calories": FoodItem.calories,
+    "total_protein": FoodItem.protein,
+    "total_carbs": FoodItem.carbohydrates,
+    "total_fats": FoodItem.fats,
+    "total_fiber": FoodItem.fiber,
+    "total_sugar": FoodItem.sugar,
+}
+
+def _serialize_meal_plans(db: Session, plans):
+    """Build responses for plans with two queries in total, however many plans there are."""
+    plan_ids = [plan.id for plan in plans]
+    if not plan_ids:
+        return []
+    quantity = func.coalesce(meal_plan_foods.c.quantity, 1.0)
+
+    food_rows = (
+        db.query(
+            meal_plan_foods.c.meal_plan_id,
+            FoodItem.id.label("food_id"),
+            FoodItem.name,
+            quantity.label("quantity"),
+            meal_plan_foods.c.meal_type,
+            FoodItem.calories,
+            FoodItem.protein,
+            FoodItem.carbohydrates,
+            FoodItem.fats,
+            FoodItem.fiber,
+            FoodItem.sugar,
+        )
+        .select_from(meal_plan_foods)
+        .join(FoodItem, FoodItem.id == meal_plan_foods.c.food_item_id)
+        .filter(meal_plan_foods.c.meal_plan_id.in_(plan_ids))
+        .all()
+    )
+    total_rows = (
+        db.query(
+            meal_plan_foods.c.meal_plan_id,
+            *[
+                func.sum(quantity * func.coalesce(column, 0)).label(name)
+                for name, column in _PLAN_TOTALS.items()
+            ],
+        )
+        .select_from(meal_plan_foods)
+        .join(FoodItem, FoodItem.id == meal_plan_foods.c.food_item_id)
+        .filter(meal_plan_foods.c.meal_plan_id.in_(plan_ids))
+        .group_by(meal_plan_foods.c.meal_plan_id)
+        .all()
+    )
+
+    foods_by_plan = {plan_id: [] for plan_id in plan_ids}
+    for row in food_rows:
+        food = row._asdict()
+        foods_by_plan[food.pop("meal_plan_id")].append(food)
+    totals_by_plan = {row.meal_plan_id: row._asdict() for row in total_rows}
+
+    responses = []
+    for plan in plans:
+        totals = totals_by_plan.get(plan.id, {})
+        response = {
+            "id": plan.id,
+            "name": plan.name,
+            "date": plan.date,
+            "foods": foods_by_plan[plan.id],
+        }
+        for name in _PLAN_TOTALS:
+            response[name] = totals.get(name) or 0
+        responses.append(response)
+    return responses
+
+def _check_foods_exist(db: Session, plans: List[MealPlanCreate]):
+    """Verify every referenced food in one query, reporting all missing ids together."""
+    food_ids = {food.food_id for plan in plans for food in plan.foods}
+    if not food_ids:
+        return
+    found = {row.id for row in db.query(FoodItem.id).filter(FoodItem.id.in_(food_ids))}
+    missing = sorted(food_ids - found)
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Food items not found: {', '.join(str(food_id) for food_id in missing)}",
+        )
+
+def _insert_meal_plans(db: Session, plans: List[MealPlanCreate]):
+    """Insert plans and their food rows, and refresh their days' rollups, without committing."""
+    db_meal_plans = [MealPlan(name=plan.name) for plan in plans]
+    db.add_all(db_meal_plans)
+    db.flush()  # Get the IDs without committing; batched into one INSERT where supported
+
+    # Add foods with quantities and meal types as a single executemany
+    rows = [
+        {
+            "meal_plan_id": db_meal_plan.id,
+            "food_item_id": food.food_id,
+            "quantity": food.quantity,
+            "meal_type": food.meal_type,
+        }
+        for db_meal_plan, plan in zip(db_meal_plans, plans)
+        for food in plan.foods
+    ]
+    if rows:
+        db.execute(meal_plan_foods.insert(), rows)
+    refresh_daily_nutrition(db, {plan.date.date() for plan in db_meal_plans if plan.date})
+    return db_meal_plans
+
+def _create_meal_plans(db: Session, plans: List[MealPlanCreate]):
+    _check_foods_exist(db, plans)
+    db_meal_plans = _insert_meal_plans(db, plans)
+    return _serialize_meal_plans(db, db_meal_plans)
+
 @router.post("/meal-plans/", response_model=MealPlanResponse)
-def create_meal_plan(meal_plan: MealPlanCreate, db: Session = Depends(get_db)):
-    db_meal_plan = MealPlan(name=meal_plan.name)
-    db.add(db_meal_plan)
-    db.flush()  # Get the ID without committing
-
-    # Add foods with quantities and meal types
-    for food_item in meal_plan.foods:
-        db_food = db.query(FoodItem).filter(FoodItem.id == food_item.food_id).first()
-        if not db_food:
-            raise HTTPException(status_code=404, detail=f"Food with id {food_item.food_id} not found")
-        
-        # Add to association table with quantity and meal type
-        stmt = meal_plan_foods.insert().values(
-            meal_plan_id=db_meal_plan.id,
-            food_item_id=db_food.id,
-            quantity=food_item.quantity,
-            meal_type=food_item.meal_type
+async def create_meal_plan(meal_plan: MealPlanCreate, db: AsyncSession = Depends(get_async_db)):
+    response = (await db.run_sync(_create_meal_plans, [meal_plan]))[0]
+    await db.commit()
+    return response
+
+@router.post("/meal-plans/bulk", response_model=List[MealPlanResponse])
+async def create_meal_plans(meal_plans: List[MealPlanCreate], db: AsyncSession = Depends(get_async_db)):
+    """Create many meal plans in one transaction; nothing is saved if any food is missing."""
+    response = await db.run_sync(_create_meal_plans, meal_plans)
+    await db.commit()
+    return response
+
+@router.post("/meal-plans/optimize", response_model=MealPlanOptimizeResponse)
+def optimize_meal_plan(request: MealPlanOptimize, db: Session = Depends(get_db)):
+    """Find the cheapest basket of foods that meets the nutrient targets.
+
+    Sync on the threadpool, since the solve is CPU-bound.
+    """
+    bounds = {
+        name: (getattr(request, f"min_{name}"), getattr(request, f"max_{name}"))
+        for name in NUTRIENTS
+    }
+    food_caps = dict(request.food_caps or {})
+    while True:
+        basket = solve_basket(
+            food_matrix(db), bounds,
+            budget=request.budget,
+            stores=request.stores,
+            max_grams=request.max_grams_per_food,
+            food_caps=food_caps,
+            step_grams=request.step_grams,
         )
-        db.execute(stmt)
+        if basket is None:
+            raise HTTPException(status_code=422, detail="No combination of foods meets these targets")
 
-    db.commit()
-    db.refresh(db_meal_plan)
-    return db_meal_plan
+        foods = {
+            food.id: food
+            for food in db.query(FoodItem).filter(FoodItem.id.in_([food_id for food_id, _ in basket]))
+        }
+        # A food deleted since the matrix was built is excluded and the basket solved again
+        missing = [food_id for food_id, _ in basket if food_id not in foods]
+        if not missing:
+            break
+        food_caps.update((food_id, 0) for food_id in missing)
+    picked = [
+        OptimizedFood(
+            food_id=food_id,
+            name=foods[food_id].name,
+            grams=round(grams, 1),
+            quantity=grams / 100,
+            meal_type=request.meal_type,
+            cost=foods[food_id].price_per_unit * grams / 100,
+        )
+        for food_id, grams in basket
+    ]
+    totals = {
+        name: sum((getattr(foods[food.food_id], name) or 0) * food.quantity for food in picked)
+        for name in NUTRIENTS
+    }
+    response = MealPlanOptimizeResponse(
+        total_cost=sum(food.cost for food in picked),
+        totals=totals,
+        foods=sorted(picked, key=lambda food: -food.cost),
+    )
+
+    if request.save_as:
+        plan = MealPlanCreate(
+            name=request.save_as,
+            foods=[MealFoodCreate(**food.dict()) for food in picked],
+        )
+        response.meal_plan_id = _insert_meal_plans(db, [plan])[0].id
+        db.commit()
+    return response
 
 @router.get("/meal-plans/", response_model=List[MealPlanResponse])
-def get_meal_plans(db: Session = Depends(get_db)):
-    return db.query(MealPlan).all()
+async def get_meal_plans(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List meal plans in id order, a page at a time.
+
+    The next page's cursor is returned in the X-Next-Cursor header.
+    """
+    query = select(MealPlan)
+    if cursor is not None:
+        position = decode_cursor(cursor)
+        if not isinstance(position.get("id"), int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(MealPlan.id > position["id"])
+
+    plans = (await db.scalars(query.order_by(MealPlan.id).limit(limit + 1))).all()
+    if len(plans) > limit:
+        plans = plans[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": plans[-1].id})
+    return await db.run_sync(_serialize_meal_plans, plans)
 
 @router.get("/meal-plans/{meal_plan_id}", response_model=MealPlanResponse)
-def get_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
-    meal_plan = db.query(MealPlan).filter(MealPlan.id == meal_plan_id).first()
+async def get_meal_plan(meal_plan_id: int, db: AsyncSession = Depends(get_async_db)):
+    meal_plan = await db.get(MealPlan, meal_plan_id)
     if not meal_plan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
-    return meal_plan
+    return (await db.run_sync(_serialize_meal_plans, [meal_plan]))[0]
 
 @router.delete("/meal-plans/{meal_plan_id}")
-def delete_meal_plan(meal_plan_id: int, db: Session = Depends(get_db)):
-    meal_plan = db.query(MealPlan).filter(MealPlan.id == meal_plan_id).first()
-    if not meal_plan:
+async def delete_meal_plan(meal_plan_id: int, db: AsyncSession = Depends(get_async_db)):
+    # One statement; the plan's food rows go with it through ON DELETE CASCADE
+    deleted = await db.execute(
+        delete(MealPlan).where(MealPlan.id == meal_plan_id).returning(MealPlan.date)
+    )
+    row = deleted.first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Meal plan not found")
-    db.delete(meal_plan)
-    db.commit()
+    if row.date:
+        await db.run_sync(refresh_daily_nutrition, [row.date.date()])
+    await db.commit()
     return {"message": "Meal plan deleted"} 
\ No newline at end of file
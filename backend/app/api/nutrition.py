@@ -0,0 +1,74 @@
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_async_db
+from ..models.daily_nutrition import DailyNutrition
+
+router = APIRouter()
+
+# Longest range one request may cover
+MAX_DAYS = 366 * 5
+DEFAULT_DAYS = 30
+
+_TOTALS = ("calories", "protein", "carbohydrates", "fats", "fiber", "sugar", "cost")
+
+class MealNutrition(BaseModel):
+    meal_type: str
+    foods: int
+    calories: float
+    protein: float
+    carbohydrates: float
+    fats: float
+    fiber: float
+    sugar: float
+    cost: float
+
+class DayNutrition(BaseModel):
+    date: date
+    calories: float
+    protein: float
+    carbohydrates: float
+    fats: float
+    fiber: float
+    sugar: float
+    cost: float
+    meals: List[MealNutrition]
+
+@router.get("/nutrition/daily", response_model=List[DayNutrition])
+async def get_daily_nutrition(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Quantity-weighted intake and cost per day, with a breakdown by meal type.
+
+    Both bounds are inclusive; `to` defaults to today and `from` to 30 days
+    before it. Read from the daily_nutrition rollup in one range scan, so
+    days without meal plans are left out.
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=DEFAULT_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (end - start).days >= MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Request at most {MAX_DAYS} days at a time")
+
+    rows = (await db.scalars(
+        select(DailyNutrition)
+        .where(DailyNutrition.day.between(start, end))
+        .order_by(DailyNutrition.day, DailyNutrition.meal_type)
+    )).all()
+
+    days = {}
+    for row in rows:
+        day = days.setdefault(row.day, {"date": row.day, "meals": [], **{name: 0.0 for name in _TOTALS}})
+        meal = {"meal_type": row.meal_type, "foods": row.foods, **{name: getattr(row, name) for name in _TOTALS}}
+        day["meals"].append(meal)
+        for name in _TOTALS:
+            day[name] += meal[name]
+    return list(days.values())
@@ -0,0 +1,130 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from .models.catalog_version import CatalogVersion
+
+# In-process cache for values derived from the whole food catalog
+# (analytics aggregates and the like). Entries are dropped whenever a
+# food item is created, updated or deleted.
+_catalog_cache = {}
+_catalog_generation = 0
+_catalog_lock = threading.Lock()
+
+# Serialized GET responses, least recently used evicted first
+RESPONSE_CACHE_SIZE = int(os.getenv("CATALOG_RESPONSE_CACHE_SIZE", "512"))
+_responses = OrderedDict()
+
+# Catalog version this process's caches reflect, and what to reset when
+# another process (a script, another worker) moves it on
+_seen_version = None
+_external_change_listeners = []
+
+
+def get_or_compute(key, compute, db: Optional[Session] = None):
+    """Return the cached value for key, computing and storing it on a miss.
+
+    With db the catalog version is read first, so a change made by another
+    process is noticed on paths that never go through a cached response.
+    """
+    if db is not None:
+        catalog_version(db)
+    with _catalog_lock:
+        if key in _catalog_cache:
+            return _catalog_cache[key]
+        generation = _catalog_generation
+    value = compute()
+    with _catalog_lock:
+        # Don't store a value computed before a concurrent invalidation
+        if generation == _catalog_generation:
+            _catalog_cache[key] = value
+    return value
+
+
+def invalidate_catalog_cache():
+    """Drop every cached catalog-derived value."""
+    global _catalog_generation
+    with _catalog_lock:
+        _catalog_generation += 1
+        _catalog_cache.clear()
+        _responses.clear()
+
+
+def on_external_catalog_change(listener):
+    """Call listener when the catalog changed outside this process's write routes."""
+    _external_change_listeners.append(listener)
+
+
+def _external_change():
+    invalidate_catalog_cache()
+    for listener in _external_change_listeners:
+        listener()
+
+
+def catalog_version(db: Session) -> int:
+    """Current catalog version; drops stale in-process state if it moved elsewhere."""
+    global _seen_version
+    version = db.execute(select(CatalogVersion.version).where(CatalogVersion.id == 1)).scalar() or 0
+    with _catalog_lock:
+        changed = _seen_version is not None and version != _seen_version
+        _seen_version = version
+    if changed:
+        _external_change()
+    return version
+
+
+def bump_catalog_version(db: Session) -> int:
+    """Increment the version inside the caller's transaction and return the new value."""
+    version = db.execute(
+        update(CatalogVersion.__table__)
+        .where(CatalogVersion.id == 1)
+        .values(version=CatalogVersion.version + 1)
+        .returning(CatalogVersion.version)
+    ).scalar()
+    if version is None:
+        db.add(CatalogVersion(id=1, version=1))
+        db.flush()
+        version = 1
+    return version
+
+
+def catalog_changed(version: int):
+    """Record a committed write from this process that produced `version`.
+
+    Catalog-derived values are dropped as usual; if some other writer got
+    in between, everything (including incrementally maintained indexes)
+    is reset too.
+    """
+    global _seen_version
+    with _catalog_lock:
+        skipped = _seen_version is not None and version != _seen_version + 1
+        _seen_version = version
+    if skipped:
+        _external_change()
+    else:
+        invalidate_catalog_cache()
+
+
+def cached_response(key, version):
+    """(value, generation) for key at this catalog version.
+
+    On a miss value is None; pass generation to store_response with the
+    rendered value, so a render that raced an invalidation isn't kept.
+    """
+    with _catalog_lock:
+        if (version, key) in _responses:
+            _responses.move_to_end((version, key))
+            return _responses[(version, key)], None
+        return None, _catalog_generation
+
+
+def store_response(key, version, generation, value):
+    with _catalog_lock:
+        if generation == _catalog_generation:
+            _responses[(version, key)] = value
+            while len(_responses) > RESPONSE_CACHE_SIZE:
+                _responses.popitem(last=False)
@@ -0,0 +1,50 @@
+import re
+from typing import Optional
+
+# Groups shown by the charts, in display order; foods matching none are "other"
+FOOD_GROUPS = ("proteins", "dairy", "grains", "vegetables", "fruits", "legumes", "nuts", "other")
+DEFAULT_GROUP = "other"
+
+# Checked in order against FDC category descriptions: SR Legacy/Foundation
+# food categories ("Poultry Products"), WWEIA categories of survey foods
+# ("Yogurt, Greek") and branded food categories ("Nut & Seed Butters").
+_CATEGORY_RULES = [
+    ("legumes", r"\blegume|\bbeans?\b|\btofu\b|\bsoy\b|\blentil|\bhummus"),
+    ("nuts", r"\bnuts?\b|\bseeds?\b|peanut"),
+    ("dairy", r"\bdairy|\bmilk|\bcheese|\byogurt|\bcream\b"),
+    ("proteins", r"\bpoultry|\bchicken|\bturkey|\bbeef|\bpork|\blamb|\bveal|\bgame\b|\bsausage|"
+                 r"\bluncheon|\bmeats?\b|\bfish|\bshellfish|\bseafood|\beggs?\b"),
+    ("fruits", r"\bfruit|\bberr"),
+    ("vegetables", r"\bvegetable|\bpotato|\bsalad|\bgreens\b"),
+    ("grains", r"\bcereal|\bgrain|\bpasta|\bbread|\bbaked|\brice\b|\boat|\bcrackers?\b|\btortilla"),
+]
+
+# Name prefixes for foods without a category (manual entries, old rows)
+_NAME_RULES = [
+    ("proteins", ["chicken", "salmon", "ground beef", "pork", "tuna", "ribeye", "steak", "turkey",
+                  "lamb", "duck", "bison", "egg,", "eggs", "egg white", "beef", "fish", "shrimp"]),
+    ("dairy", ["greek yogurt", "yogurt", "milk", "cheese", "cottage cheese", "ice cream", "butter,"]),
+    ("legumes", ["black beans", "chickpeas", "lentils", "beans", "tofu", "edamame"]),
+    ("nuts", ["almond", "peanut", "chia", "walnut", "cashew", "pecan", "pistachio", "seeds"]),
+    ("grains", ["white rice", "brown rice", "rice", "oatmeal", "oats", "bread", "quinoa", "pasta",
+                "cereal", "granola", "tortilla", "couscous", "barley"]),
+    ("vegetables", ["broccoli", "sweet potato", "potato", "spinach", "carrot", "bell pepper", "avocado",
+                    "cauliflower", "kale", "corn", "tomato", "lettuce", "onion", "cucumber", "zucchini"]),
+    ("fruits", ["banana", "apple", "orange", "blueberr", "strawberr", "raspberr", "mango", "grape",
+                "pineapple", "watermelon", "pear", "peach", "raisin", "cherr", "kiwi", "lemon"]),
+]
+
+_CATEGORY_PATTERNS = [(group, re.compile(pattern, re.IGNORECASE)) for group, pattern in _CATEGORY_RULES]
+
+
+def classify_food(name: str, category: Optional[str] = None) -> str:
+    """Food group for a food, from its FDC category when known, else its name."""
+    if category:
+        for group, pattern in _CATEGORY_PATTERNS:
+            if pattern.search(category):
+                return group
+    lowered = (name or "").lower()
+    for group, prefixes in _NAME_RULES:
+        if lowered.startswith(tuple(prefixes)):
+            return group
+    return DEFAULT_GROUP
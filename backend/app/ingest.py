@@ -0,0 +1,259 @@
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .cache import bump_catalog_version, catalog_changed
+from .food_groups import DEFAULT_GROUP, classify_food
+from .models.food_item import FoodItem, NATURAL_KEY
+from .rollups import plan_days_with_foods, refresh_daily_nutrition
+from .schemas.food_item import FoodItemCreate
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+# Columns written by an upsert, in COPY order
+FOOD_COLUMNS = list(FoodItemCreate.model_fields) + ["price_per_unit"]
+# Columns refreshed when an incoming row matches an existing (name, brand)
+UPDATE_COLUMNS = [column for column in FOOD_COLUMNS if column not in ("name", "brand")]
+# ...for a row that gives no food_group; like PUT, that keeps the stored group
+UPDATE_COLUMNS_KEEP_GROUP = [column for column in UPDATE_COLUMNS if column != "food_group"]
+# Nutrients an import may fill in on an existing food when they're null or zero
+FILLABLE_NUTRIENTS = ["calories", "protein", "carbohydrates", "fats", "fiber", "sugar"]
+
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, decoded object) for each non-blank line."""
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, dict) for each data row; empty cells become None."""
+    reader = csv.DictReader(lines)
+    for number, row in enumerate(reader, start=1):
+        yield number, {
+            key: (value if value != "" else None)
+            for key, value in row.items()
+            if key is not None
+        }
+
+
+class ErrorReport:
+    """Per-row errors of an ingest; keeps the first few and counts the rest."""
+
+    def __init__(self, limit: int = MAX_REPORTED_ERRORS):
+        self.limit = limit
+        self.count = 0
+        self.rows: List[dict] = []
+
+    def add(self, number: int, messages: List[str]):
+        self.count += 1
+        if len(self.rows) < self.limit:
+            self.rows.append({"row": number, "errors": messages})
+
+
+def validate_rows(parsed: Iterable[Tuple[int, object]], errors: ErrorReport) -> Iterator[Tuple[int, dict]]:
+    """Validate parsed rows against FoodItemCreate, recording failures in errors."""
+    for number, row in parsed:
+        if isinstance(row, Exception):
+            errors.add(number, [str(row)])
+            continue
+        if not isinstance(row, dict):
+            errors.add(number, ["Expected an object"])
+            continue
+        try:
+            food_item = FoodItemCreate(**row)
+        except ValidationError as e:
+            errors.add(number, [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ])
+            continue
+        values = food_item.dict()
+        values["price_per_unit"] = (values["price"] / values["serving_size"]) * 100
+        yield number, values
+
+
+def chunked(rows: Iterable, size: int = CHUNK_SIZE) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _dedupe(rows: List[dict]) -> List[dict]:
+    """Keep the last row for each natural key; one upsert can't touch a row twice."""
+    by_key: Dict[tuple, dict] = {}
+    for row in rows:
+        by_key[(row["name"], row["brand"] or "")] = row
+    return list(by_key.values())
+
+
+def _upsert_copy(db: Session, rows: List[dict], update_columns: List[str]):
+    """PostgreSQL fast path: COPY into a temp table, then one INSERT ... ON CONFLICT."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(["" if row[column] is None else row[column] for column in FOOD_COLUMNS])
+    buffer.seek(0)
+
+    columns = ", ".join(FOOD_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in update_columns)
+    cursor = db.connection().connection.cursor()
+    try:
+        # Plain columns only: no id default to burn sequence values, no constraints
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS food_items_staging ON COMMIT DELETE ROWS "
+            f"AS SELECT {columns} FROM food_items WITH NO DATA"
+        )
+        # Emptied on commit, but one transaction may stage more than one batch
+        cursor.execute("TRUNCATE food_items_staging")
+        cursor.copy_expert(
+            f"COPY food_items_staging ({columns}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+        cursor.execute(
+            f"INSERT INTO food_items ({columns}) "
+            f"SELECT {columns} FROM food_items_staging "
+            f"ON CONFLICT (name, coalesce(brand, '')) "
+            f"DO UPDATE SET {updates}, updated_at = now()"
+        )
+    finally:
+        cursor.close()
+
+
+def _upsert_statements(db: Session, rows: List[dict], update_columns: List[str]):
+    """Portable path: batched INSERT ... ON CONFLICT DO UPDATE via executemany."""
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(FoodItem.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=NATURAL_KEY,
+        set_={
+            **{column: stmt.excluded[column] for column in update_columns},
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(stmt, rows)
+
+
+def upsert_food_rows(db: Session, rows: List[dict]):
+    """Insert or update validated food rows by (name, brand) without committing.
+
+    A row without a food_group inserts the group guessed from its name but
+    leaves an existing food's group alone. The daily_nutrition rollup of
+    days planning any updated food is refreshed in the same transaction.
+    """
+    rows = _dedupe(rows)
+    if not rows:
+        return
+    upsert = _upsert_copy if db.get_bind().dialect.driver == "psycopg2" else _upsert_statements
+    grouped = [row for row in rows if row.get("food_group") is not None]
+    guessed = [
+        {**row, "food_group": classify_food(row["name"])}
+        for row in rows if row.get("food_group") is None
+    ]
+    if grouped:
+        upsert(db, grouped, UPDATE_COLUMNS)
+    if guessed:
+        upsert(db, guessed, UPDATE_COLUMNS_KEEP_GROUP)
+    # Matching by name alone may refresh a few extra days, never too few
+    names = select(FoodItem.id).where(FoodItem.name.in_({row["name"] for row in rows}))
+    refresh_daily_nutrition(db, plan_days_with_foods(db, names))
+
+
+def fill_food_rows(db: Session, rows: List[dict]) -> int:
+    """Insert new foods and fill null or zero nutrients on existing ones, without committing.
+
+    An existing food still in the default group takes the incoming row's
+    group. Existing values that are already set are never overwritten, and rows
+    with nothing to fill aren't rewritten. The daily_nutrition rollup follows
+    in the same transaction. Returns the number of foods inserted or filled.
+    """
+    rows = _dedupe(rows)
+    if not rows:
+        return 0
+    table = FoodItem.__table__
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(table)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=NATURAL_KEY,
+        set_={
+            **{
+                column: func.coalesce(
+                    func.nullif(table.c[column], 0), func.nullif(excluded[column], 0), table.c[column]
+                )
+                for column in FILLABLE_NUTRIENTS
+            },
+            "food_group": case(
+                (table.c.food_group == DEFAULT_GROUP, excluded.food_group), else_=table.c.food_group
+            ),
+            "updated_at": func.now(),
+        },
+        where=or_(
+            *[
+                and_(func.coalesce(table.c[column], 0) == 0, excluded[column] > 0)
+                for column in FILLABLE_NUTRIENTS
+            ],
+            and_(table.c.food_group == DEFAULT_GROUP, excluded.food_group != DEFAULT_GROUP),
+        ),
+    ).returning(table.c.id)
+    ids = db.execute(stmt, rows).scalars().all()
+    # Filled-in nutrients move the rollup of days already planning those foods
+    if ids:
+        refresh_daily_nutrition(db, plan_days_with_foods(db, ids))
+    return len(ids)
+
+
+def ingest_rows(db: Session, rows: Iterable[Tuple[int, dict]], errors: ErrorReport) -> int:
+    """Upsert validated rows chunk by chunk, committing each chunk.
+
+    Every commit bumps the catalog version and is recorded with
+    catalog_changed, as the write routes do. A chunk the database rejects
+    is retried row by row, so one bad row only costs itself. Returns the
+    number of rows written.
+    """
+    # The COPY path talks to the driver directly, so catch its errors too
+    database_errors = (SQLAlchemyError, db.get_bind().dialect.loaded_dbapi.Error)
+    written = 0
+    for chunk in chunked(rows):
+        # A food repeated within a chunk is written, and counted, once: its last row
+        chunk = list({
+            (values["name"], values["brand"] or ""): (number, values) for number, values in chunk
+        }.values())
+        try:
+            upsert_food_rows(db, [values for _, values in chunk])
+            version = bump_catalog_version(db)
+            db.commit()
+            catalog_changed(version)
+            written += len(chunk)
+            continue
+        except database_errors:
+            db.rollback()
+        for number, values in chunk:
+            try:
+                upsert_food_rows(db, [values])
+                version = bump_catalog_version(db)
+                db.commit()
+                catalog_changed(version)
+                written += 1
+            except database_errors as e:
+                db.rollback()
+                errors.add(number, [str(getattr(e, "orig", None) or e)])
+    return written
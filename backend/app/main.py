@@ -1,9 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .api import food_items, meal_plans
-from .database import engine, Base
+from .api import meal_plans, nutrition
+from .routes import food_items
+from .database import async_engine, engine
+from .startup import lifespan
+from .telemetry import METRICS_ENABLED, RequestMetricsMiddleware, instrument_engine, render_metrics
+from .models import catalog_version, daily_nutrition, food_price  # noqa: F401 -- registers the tables for create_all
 
-app = FastAPI()
+# The schema check and any prewarming happen in lifespan, not at import
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,15 +18,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Request latency and SQL accounting; added last so it also times CORS handling
+if METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine)
+    app.add_middleware(RequestMetricsMiddleware)
 
 # Include routers
 app.include_router(food_items.router)
 app.include_router(meal_plans.router)
+app.include_router(nutrition.router)
 
 @app.get("/")
 async def root():
-    return {"message": "Nutrition Tracker API"} 
\ No newline at end of file
+    return {"message": "Nutrition Tracker API"} 
+
+@app.get("/ready", include_in_schema=False)
+async def ready():
+    """503 until the database is reachable, the schema checked and prewarming done."""
+    readiness = getattr(app.state, "readiness", {"database": "pending", "schema": "pending"})
+    is_ready = getattr(app.state, "ready", False)
+    return JSONResponse(
+        {"status": "ready" if is_ready else "starting", **readiness},
+        status_code=200 if is_ready else 503,
+    )
+
+if METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, BigInteger
+from ..database import Base
+
+class CatalogVersion(Base):
+    """Single-row counter bumped in the same transaction as every food catalog write."""
+    __tablename__ = "catalog_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Date, Float, Integer, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from ..database import Base
+
+class day_of(FunctionElement):
+    """Calendar date of a timestamp, spelled the way each backend accepts it."""
+    type = Date()
+    inherit_cache = True
+
+@compiles(day_of)
+def _compile_day_of(element, compiler, **kw):
+    return f"CAST({compiler.process(element.clauses, **kw)} AS DATE)"
+
+@compiles(day_of, "sqlite")
+def _compile_day_of_sqlite(element, compiler, **kw):
+    # CAST(... AS DATE) has numeric affinity in SQLite and keeps only the year
+    return f"date({compiler.process(element.clauses, **kw)})"
+
+class DailyNutrition(Base):
+    """Quantity-weighted totals of every meal plan food, per day and meal type.
+
+    Maintained by app.rollups alongside meal plan writes; the primary key
+    doubles as the date index the range reads scan.
+    """
+    __tablename__ = "daily_nutrition"
+
+    day = Column(Date, primary_key=True)
+    meal_type = Column(String, primary_key=True)  # "" for foods without one
+    foods = Column(Integer, nullable=False, default=0)  # meal plan food rows counted
+    calories = Column(Float, nullable=False, default=0)
+    protein = Column(Float, nullable=False, default=0)
+    carbohydrates = Column(Float, nullable=False, default=0)
+    fats = Column(Float, nullable=False, default=0)
+    fiber = Column(Float, nullable=False, default=0)
+    sugar = Column(Float, nullable=False, default=0)
+    cost = Column(Float, nullable=False, default=0)  # from price_per_unit, per 100g serving
@@ -1,6 +1,21 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, func
+from sqlalchemy import Column, Integer, Float, String, DateTime, Computed, DDL, Index, case, event, func, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from ..database import Base
 
+class infinity(FunctionElement):
+    """Floating-point +Infinity literal, spelled the way each backend accepts it."""
+    type = Float()
+    inherit_cache = True
+
+@compiles(infinity)
+def _compile_infinity(element, compiler, **kw):
+    return "CAST('Infinity' AS DOUBLE PRECISION)"
+
+@compiles(infinity, "sqlite")
+def _compile_infinity_sqlite(element, compiler, **kw):
+    return "9e999"
+
 class FoodItem(Base):
     __tablename__ = "food_items"
 
@@ -21,26 +36,69 @@ class FoodItem(Base):
     price = Column(Float, nullable=False)
     price_per_unit = Column(Float, nullable=False)  # price per 100g
     store = Column(String, nullable=True)
+
+    # One of app.food_groups.FOOD_GROUPS, set from the FDC category on import
+    food_group = Column(String, nullable=False, default="other", server_default="other")
     
     # Metadata
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    @property
-    def calories_per_dollar(self):
-        """Calculate calories per dollar spent"""
-        return self.calories / self.price if self.price > 0 else 0
-
-    @property
-    def protein_per_dollar(self):
-        """Calculate protein per dollar spent"""
-        return self.protein / self.price if self.price > 0 else 0
-
-    @property
-    def fiber_to_sugar_ratio(self):
-        """Calculate fiber to sugar ratio"""
-        if self.fiber is None or self.sugar is None:
-            return None
-        if self.sugar == 0:
-            return float('inf') if self.fiber > 0 else 0
-        return self.fiber / self.sugar 
\ No newline at end of file
+    # Derived efficiency metrics, stored by the database so they can be indexed
+    calories_per_dollar = Column(
+        Float,
+        Computed(case((price > 0, calories / price), else_=0), persisted=True),
+        nullable=False,
+    )
+    protein_per_dollar = Column(
+        Float,
+        Computed(case((price > 0, protein / price), else_=0), persisted=True),
+        nullable=False,
+    )
+    fiber_to_sugar_ratio = Column(
+        Float,
+        Computed(
+            case(
+                (fiber.is_(None) | sugar.is_(None), None),
+                (sugar == 0, case((fiber > 0, infinity()), else_=0)),
+                else_=fiber / sugar,
+            ),
+            persisted=True,
+        ),
+    )
+
+    # (sort column, id) indexes back keyset pagination of the catalog
+    __table_args__ = (
+        Index("ix_food_items_calories_id", "calories", "id"),
+        Index("ix_food_items_protein_id", "protein", "id"),
+        Index("ix_food_items_price_id", "price", "id"),
+        Index("ix_food_items_calories_per_dollar_id", "calories_per_dollar", "id"),
+        Index("ix_food_items_protein_per_dollar_id", "protein_per_dollar", "id"),
+        Index("ix_food_items_fiber_to_sugar_ratio_id", "fiber_to_sugar_ratio", "id"),
+        Index("ix_food_items_store_id", "store", "id"),
+        Index("ix_food_items_store_protein_per_dollar_id", "store", "protein_per_dollar", "id"),
+        Index("ix_food_items_brand_id", "brand", "id"),
+        Index("ix_food_items_food_group_id", "food_group", "id"),
+        # Natural key used for upserts; a missing brand counts as the empty string
+        Index(
+            "uq_food_items_name_brand",
+            name, func.coalesce(brand, literal_column("''")),
+            unique=True,
+        ),
+        # Trigram index behind /food-items/search (LIKE '%q%' and word similarity)
+        Index(
+            "ix_food_items_name_trgm",
+            func.lower(name).label("lower_name"),
+            postgresql_using="gin",
+            postgresql_ops={"lower_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+event.listen(
+    FoodItem.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# Conflict target matching uq_food_items_name_brand
+NATURAL_KEY = [FoodItem.name, func.coalesce(FoodItem.brand, literal_column("''"))]
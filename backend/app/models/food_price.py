@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, Index, func
+from ..database import Base
+
+class FoodPrice(Base):
+    """One observed price of a food at a store, as of a date."""
+    __tablename__ = "food_prices"
+
+    id = Column(Integer, primary_key=True)
+    food_item_id = Column(Integer, ForeignKey("food_items.id", ondelete="CASCADE"), nullable=False)
+    store = Column(String, nullable=False)
+    effective_date = Column(Date, nullable=False)
+    price = Column(Float, nullable=False)
+    price_per_unit = Column(Float, nullable=False)  # price per 100g
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # A feed re-applied for the same day replaces that day's price
+        Index("uq_food_prices_food_store_date", "food_item_id", "store", "effective_date", unique=True),
+    )
@@ -1,16 +1,21 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Table, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Table, DateTime, Index
+from sqlalchemy.orm import backref, relationship
 from datetime import datetime
-from .database import Base
+from ..database import Base
 
-# Association table for meal plans and food items
+# Association table for meal plans and food items. A plan can list the same
+# food more than once (e.g. at breakfast and dinner), so it has a surrogate key
 meal_plan_foods = Table(
     'meal_plan_foods',
     Base.metadata,
-    Column('meal_plan_id', Integer, ForeignKey('meal_plans.id')),
-    Column('food_item_id', Integer, ForeignKey('food_items.id')),
+    Column('id', Integer, primary_key=True),
+    Column('meal_plan_id', Integer, ForeignKey('meal_plans.id', ondelete='CASCADE')),
+    Column('food_item_id', Integer, ForeignKey('food_items.id', ondelete='CASCADE')),
     Column('quantity', Float, default=1.0),  # quantity in servings
-    Column('meal_type', String)  # breakfast, lunch, dinner, snack
+    Column('meal_type', String),  # breakfast, lunch, dinner, snack
+    # Plan reads filter by plan (and meal); food deletes cascade through food_item_id
+    Index('ix_meal_plan_foods_meal_plan_id_meal_type', 'meal_plan_id', 'meal_type'),
+    Index('ix_meal_plan_foods_food_item_id', 'food_item_id'),
 )
 
 class MealPlan(Base):
@@ -18,29 +23,13 @@ class MealPlan(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
-    date = Column(DateTime, default=datetime.utcnow)
-    foods = relationship("FoodItem", secondary=meal_plan_foods, backref="meal_plans")
-
-    @property
-    def total_calories(self):
-        return sum(food.calories for food in self.foods)
-
-    @property
-    def total_protein(self):
-        return sum(food.protein for food in self.foods)
-
-    @property
-    def total_carbs(self):
-        return sum(food.carbohydrates for food in self.foods)
-
-    @property
-    def total_fats(self):
-        return sum(food.fats for food in self.foods)
-
-    @property
-    def total_fiber(self):
-        return sum(food.fiber for food in self.foods)
-
-    @property
-    def total_sugar(self):
-        return sum(food.sugar for food in self.foods) 
\ No newline at end of file
+    date = Column(DateTime, default=datetime.utcnow, index=True)
+    # Quantity-weighted nutrient totals are aggregated in SQL by the meal plan
+    # routes rather than by walking this relationship per plan. Deleting either
+    # side leaves the association rows to the database's ON DELETE CASCADE.
+    foods = relationship(
+        "FoodItem",
+        secondary=meal_plan_foods,
+        passive_deletes=True,
+        backref=backref("meal_plans", passive_deletes=True),
+    )
@@ -0,0 +1,132 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .cache import get_or_compute
+from .models.food_item import FoodItem
+
+# Nutrient columns of the matrix, per 100g
+NUTRIENTS = ("calories", "protein", "carbohydrates", "fats", "fiber", "sugar")
+# Whole-step (integer) solves consider at most this many foods and stop
+# after MIP_TIME_LIMIT seconds with the best basket found so far
+MIP_CANDIDATES = 200
+MIP_TIME_LIMIT = 0.5
+
+
+class FoodMatrix:
+    """The priced catalog as arrays: one row per food, quantities in 100g units."""
+
+    def __init__(self, rows):
+        self.ids = np.array([row.id for row in rows], dtype=np.int64)
+        stores = [row.store or "" for row in rows]
+        self.store_names, self.store_codes = np.unique(np.array(stores, dtype=object), return_inverse=True)
+        self.cost = np.array([row.price_per_unit for row in rows], dtype=np.float64)
+        # Unknown fiber/sugar count as zero
+        nutrients = [[getattr(row, name) for name in NUTRIENTS] for row in rows]
+        self.nutrients = np.nan_to_num(np.array(nutrients, dtype=np.float64).reshape(-1, len(NUTRIENTS)))
+
+
+def food_matrix(db: Session) -> FoodMatrix:
+    """The cached matrix; the catalog cache drops it whenever a food changes, here or elsewhere."""
+    columns = [getattr(FoodItem, name) for name in NUTRIENTS]
+    return get_or_compute("optimizer_matrix", lambda: FoodMatrix(
+        db.query(FoodItem.id, FoodItem.store, FoodItem.price_per_unit, *columns)
+        # Unpriced foods would look free to the solver
+        .filter(FoodItem.price_per_unit > 0)
+        .all()
+    ), db)
+
+
+def solve_basket(
+    matrix: FoodMatrix,
+    bounds: Dict[str, Tuple[Optional[float], Optional[float]]],
+    budget: Optional[float] = None,
+    stores: Optional[List[str]] = None,
+    max_grams: float = 500,
+    food_caps: Optional[Dict[int, float]] = None,
+    step_grams: Optional[float] = None,
+) -> Optional[List[Tuple[int, float]]]:
+    """Cheapest basket meeting the nutrient bounds, as (food id, grams) pairs.
+
+    bounds maps nutrient -> (min, max) for the whole basket. Each food is
+    capped at max_grams unless food_caps says otherwise (0 excludes it).
+    With step_grams every amount is a whole number of steps, which makes
+    it a mixed-integer program. Returns None when no basket qualifies.
+    """
+    # Imported here as scipy.optimize alone adds about half a second to every worker's boot
+    from scipy.optimize import linprog
+
+    caps = np.full(len(matrix.ids), max_grams, dtype=np.float64)
+    if stores is not None:
+        allowed = np.isin(matrix.store_names, stores)
+        caps[~allowed[matrix.store_codes]] = 0
+    if food_caps:
+        positions = {food_id: i for i, food_id in enumerate(matrix.ids.tolist())}
+        for food_id, grams in food_caps.items():
+            if food_id in positions:
+                caps[positions[food_id]] = grams
+
+    # Only foods that may appear become variables
+    usable = np.flatnonzero(caps > 0)
+    if len(usable) == 0:
+        return None
+    unit = (step_grams or 100) / 100  # 100g units per variable step
+    cost = matrix.cost[usable] * unit
+    nutrients = matrix.nutrients[usable] * unit
+    upper = caps[usable] / (step_grams or 100)
+    if step_grams:
+        upper = np.floor(upper)
+
+    rows, limits = [], []
+    for i, name in enumerate(NUTRIENTS):
+        low, high = bounds.get(name, (None, None))
+        if low is not None:
+            rows.append(-nutrients[:, i])
+            limits.append(-low)
+        if high is not None:
+            rows.append(nutrients[:, i])
+            limits.append(high)
+    if budget is not None:
+        rows.append(cost)
+        limits.append(budget)
+
+    A_ub = np.vstack(rows) if rows else np.zeros((0, len(usable)))
+    b_ub = np.array(limits, dtype=np.float64)
+    problem = dict(
+        A_ub=A_ub if rows else None,
+        b_ub=b_ub if rows else None,
+        bounds=np.column_stack((np.zeros(len(usable)), upper)),
+        method="highs",
+    )
+    result = linprog(cost, **problem)
+    if not result.success:
+        return None
+    amounts = result.x
+
+    if step_grams:
+        # Branch and bound only over the foods the relaxation rates best:
+        # the ones it picked plus the lowest reduced costs.
+        candidates = np.arange(len(usable))
+        if len(usable) > MIP_CANDIDATES:
+            reduced = cost - A_ub.T @ result.ineqlin.marginals if rows else cost
+            candidates = np.argsort(reduced)[:MIP_CANDIDATES]
+        result = linprog(
+            cost[candidates],
+            A_ub=A_ub[:, candidates] if rows else None,
+            b_ub=problem["b_ub"],
+            bounds=problem["bounds"][candidates],
+            integrality=np.ones(len(candidates)),
+            method="highs",
+            # Within 1% of the optimum is plenty for groceries
+            options={"mip_rel_gap": 0.01, "time_limit": MIP_TIME_LIMIT},
+        )
+        # Status 1 is the time limit, which may still leave a feasible basket
+        if result.x is None or result.status not in (0, 1):
+            return None
+        amounts = np.zeros(len(usable))
+        amounts[candidates] = result.x
+
+    grams = amounts * (step_grams or 100)
+    picked = np.flatnonzero(grams > 1e-6)
+    return [(int(matrix.ids[usable[i]]), float(grams[i])) for i in picked]
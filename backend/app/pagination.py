@@ -0,0 +1,61 @@
+import base64
+import json
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(payload: dict) -> str:
+    """Pack the position of the last row of a page into an opaque token."""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Reverse encode_cursor, rejecting anything that wasn't produced by it."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def keyset_order(column, id_column, descending=False):
+    """ORDER BY clause for a (column, id) keyset, with NULLs sorting as the largest value.
+
+    This matches PostgreSQL's default B-tree ordering, so a composite
+    (column, id) index can serve both directions.
+    """
+    if descending:
+        return [column.desc().nulls_first(), id_column.desc()]
+    return [column.asc().nulls_last(), id_column.asc()]
+
+
+def keyset_condition(column, id_column, value, last_id, descending=False, nullable=False):
+    """WHERE clause selecting the rows after (value, last_id) in keyset_order."""
+    if not nullable:
+        if descending:
+            return tuple_(column, id_column) < tuple_(value, last_id)
+        return tuple_(column, id_column) > tuple_(value, last_id)
+
+    if descending:
+        if value is None:
+            return or_(
+                and_(column.is_(None), id_column < last_id),
+                column.isnot(None),
+            )
+        return or_(
+            column < value,
+            and_(column == value, id_column < last_id),
+        )
+    if value is None:
+        return and_(column.is_(None), id_column > last_id)
+    return or_(
+        column > value,
+        and_(column == value, id_column > last_id),
+        column.is_(None),
+    )
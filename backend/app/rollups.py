@@ -0,0 +1,92 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from .models.daily_nutrition import DailyNutrition, day_of
+from .models.food_item import FoodItem
+from .models.meal_plan import MealPlan, meal_plan_foods
+
+# Rollup column -> per-100g value it sums, weighted by serving quantity
+_ROLLUP_SUMS = {
+    "calories": FoodItem.calories,
+    "protein": FoodItem.protein,
+    "carbohydrates": FoodItem.carbohydrates,
+    "fats": FoodItem.fats,
+    "fiber": FoodItem.fiber,
+    "sugar": FoodItem.sugar,
+    "cost": FoodItem.price_per_unit,
+}
+
+# Food fields a change to which moves the rollup (price_per_unit follows
+# price and serving_size)
+ROLLUP_FOOD_FIELDS = {
+    "calories", "protein", "carbohydrates", "fats", "fiber", "sugar", "price", "serving_size",
+}
+
+# Refreshing more days than this at once rebuilds the whole rollup instead
+REBUILD_DAYS = 366
+
+
+def _aggregate(*conditions):
+    """INSERT ... SELECT of the rollup rows for the meal plans matching conditions."""
+    day = day_of(MealPlan.date)
+    meal_type = func.coalesce(meal_plan_foods.c.meal_type, "")
+    quantity = func.coalesce(meal_plan_foods.c.quantity, 1.0)
+    rows = (
+        select(
+            day, meal_type, func.count(),
+            *[func.sum(quantity * func.coalesce(value, 0)) for value in _ROLLUP_SUMS.values()],
+        )
+        .select_from(MealPlan)
+        .join(meal_plan_foods, meal_plan_foods.c.meal_plan_id == MealPlan.id)
+        .join(FoodItem, FoodItem.id == meal_plan_foods.c.food_item_id)
+        .where(MealPlan.date.is_not(None), *conditions)
+        .group_by(day, meal_type)
+    )
+    columns = ["day", "meal_type", "foods", *_ROLLUP_SUMS]
+    return insert(DailyNutrition).from_select(columns, rows)
+
+
+def refresh_daily_nutrition(db: Session, days: Iterable[date]):
+    """Recompute the rollup rows of the given days, without committing.
+
+    Called in the same transaction as meal plan writes. Only those days'
+    plans are re-read (through ix_meal_plans_date), and recomputing rather
+    than adding deltas means a delete takes out exactly what the day now
+    lacks, even if a food's values changed since the plan was saved.
+    """
+    days = sorted(set(days))
+    if not days:
+        return
+    if len(days) > REBUILD_DAYS:
+        # A catalog-wide food change touches most days; one pass beats a huge OR of ranges
+        rebuild_daily_nutrition(db)
+        return
+    db.execute(delete(DailyNutrition).where(DailyNutrition.day.in_(days)))
+    starts = [datetime.combine(day, time.min) for day in days]
+    db.execute(_aggregate(or_(*[
+        (MealPlan.date >= start) & (MealPlan.date < start + timedelta(days=1))
+        for start in starts
+    ])))
+
+
+def plan_days_with_foods(db: Session, food_ids):
+    """Days of the meal plans listing any of the foods, to refresh after they change or go.
+
+    food_ids is a list of ids or a SELECT of them.
+    """
+    day = day_of(MealPlan.date)
+    return set(db.scalars(
+        select(day).distinct()
+        .select_from(meal_plan_foods)
+        .join(MealPlan, MealPlan.id == meal_plan_foods.c.meal_plan_id)
+        .where(meal_plan_foods.c.food_item_id.in_(food_ids), MealPlan.date.is_not(None))
+    ))
+
+
+def rebuild_daily_nutrition(db: Session):
+    """Replace the whole rollup from the meal plans, without committing."""
+    db.execute(delete(DailyNutrition))
+    db.execute(_aggregate())
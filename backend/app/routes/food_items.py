@@ -1,73 +1,793 @@
-from fastapi import APIRouter, Depends, HTTPException
+import gzip
+import hashlib
+import os
+
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, delete, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from typing import List, Optional
+from ..cache import (
+    bump_catalog_version, cached_response, catalog_changed, catalog_version,
+    get_or_compute, store_response,
+)
+from ..database import get_async_db, get_db
+from ..food_groups import FOOD_GROUPS, classify_food
+from ..ingest import ErrorReport, ingest_rows, parse_csv, parse_ndjson, validate_rows
+from ..rollups import ROLLUP_FOOD_FIELDS, plan_days_with_foods, refresh_daily_nutrition
+from ..pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_condition, keyset_order,
+)
 from ..models.food_item import FoodItem
-from ..schemas.food_item import FoodItemCreate, FoodItemUpdate, FoodItem as FoodItemSchema
+from ..search import index_name, reset_search_index, search_foods, unindex_name
+from ..similarity import index_food, reset_similarity_index, similarity_index, unindex_food
+from ..schemas.food_item import (
+    FoodItemCreate, FoodItemUpdate, FoodItemPatch, FoodItemBulkPatch, FoodItemBulkDelete,
+    FoodItem as FoodItemSchema, FoodMetrics, NutritionStats, BulkImportResult,
+    BulkUpdateResult, BulkDeleteResult, FoodGroupSummary,
+)
 
 router = APIRouter(
     prefix="/food-items",
     tags=["food-items"]
 )
 
+# Columns the list endpoint can sort by; prefix with "-" for descending order
+SORTABLE_COLUMNS = {
+    "id": FoodItem.id,
+    "name": FoodItem.name,
+    "serving_size": FoodItem.serving_size,
+    "calories": FoodItem.calories,
+    "protein": FoodItem.protein,
+    "carbohydrates": FoodItem.carbohydrates,
+    "fats": FoodItem.fats,
+    "fiber": FoodItem.fiber,
+    "sugar": FoodItem.sugar,
+    "price": FoodItem.price,
+    "price_per_unit": FoodItem.price_per_unit,
+    "calories_per_dollar": FoodItem.calories_per_dollar,
+    "protein_per_dollar": FoodItem.protein_per_dollar,
+    "fiber_to_sugar_ratio": FoodItem.fiber_to_sugar_ratio,
+}
+
+def parse_sort(sort: str):
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if field not in SORTABLE_COLUMNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by '{field}'. Choose one of: {', '.join(SORTABLE_COLUMNS)}",
+        )
+    return field, descending
+
+def food_item_filters(
+    store: Optional[str] = None,
+    brand: Optional[str] = None,
+    food_group: Optional[str] = None,
+    min_calories: Optional[float] = None,
+    max_calories: Optional[float] = None,
+    min_protein: Optional[float] = None,
+    max_protein: Optional[float] = None,
+    max_carbohydrates: Optional[float] = None,
+    max_fats: Optional[float] = None,
+    min_fiber: Optional[float] = None,
+    max_sugar: Optional[float] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_calories_per_dollar: Optional[float] = None,
+    min_protein_per_dollar: Optional[float] = None,
+):
+    """Turn the catalog filter query parameters into SQL conditions.
+
+    food_group takes a comma-separated list of groups.
+    """
+    conditions = []
+    if store is not None:
+        conditions.append(FoodItem.store == store)
+    if brand is not None:
+        conditions.append(FoodItem.brand == brand)
+    if food_group is not None:
+        groups = [group.strip() for group in food_group.split(",") if group.strip()]
+        unknown = [group for group in groups if group not in FOOD_GROUPS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown food groups: {', '.join(unknown)}. Choose from: {', '.join(FOOD_GROUPS)}",
+            )
+        conditions.append(FoodItem.food_group.in_(groups))
+    bounds = [
+        (FoodItem.calories, min_calories, max_calories),
+        (FoodItem.protein, min_protein, max_protein),
+        (FoodItem.carbohydrates, None, max_carbohydrates),
+        (FoodItem.fats, None, max_fats),
+        (FoodItem.fiber, min_fiber, None),
+        (FoodItem.sugar, None, max_sugar),
+        (FoodItem.price, min_price, max_price),
+        (FoodItem.calories_per_dollar, min_calories_per_dollar, None),
+        (FoodItem.protein_per_dollar, min_protein_per_dollar, None),
+    ]
+    for column, low, high in bounds:
+        if low is not None:
+            conditions.append(column >= low)
+        if high is not None:
+            conditions.append(column <= high)
+    return conditions
+
+# Cached responses at least this large are also kept gzipped for clients that accept it
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+
+def _with_gzip(rendered):
+    body, headers = rendered
+    return body, headers, gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+
+async def _catalog_response(request: Request, db: AsyncSession, fetch, render):
+    """Serve a catalog read from the response cache, or a 304 if the client's copy is current.
+
+    On a miss fetch(session) runs with a sync Session over the async
+    connection, then render(fetched) turns its result into (JSON bytes,
+    extra headers) on the threadpool, so serializing and compressing a
+    large page doesn't stall the event loop. The ETag is the catalog
+    version plus the request URL (and whether gzip is accepted, as that
+    changes the bytes), so it changes whenever any food does.
+    """
+    version = await db.run_sync(catalog_version)
+    key = f"{request.url.path}?{request.url.query}"
+    accepts_gzip = "gzip" in request.headers.get("accept-encoding", "")
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    etag = f'"{version}-{digest}{"-gzip" if accepts_gzip else ""}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    cached, generation = cached_response(key, version)
+    if cached is None:
+        fetched = await db.run_sync(fetch)
+        cached = await run_in_threadpool(lambda: _with_gzip(render(fetched)))
+        store_response(key, version, generation, cached)
+    body, extra_headers, gzipped = cached
+    if accepts_gzip and gzipped is not None:
+        body, headers["Content-Encoding"] = gzipped, "gzip"
+    return Response(body, media_type="application/json", headers={**extra_headers, **headers})
+
+_food_items_json = TypeAdapter(List[FoodItemSchema])
+
+# Fields available to ?format=columnar
+COLUMNAR_FIELDS = {name: FoodItem.__table__.c[name] for name in FoodItemSchema.model_fields}
+
+def parse_fields(fields: Optional[str]):
+    if not fields:
+        return list(COLUMNAR_FIELDS)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in COLUMNAR_FIELDS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Choose from: {', '.join(COLUMNAR_FIELDS)}",
+        )
+    return names
+
 @router.get("/", response_model=List[FoodItemSchema])
-def get_food_items(
+async def get_food_items(
+    request: Request,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    sort: str = "id",
+    format: str = Query("rows", pattern="^(rows|columnar)$"),
+    fields: Optional[str] = None,
+    filters: list = Depends(food_item_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List food items a page at a time.
+
+    Pass the X-Next-Cursor header of one response as `cursor` to get the
+    next page; keyset pagination keeps deep pages as cheap as the first.
+    `skip` is still honoured for older clients.
+
+    format=columnar returns {field: [values...]} for the comma-separated
+    `fields` (default all) instead of a list of objects; only those
+    columns are read and no per-row models are built.
+    """
+    field, descending = parse_sort(sort)
+    column = SORTABLE_COLUMNS[field]
+    if format == "columnar":
+        field_names = parse_fields(fields)
+    elif fields is not None:
+        raise HTTPException(status_code=400, detail="fields is only supported with format=columnar")
+
+    def fetch(db: Session):
+        if format == "columnar":
+            # The sort value and id ride along for the cursor
+            query = db.query(
+                FoodItem.id.label("cursor_id"), column.label("cursor_value"),
+                *(COLUMNAR_FIELDS[name] for name in field_names),
+            )
+        else:
+            query = db.query(FoodItem)
+        query = query.filter(*filters)
+        if cursor is not None:
+            position = decode_cursor(cursor)
+            if position.get("sort") != sort or "id" not in position:
+                raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+            query = query.filter(keyset_condition(
+                column, FoodItem.id, position.get("value"), position["id"],
+                descending=descending, nullable=column.nullable,
+            ))
+        elif skip:
+            query = query.offset(skip)
+
+        # Fetch one extra row to learn whether another page exists
+        items = query.order_by(*keyset_order(column, FoodItem.id, descending)).limit(limit + 1).all()
+        headers = {}
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            if format == "columnar":
+                value, last_id = last.cursor_value, last.cursor_id
+            else:
+                value, last_id = getattr(last, field), last.id
+            headers[NEXT_CURSOR_HEADER] = encode_cursor({"sort": sort, "value": value, "id": last_id})
+        return items, headers
+
+    def render(fetched):
+        items, headers = fetched
+        if format == "columnar":
+            # Transpose rows into one list per field; orjson writes non-finite floats as null
+            values = list(zip(*items))[2:] if items else [()] * len(field_names)
+            return orjson.dumps(dict(zip(field_names, map(list, values)))), headers
+        return _food_items_json.dump_json(_food_items_json.validate_python(items, from_attributes=True)), headers
+
+    return await _catalog_response(request, db, fetch, render)
+
+# Protein + fiber per calorie, treating zero calories as one like the dashboard does
+_nutrient_density = (FoodItem.protein + func.coalesce(FoodItem.fiber, 0)) / case(
+    (FoodItem.calories > 0, FoodItem.calories), else_=1
+)
+
+TOP_N = 5
+
+def _ranking(row):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "brand": row.brand,
+        "store": row.store,
+        "price": row.price,
+        "calories_per_dollar": row.calories_per_dollar,
+        "protein_per_dollar": row.protein_per_dollar,
+    }
+
+def _compute_metrics(db: Session):
+    totals = db.query(
+        func.count(FoodItem.id).label("total_items"),
+        func.avg(FoodItem.protein_per_dollar).label("average_protein_cost"),
+        func.avg(FoodItem.calories_per_dollar).label("average_calorie_cost"),
+        func.avg(FoodItem.price).label("average_cost_per_100g"),
+    ).one()
+
+    # Rank every food once by each metric and keep only the leaders
+    ranked = db.query(
+        FoodItem.id,
+        FoodItem.name,
+        FoodItem.brand,
+        FoodItem.store,
+        FoodItem.price,
+        FoodItem.protein_per_dollar,
+        FoodItem.calories_per_dollar,
+        _nutrient_density.label("nutrient_density"),
+        func.row_number().over(
+            order_by=(FoodItem.protein_per_dollar.desc(), FoodItem.id)
+        ).label("protein_rank"),
+        func.row_number().over(
+            order_by=(FoodItem.calories_per_dollar.desc(), FoodItem.id)
+        ).label("calorie_rank"),
+        func.row_number().over(
+            order_by=(_nutrient_density.desc(), FoodItem.id)
+        ).label("density_rank"),
+    ).subquery()
+    leaders = db.query(ranked).filter(
+        or_(
+            ranked.c.protein_rank <= TOP_N,
+            ranked.c.calorie_rank <= TOP_N,
+            ranked.c.density_rank == 1,
+        )
+    ).all()
+
+    top_protein = sorted(
+        (row for row in leaders if row.protein_rank <= TOP_N),
+        key=lambda row: row.protein_rank,
+    )
+    top_calories = sorted(
+        (row for row in leaders if row.calorie_rank <= TOP_N),
+        key=lambda row: row.calorie_rank,
+    )
+    densest = next((row for row in leaders if row.density_rank == 1), None)
+
+    return {
+        "total_items": totals.total_items,
+        "average_protein_cost": totals.average_protein_cost or 0,
+        "average_calorie_cost": totals.average_calorie_cost or 0,
+        "average_cost_per_100g": totals.average_cost_per_100g or 0,
+        "most_efficient_protein": (
+            {"name": top_protein[0].name, "value": top_protein[0].protein_per_dollar}
+            if top_protein else None
+        ),
+        "most_efficient_calories": (
+            {"name": top_calories[0].name, "value": top_calories[0].calories_per_dollar}
+            if top_calories else None
+        ),
+        "best_nutrient_density": (
+            {"name": densest.name, "value": densest.nutrient_density}
+            if densest else None
+        ),
+        "top_protein_foods": [_ranking(row) for row in top_protein],
+        "top_calorie_foods": [_ranking(row) for row in top_calories],
+    }
+
+_STAT_COLUMNS = {
+    "calories": FoodItem.calories,
+    "protein": FoodItem.protein,
+    "carbohydrates": FoodItem.carbohydrates,
+    "fats": FoodItem.fats,
+    "fiber": FoodItem.fiber,
+    "sugar": FoodItem.sugar,
+    "price": FoodItem.price,
+}
+
+def _compute_stats(db: Session):
+    aggregates = [func.count(FoodItem.id).label("total_items")]
+    for name, column in _STAT_COLUMNS.items():
+        aggregates += [
+            func.avg(column).label(f"{name}_avg"),
+            func.min(column).label(f"{name}_min"),
+            func.max(column).label(f"{name}_max"),
+        ]
+    aggregates += [
+        func.sum(FoodItem.protein).label("protein_sum"),
+        func.sum(FoodItem.carbohydrates).label("carbs_sum"),
+        func.sum(FoodItem.fats).label("fats_sum"),
+        func.sum(func.coalesce(FoodItem.fiber, 0)).label("fiber_sum"),
+    ]
+    row = db.query(*aggregates).one()
+
+    stats = {"total_items": row.total_items}
+    for name in _STAT_COLUMNS:
+        stats[name] = {
+            "average": getattr(row, f"{name}_avg"),
+            "minimum": getattr(row, f"{name}_min"),
+            "maximum": getattr(row, f"{name}_max"),
+        }
+
+    # Share of each macronutrient in the combined mass, as a percentage
+    sums = {
+        "protein": row.protein_sum or 0,
+        "carbs": row.carbs_sum or 0,
+        "fats": row.fats_sum or 0,
+        "fiber": row.fiber_sum or 0,
+    }
+    total = sum(sums.values())
+    stats["avg_macros"] = {
+        key: round(value / total * 100, 1) if total else 0
+        for key, value in sums.items()
+    }
+    return stats
+
+@router.get("/metrics", response_model=FoodMetrics)
+async def get_food_metrics(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _catalog_response(
+        request, db,
+        lambda session: get_or_compute("metrics", lambda: _compute_metrics(session)),
+        lambda metrics: (FoodMetrics(**metrics).model_dump_json().encode(), {}),
+    )
+
+@router.get("/stats", response_model=NutritionStats)
+async def get_nutrition_stats(request: Request, db: AsyncSession = Depends(get_async_db)):
+    return await _catalog_response(
+        request, db,
+        lambda session: get_or_compute("stats", lambda: _compute_stats(session)),
+        lambda stats: (NutritionStats(**stats).model_dump_json().encode(), {}),
+    )
+
+# Per-group medians and percentiles, linearly interpolated like percentile_cont
+_GROUP_SUMMARY_COLUMNS = {
+    "calories": FoodItem.calories,
+    "protein": FoodItem.protein,
+    "price": FoodItem.price,
+    "calories_per_dollar": FoodItem.calories_per_dollar,
+    "protein_per_dollar": FoodItem.protein_per_dollar,
+}
+PERCENTILES = {"p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9}
+
+def _compute_group_summary(db: Session, filters):
+    # Rank each column within its group once; a percentile is then a weighted
+    # sum of the (at most two) rows around its position, so the whole summary
+    # is one query on any backend, without percentile_cont.
+    partition = FoodItem.food_group
+    ranked = db.query(
+        FoodItem.food_group,
+        func.count().over(partition_by=partition).label("n"),
+        *[column.label(name) for name, column in _GROUP_SUMMARY_COLUMNS.items()],
+        *[
+            func.row_number().over(partition_by=partition, order_by=column).label(f"{name}_rank")
+            for name, column in _GROUP_SUMMARY_COLUMNS.items()
+        ],
+    ).filter(*filters).subquery()
+
+    def percentile(name, fraction):
+        distance = func.abs(ranked.c[f"{name}_rank"] - 1 - fraction * (ranked.c.n - 1))
+        return func.sum(case((distance < 1, ranked.c[name] * (1 - distance)), else_=0))
+
+    rows = db.query(
+        ranked.c.food_group,
+        func.count().label("count"),
+        *[
+            percentile(name, fraction).label(f"{name}_{key}")
+            for name in _GROUP_SUMMARY_COLUMNS for key, fraction in PERCENTILES.items()
+        ],
+    ).group_by(ranked.c.food_group).all()
+
+    order = {group: i for i, group in enumerate(FOOD_GROUPS)}
+    rows.sort(key=lambda row: order.get(row.food_group, len(order)))
+    return [
+        {
+            "food_group": row.food_group,
+            "count": row.count,
+            "median_calories": row.calories_p50,
+            "median_protein": row.protein_p50,
+            "median_price": row.price_p50,
+            "calories_per_dollar": {key: getattr(row, f"calories_per_dollar_{key}") for key in PERCENTILES},
+            "protein_per_dollar": {key: getattr(row, f"protein_per_dollar_{key}") for key in PERCENTILES},
+        }
+        for row in rows
+    ]
+
+_group_summaries_json = TypeAdapter(List[FoodGroupSummary])
+
+@router.get("/groups/summary", response_model=List[FoodGroupSummary])
+async def get_food_group_summary(
+    request: Request,
+    filters: list = Depends(food_item_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Count, medians and efficiency percentiles of each food group, computed in SQL.
+
+    Takes the same filters as the list endpoint.
+    """
+    return await _catalog_response(
+        request, db,
+        lambda session: _compute_group_summary(session, filters),
+        lambda groups: (_group_summaries_json.dump_json(_group_summaries_json.validate_python(groups)), {}),
+    )
+
+@router.get("/search", response_model=List[FoodItemSchema])
+def search_food_items(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
     db: Session = Depends(get_db)
 ):
-    items = db.query(FoodItem).offset(skip).limit(limit).all()
-    return items
+    """Typo-tolerant name search for autocomplete, best matches first.
+
+    Left sync on the threadpool: building or scanning the in-process index
+    is CPU-bound and would stall the event loop.
+    """
+    return search_foods(db, q, limit)
+
+def _duplicate_food():
+    return HTTPException(status_code=409, detail="A food item with this name and brand already exists")
+
+async def _commit_unique(db: AsyncSession):
+    """Commit, turning a (name, brand) collision into a 409."""
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise _duplicate_food()
+
+async def _execute_unique(db: AsyncSession, statement):
+    """Execute a write, turning a (name, brand) collision into a 409."""
+    try:
+        return await db.execute(statement)
+    except IntegrityError:
+        await db.rollback()
+        raise _duplicate_food()
+
+def _patch_values(changes: dict):
+    """UPDATE values for a partial update, with price_per_unit recomputed in SQL if it moves."""
+    values = dict(changes)
+    if "price" in values or "serving_size" in values:
+        # Unchanged inputs are read from the row being updated
+        price = values.get("price", FoodItem.price)
+        serving_size = values.get("serving_size", FoodItem.serving_size)
+        values["price_per_unit"] = price / serving_size * 100
+    return values
+
+def _bulk_conditions(ids: Optional[List[int]], filters: list):
+    if ids is None and not filters:
+        raise HTTPException(
+            status_code=400, detail="Pass ids or at least one filter; bulk changes never apply to the whole catalog",
+        )
+    return [*filters, FoodItem.id.in_(ids)] if ids is not None else filters
 
 @router.post("/", response_model=FoodItemSchema)
-def create_food_item(
+async def create_food_item(
     food_item: FoodItemCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     db_item = FoodItem(**food_item.dict())
+    db_item.food_group = db_item.food_group or classify_food(db_item.name)
     db_item.price_per_unit = (db_item.price / db_item.serving_size) * 100
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    version = await db.run_sync(bump_catalog_version)
+    await _commit_unique(db)
+    catalog_changed(version)
+    await db.refresh(db_item)
+    index_food(db_item)
+    index_name(db_item)
     return db_item
 
+BULK_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "ndjson",
+}
+
+def _iter_body_lines(request: Request):
+    """Yield request body lines in a worker thread as they arrive from the client."""
+    stream = request.stream()
+
+    async def next_chunk():
+        return await stream.__anext__()
+
+    pending = b""
+    while True:
+        try:
+            chunk = anyio.from_thread.run(next_chunk)
+        except StopAsyncIteration:
+            break
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8") + "\n"
+    if pending:
+        yield pending.decode("utf-8")
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_create_food_items(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db)
+):
+    """Upsert foods from a streamed NDJSON or CSV body, keyed by name and brand.
+
+    Rows are validated with FoodItemCreate and written in chunks; invalid
+    rows are reported back without stopping the rest of the load. Parsing
+    and the COPY path are CPU-bound and driver-specific, so the load runs
+    on the threadpool with a sync session.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        format = BULK_FORMATS.get(content_type)
+        if format is None:
+            raise HTTPException(
+                status_code=415,
+                detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson",
+            )
+    parse = parse_csv if format == "csv" else parse_ndjson
+
+    def load():
+        errors = ErrorReport()
+        received = 0
+
+        def counted(parsed):
+            nonlocal received
+            for row in parsed:
+                received += 1
+                yield row
+
+        rows = validate_rows(counted(parse(_iter_body_lines(request))), errors)
+        written = ingest_rows(db, rows, errors)
+        return {
+            "received": received,
+            "written": written,
+            "error_count": errors.count,
+            "errors": errors.rows,
+        }
+
+    result = await run_in_threadpool(load)
+    # ingest_rows has already recorded each committed chunk with catalog_changed
+    if result["written"]:
+        reset_similarity_index()
+        reset_search_index()
+    return result
+
+@router.patch("/", response_model=BulkUpdateResult)
+async def bulk_update_food_items(
+    patch: FoodItemBulkPatch,
+    filters: list = Depends(food_item_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Apply one partial update to every food matching `ids` and the filters, in one UPDATE.
+
+    Takes the same filter query parameters as the list endpoint.
+    """
+    conditions = _bulk_conditions(patch.ids, filters)
+    values = patch.changes.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes given")
+    # Read before the update, which may move rows out of the filters
+    days = set()
+    if ROLLUP_FOOD_FIELDS.intersection(values):
+        days = await db.run_sync(plan_days_with_foods, select(FoodItem.id).where(*conditions))
+    result = await _execute_unique(
+        db,
+        update(FoodItem).where(*conditions).values(**_patch_values(values))
+        .returning(FoodItem.id).execution_options(synchronize_session=False),
+    )
+    ids = list(result.scalars())
+    if not ids:
+        return {"updated": 0, "ids": []}
+    await db.run_sync(refresh_daily_nutrition, days)
+    version = await db.run_sync(bump_catalog_version)
+    await db.commit()
+    catalog_changed(version)
+    reset_similarity_index()
+    if "name" in values:
+        reset_search_index()
+    return {"updated": len(ids), "ids": ids}
+
+@router.delete("/", response_model=BulkDeleteResult)
+async def bulk_delete_food_items(
+    body: Optional[FoodItemBulkDelete] = None,
+    filters: list = Depends(food_item_filters),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete every food matching `ids` and the filters, in one DELETE.
+
+    Their prices and meal plan entries go with them through ON DELETE CASCADE.
+    """
+    conditions = _bulk_conditions(body.ids if body else None, filters)
+    matching = select(FoodItem.id).where(*conditions)
+    days = await db.run_sync(plan_days_with_foods, matching)
+    result = await db.execute(
+        delete(FoodItem).where(*conditions).returning(FoodItem.id).execution_options(synchronize_session=False)
+    )
+    ids = list(result.scalars())
+    if not ids:
+        return {"deleted": 0, "ids": []}
+    await db.run_sync(refresh_daily_nutrition, days)
+    version = await db.run_sync(bump_catalog_version)
+    await db.commit()
+    catalog_changed(version)
+    for food_id in ids:
+        unindex_food(food_id)
+        unindex_name(food_id)
+    return {"deleted": len(ids), "ids": ids}
+
 @router.get("/{item_id}", response_model=FoodItemSchema)
-def get_food_item(
+async def get_food_item(
     item_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    def fetch(db: Session):
+        item = db.query(FoodItem).filter(FoodItem.id == item_id).first()
+        if item is None:
+            raise HTTPException(status_code=404, detail="Food item not found")
+        return item
+
+    return await _catalog_response(
+        request, db, fetch, lambda item: (FoodItemSchema.model_validate(item).model_dump_json().encode(), {}),
+    )
+
+@router.get("/{item_id}/similar", response_model=List[FoodItemSchema])
+def get_similar_food_items(
+    item_id: int,
+    k: int = Query(10, ge=1, le=100),
+    cheaper: bool = False,
     db: Session = Depends(get_db)
 ):
-    item = db.query(FoodItem).filter(FoodItem.id == item_id).first()
-    if item is None:
+    """Foods with the closest per-100g nutrient profile, nearest first.
+
+    With cheaper, only foods with a lower price_per_unit are considered.
+    Sync like search, as the index scan is CPU-bound.
+    """
+    ids = similarity_index(db).nearest(item_id, k, cheaper)
+    if ids is None:
         raise HTTPException(status_code=404, detail="Food item not found")
-    return item
+    found = {item.id: item for item in db.query(FoodItem).filter(FoodItem.id.in_(ids))}
+    return [found[food_id] for food_id in ids if food_id in found]
 
 @router.put("/{item_id}", response_model=FoodItemSchema)
-def update_food_item(
+async def update_food_item(
     item_id: int,
     food_item: FoodItemUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_item = db.query(FoodItem).filter(FoodItem.id == item_id).first()
+    db_item = await db.get(FoodItem, item_id)
     if db_item is None:
         raise HTTPException(status_code=404, detail="Food item not found")
     
-    for key, value in food_item.dict().items():
+    # Left out, the stored group (often from the FDC category) is kept; it's only guessed on create
+    values = food_item.dict()
+    if values["food_group"] is None:
+        del values["food_group"]
+    for key, value in values.items():
         setattr(db_item, key, value)
     
     db_item.price_per_unit = (db_item.price / db_item.serving_size) * 100
-    db.commit()
-    db.refresh(db_item)
+    # The rollups of days planning this food are recomputed from the written row
+    days = await db.run_sync(plan_days_with_foods, [item_id])
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise _duplicate_food()
+    await db.run_sync(refresh_daily_nutrition, days)
+    version = await db.run_sync(bump_catalog_version)
+    await _commit_unique(db)
+    catalog_changed(version)
+    await db.refresh(db_item)
+    index_food(db_item)
+    index_name(db_item)
     return db_item
 
-@router.delete("/{item_id}")
-def delete_food_item(
+@router.patch("/{item_id}", response_model=FoodItemSchema)
+async def patch_food_item(
     item_id: int,
-    db: Session = Depends(get_db)
+    changes: FoodItemPatch,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_item = db.query(FoodItem).filter(FoodItem.id == item_id).first()
+    """Write only the supplied fields, with one UPDATE ... RETURNING.
+
+    price_per_unit is recomputed in the statement when price or
+    serving_size changes, and the per-dollar columns follow in the
+    database. Renaming a food keeps its food_group.
+    """
+    values = changes.model_dump(exclude_unset=True)
+    if not values:
+        db_item = await db.get(FoodItem, item_id)
+        if db_item is None:
+            raise HTTPException(status_code=404, detail="Food item not found")
+        return db_item
+
+    days = set()
+    if ROLLUP_FOOD_FIELDS.intersection(values):
+        days = await db.run_sync(plan_days_with_foods, [item_id])
+    result = await _execute_unique(
+        db, update(FoodItem).where(FoodItem.id == item_id).values(**_patch_values(values)).returning(FoodItem)
+    )
+    db_item = result.scalars().first()
     if db_item is None:
         raise HTTPException(status_code=404, detail="Food item not found")
-    
-    db.delete(db_item)
-    db.commit()
+    await db.run_sync(refresh_daily_nutrition, days)
+    version = await db.run_sync(bump_catalog_version)
+    await db.commit()
+    catalog_changed(version)
+    index_food(db_item)
+    index_name(db_item)
+    return db_item
+
+@router.delete("/{item_id}")
+async def delete_food_item(
+    item_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Days whose rollups include this food, found through ix_meal_plan_foods_food_item_id
+    days = await db.run_sync(plan_days_with_foods, [item_id])
+    # One statement; prices and meal plan rows go with it through ON DELETE CASCADE
+    deleted = await db.execute(delete(FoodItem).where(FoodItem.id == item_id).returning(FoodItem.id))
+    if deleted.first() is None:
+        raise HTTPException(status_code=404, detail="Food item not found")
+    if days:
+        await db.run_sync(refresh_daily_nutrition, days)
+    version = await db.run_sync(bump_catalog_version)
+    await db.commit()
+    catalog_changed(version)
+    unindex_food(item_id)
+    unindex_name(item_id)
     return {"message": "Food item deleted successfully"} 
\ No newline at end of file
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_serializer, field_validator
+import math
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
+
+from ..food_groups import FOOD_GROUPS
 
 class FoodItemBase(BaseModel):
     name: str
@@ -14,6 +17,8 @@ class FoodItemBase(BaseModel):
     sugar: Optional[float] = Field(default=None, ge=0)
     price: float = Field(gt=0)
     store: Optional[str] = None
+    # Left out, it's guessed from the name
+    food_group: Optional[Literal[FOOD_GROUPS]] = None
 
 class FoodItemCreate(FoodItemBase):
     pass
@@ -21,14 +26,137 @@ class FoodItemCreate(FoodItemBase):
 class FoodItemUpdate(FoodItemBase):
     pass
 
+class FoodItemPatch(BaseModel):
+    """Fields of a partial update; only those supplied are written."""
+    name: Optional[str] = None
+    brand: Optional[str] = None
+    serving_size: Optional[float] = Field(default=None, gt=0)
+    calories: Optional[float] = Field(default=None, ge=0)
+    protein: Optional[float] = Field(default=None, ge=0)
+    carbohydrates: Optional[float] = Field(default=None, ge=0)
+    fats: Optional[float] = Field(default=None, ge=0)
+    fiber: Optional[float] = Field(default=None, ge=0)
+    sugar: Optional[float] = Field(default=None, ge=0)
+    price: Optional[float] = Field(default=None, gt=0)
+    store: Optional[str] = None
+    food_group: Optional[Literal[FOOD_GROUPS]] = None
+
+    @field_validator(
+        "name", "serving_size", "calories", "protein", "carbohydrates", "fats", "price", "food_group"
+    )
+    @classmethod
+    def not_null(cls, value):
+        # Omit a field to leave it alone; these columns can't be cleared
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+# Most ids one bulk request takes, well under the drivers' bind parameter limits
+BULK_MAX_IDS = 10000
+
+class FoodItemBulkPatch(BaseModel):
+    # Combined with the query string filters; at least one of the two is required
+    ids: Optional[List[int]] = Field(default=None, max_length=BULK_MAX_IDS)
+    changes: FoodItemPatch
+
+class FoodItemBulkDelete(BaseModel):
+    ids: Optional[List[int]] = Field(default=None, max_length=BULK_MAX_IDS)
+
 class FoodItem(FoodItemBase):
     id: int
     price_per_unit: float
+    food_group: str
     created_at: datetime
     updated_at: Optional[datetime]
     calories_per_dollar: float
     protein_per_dollar: float
     fiber_to_sugar_ratio: Optional[float]
 
+    @field_serializer("fiber_to_sugar_ratio")
+    def serialize_ratio(self, value: Optional[float]):
+        # Sugar-free foods with fiber are stored as +Infinity so they rank
+        # first, but JSON has no infinity
+        if value is not None and not math.isfinite(value):
+            return None
+        return value
+
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+class FoodRanking(BaseModel):
+    id: int
+    name: str
+    brand: Optional[str] = None
+    store: Optional[str] = None
+    price: float
+    calories_per_dollar: float
+    protein_per_dollar: float
+
+class FoodScore(BaseModel):
+    name: str
+    value: float
+
+class FoodMetrics(BaseModel):
+    total_items: int
+    average_protein_cost: float
+    average_calorie_cost: float
+    average_cost_per_100g: float
+    most_efficient_protein: Optional[FoodScore]
+    most_efficient_calories: Optional[FoodScore]
+    best_nutrient_density: Optional[FoodScore]
+    top_protein_foods: List[FoodRanking]
+    top_calorie_foods: List[FoodRanking]
+
+class NutrientSummary(BaseModel):
+    average: Optional[float]
+    minimum: Optional[float]
+    maximum: Optional[float]
+
+class MacroRatios(BaseModel):
+    protein: float
+    carbs: float
+    fats: float
+    fiber: float
+
+class NutritionStats(BaseModel):
+    total_items: int
+    calories: NutrientSummary
+    protein: NutrientSummary
+    carbohydrates: NutrientSummary
+    fats: NutrientSummary
+    fiber: NutrientSummary
+    sugar: NutrientSummary
+    price: NutrientSummary
+    avg_macros: MacroRatios
+
+class Percentiles(BaseModel):
+    p25: Optional[float]
+    p50: Optional[float]
+    p75: Optional[float]
+    p90: Optional[float]
+
+class FoodGroupSummary(BaseModel):
+    food_group: str
+    count: int
+    median_calories: Optional[float]
+    median_protein: Optional[float]
+    median_price: Optional[float]
+    calories_per_dollar: Percentiles
+    protein_per_dollar: Percentiles
+
+class BulkRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BulkImportResult(BaseModel):
+    received: int
+    written: int
+    error_count: int
+    errors: List[BulkRowError]
+
+class BulkUpdateResult(BaseModel):
+    updated: int
+    ids: List[int]
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
+    ids: List[int]
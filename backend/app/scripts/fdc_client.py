@@ -0,0 +1,168 @@
+"""HTTP client for the FoodData Central API used by import_usda_foods.
+
+Requests go through a concurrency limit and a token-bucket rate limiter,
+429/5xx responses and network errors are retried with exponential
+backoff, and every response is cached on disk by FDC id so re-runs only
+revalidate (If-None-Match / If-Modified-Since) or skip the network.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_BASE_URL = "https://api.nal.usda.gov/fdc/v1"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "nutrition-tracker", "fdc")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second on average, with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    """One JSON file per FDC id holding the body and its validators."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, fdc_id: str) -> str:
+        return os.path.join(self.directory, f"{fdc_id}.json")
+
+    def get(self, fdc_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(fdc_id)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, fdc_id: str, entry: Dict):
+        path = self._path(fdc_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+class FdcClient:
+    """Fetch FDC food records politely; use as an async context manager."""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = None,
+        concurrency: int = None,
+        rate: float = None,
+        burst: int = None,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 30.0,
+        cache_dir: Optional[str] = None,
+        max_age: float = None,
+    ):
+        self.api_key = api_key
+        self.base_url = (base_url or os.getenv("FDC_BASE_URL", DEFAULT_BASE_URL)).rstrip("/")
+        self.semaphore = asyncio.Semaphore(concurrency or int(os.getenv("FDC_CONCURRENCY", "8")))
+        self.bucket = TokenBucket(
+            rate or float(os.getenv("FDC_RATE_PER_SECOND", "5")),
+            burst or int(os.getenv("FDC_BURST", "10")),
+        )
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        cache_dir = cache_dir or os.getenv("FDC_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.cache = ResponseCache(cache_dir) if cache_dir != "off" else None
+        # Cached entries younger than this are used without asking the server at all
+        self.max_age = max_age if max_age is not None else float(os.getenv("FDC_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+        self.failures: List[Dict] = []
+        self.stats = {"network": 0, "cached": 0, "revalidated": 0, "retries": 0}
+        self._client = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None and response.headers.get("Retry-After", "").isdigit():
+            return float(response.headers["Retry-After"])
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
+
+    async def fetch_food(self, fdc_id: str) -> Optional[Dict]:
+        """Return the food record for fdc_id, or None after recording why it failed."""
+        cached = self.cache.get(fdc_id) if self.cache else None
+        if cached and time.time() - cached.get("fetched_at", 0) < self.max_age:
+            self.stats["cached"] += 1
+            return cached["body"]
+
+        headers = {"Accept": "application/json"}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        url = f"{self.base_url}/food/{fdc_id}"
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                async with self.semaphore:
+                    await self.bucket.acquire()
+                    response = await self._client.get(url, headers=headers, params={"api_key": self.api_key})
+                    self.stats["network"] += 1
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code == 304 and cached:
+                    self.stats["revalidated"] += 1
+                    cached["fetched_at"] = time.time()
+                    self.cache.put(fdc_id, cached)
+                    return cached["body"]
+                if response.status_code == 200:
+                    try:
+                        body = response.json()
+                    except ValueError as e:
+                        # A truncated or garbled body; retried like a server error
+                        error = f"Invalid JSON: {e}"
+                    else:
+                        if self.cache:
+                            self.cache.put(fdc_id, {
+                                "etag": response.headers.get("ETag"),
+                                "last_modified": response.headers.get("Last-Modified"),
+                                "fetched_at": time.time(),
+                                "body": body,
+                            })
+                        return body
+                else:
+                    error = f"HTTP {response.status_code}"
+                    if response.status_code not in RETRY_STATUSES:
+                        break
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._retry_delay(attempt, response))
+
+        self.failures.append({"fdc_id": fdc_id, "error": error})
+        return None
@@ -0,0 +1,92 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# FDC nutrient id -> (field, priority). When a food reports several ids for
+# the same field, the lowest priority wins.
+FDC_NUTRIENTS = {
+    1008: ("calories", 0),       # Energy (kcal)
+    2048: ("calories", 1),       # Energy (Atwater Specific Factors, kcal)
+    2047: ("calories", 2),       # Energy (Atwater General Factors, kcal)
+    1062: ("calories", 3),       # Energy (kJ)
+    1003: ("protein", 0),
+    1005: ("carbohydrates", 0),  # Carbohydrate, by difference
+    1004: ("fats", 0),           # Total lipid (fat)
+    1079: ("fiber", 0),          # Fiber, total dietary
+    2000: ("sugar", 0),          # Sugars, total including NLEA
+    1063: ("sugar", 1),          # Sugars, Total
+}
+# Ids reported in kJ when a record doesn't say (the CSV download has no units)
+FDC_KJ_IDS = {1062}
+KJ_PER_KCAL = 4.184
+
+NUTRIENT_FIELDS = ("calories", "protein", "carbohydrates", "fats", "fiber", "sugar")
+# Missing macros count as zero; missing fiber/sugar stay unknown
+REQUIRED_FIELDS = ("protein", "carbohydrates", "fats")
+
+
+def _entries(food_nutrients: Iterable[Dict]) -> Iterable[Tuple[Optional[int], Optional[float], str]]:
+    """(nutrient id, amount, unit) for each entry of an API/JSON foodNutrients list.
+
+    Handles both the full format ({"nutrient": {...}, "amount": ...}) and the
+    abridged/search format ({"nutrientId": ..., "value": ..., "unitName": ...}).
+    """
+    for entry in food_nutrients:
+        nutrient = entry.get("nutrient") or {}
+        nutrient_id = nutrient.get("id", entry.get("nutrientId"))
+        amount = entry.get("amount", entry.get("value"))
+        unit = (nutrient.get("unitName") or entry.get("unitName") or "").upper()
+        yield nutrient_id, amount, unit
+
+
+def extract_from_entries(entries: Iterable[Tuple], normalize: bool = False) -> Dict[str, Optional[float]]:
+    """Pick calories and macros out of (id, amount, unit) triples in a single pass.
+
+    Energy prefers kcal records and converts kJ otherwise. With normalize,
+    values that can't be per 100g (over 900 kcal or 100 g of a macro) are
+    assumed to be per 1000g and divided by ten, as the API occasionally
+    reports them that way.
+    """
+    best: Dict[str, Tuple[int, float]] = {}
+    for nutrient_id, amount, unit in entries:
+        known = FDC_NUTRIENTS.get(nutrient_id)
+        if known is None or amount is None:
+            continue
+        field, priority = known
+        if field in best and best[field][0] <= priority:
+            continue
+        amount = float(amount)
+        if field == "calories" and (unit == "KJ" or (not unit and nutrient_id in FDC_KJ_IDS)):
+            amount /= KJ_PER_KCAL
+        best[field] = (priority, max(amount, 0.0))
+
+    values = {field: best[field][1] if field in best else None for field in NUTRIENT_FIELDS}
+    for field in REQUIRED_FIELDS:
+        if values[field] is None:
+            values[field] = 0.0
+
+    if normalize and values["calories"] is not None and (
+        values["calories"] > 900 or any(values[field] > 100 for field in REQUIRED_FIELDS)
+    ):
+        values = {field: value / 10 if value is not None else None for field, value in values.items()}
+    return values
+
+
+def extract_nutrients(food_nutrients: Iterable[Dict], normalize: bool = False) -> Dict[str, Optional[float]]:
+    """Nutrients per 100g from a food's foodNutrients list; calories is None if unknown."""
+    return extract_from_entries(_entries(food_nutrients), normalize)
+
+
+def extract_nutrient_columns(foods: List[Dict], normalize: bool = False) -> Dict[str, array]:
+    """Extract a page of foods into one float64 array per nutrient, NaN where unknown.
+
+    The arrays line up with `foods` and can be wrapped without copying,
+    e.g. with numpy.frombuffer.
+    """
+    columns = {field: array("d") for field in NUTRIENT_FIELDS}
+    nan = float("nan")
+    for food in foods:
+        values = extract_nutrients(food.get("foodNutrients", ()), normalize)
+        for field in NUTRIENT_FIELDS:
+            value = values[field]
+            columns[field].append(nan if value is None else value)
+    return columns
@@ -1,94 +1,261 @@
+import argparse
+import csv
+import json
 import sys
 import os
+from datetime import date
 
 # Add the parent directory to the Python path so we can import our app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from sqlalchemy import Column, Date, Float, Index, MetaData, String, Table, and_, case, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.cache import bump_catalog_version
 from app.database import SessionLocal
 from app.models.food_item import FoodItem
+from app.models.food_price import FoodPrice
+from app.rollups import plan_days_with_foods, refresh_daily_nutrition
+
+DEFAULT_STORE = "Local Grocery"
+
+# Realistic prices for common foods, applied when no feed file is given
+DEFAULT_PRICES = {
+    # Proteins
+    "Chicken breast, raw": 3.99,
+    "Salmon, Atlantic, raw": 12.99,
+    "Ground beef, 80/20, raw": 4.99,
+    "Tofu, firm": 2.99,
+    "Pork chop, raw": 4.99,
+    "Tuna, canned in water": 1.99,
+    "Ribeye steak, raw": 15.99,
+    "Turkey breast, raw": 4.99,
+    "Lamb chop, raw": 12.99,
+    "Duck breast, raw": 9.99,
+    "Bison, ground, raw": 8.99,
+    "Chicken thigh, raw": 2.99,
+    "Pork tenderloin, raw": 5.99,
+    
+    # Eggs and Dairy
+    "Egg, whole, raw": 0.33,  # per egg
+    "Greek yogurt, plain": 3.99,
+    "Milk, whole": 3.49,
+    "Cheese, cheddar": 5.99,
+    "Cottage cheese, 2%": 3.99,
+    
+    # Grains
+    "White rice, cooked": 0.99,
+    "Oatmeal, plain": 2.99,
+    "Bread, whole wheat": 3.49,
+    "Quinoa, cooked": 4.99,
+    "Pasta, wheat, cooked": 1.99,
+    
+    # Vegetables
+    "Broccoli, raw": 2.49,
+    "Sweet potato, raw": 1.49,
+    "Carrots, raw": 1.29,
+    "Bell pepper, red": 0.99,
+    "Avocado": 1.49,
+    "Cauliflower, raw": 2.99,
+    "Kale, raw": 2.49,
+    
+    # Fruits
+    "Banana, raw": 0.29,
+    "Apple, raw": 0.79,
+    "Orange, raw": 0.69,
+    "Blueberries, raw": 3.99,
+    "Strawberries, raw": 3.49,
+    
+    # Legumes
+    "Black beans, cooked": 1.29,
+    "Chickpeas, cooked": 1.49,
+    "Lentils, cooked": 1.99,
+    
+    # Nuts and Seeds
+    "Almonds": 7.99,
+    "Peanut butter": 3.99,
+    "Chia seeds": 6.99,
+    
+    # Other
+    "Olive oil": 8.99,
+    "Honey": 4.99
+}
+
+def read_price_feed(path, store, effective_date):
+    """Read a CSV or JSON price feed into rows for the staging table.
+
+    CSV needs name and price columns and may add brand, store and
+    effective_date. JSON is either a list of such objects or a
+    {name: price} mapping like DEFAULT_PRICES.
+    """
+    if path.lower().endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [{"name": name, "price": price} for name, price in data.items()]
+    else:
+        with open(path, newline="") as f:
+            data = list(csv.DictReader(f))
+
+    rows, skipped = [], 0
+    for number, entry in enumerate(data, start=1):
+        try:
+            price = float(entry["price"])
+            if not entry.get("name") or price <= 0:
+                raise ValueError("needs a name and a positive price")
+            rows.append({
+                "name": entry["name"],
+                "brand": entry.get("brand") or None,
+                "store": entry.get("store") or store,
+                "effective_date": date.fromisoformat(entry.get("effective_date") or effective_date.isoformat()),
+                "price": price,
+            })
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Skipping feed row {number}: {e}")
+            skipped += 1
+    return rows, skipped
+
+def apply_price_feed(session, rows):
+    """Apply a price feed with one set-based UPDATE and one history INSERT.
+
+    The feed is loaded into a temporary staging table and joined to
+    food_items by name and, when the feed gives one, brand. Every row goes
+    into the food_prices history, and each fed food's catalog price becomes
+    its latest price in that history; the daily_nutrition rollup follows.
+    Returns (catalog rows changed, feed rows without a matching food).
+    """
+    staging = Table(
+        "food_price_staging", MetaData(),
+        Column("name", String, nullable=False),
+        Column("brand", String),
+        Column("store", String, nullable=False),
+        Column("effective_date", Date, nullable=False),
+        Column("price", Float, nullable=False),
+        Index("ix_food_price_staging_name", "name"),
+        prefixes=["TEMPORARY"],
+    )
+    connection = session.connection()
+    # A rolled-back run can leave it behind on a pooled SQLite connection,
+    # where the CREATE ran outside the transaction but the DROP was undone
+    staging.drop(connection, checkfirst=True)
+    staging.create(connection)
+    try:
+        # Last row wins when a feed repeats a food for the same store and day
+        rows = list({
+            (row["name"], row["brand"], row["store"], row["effective_date"]): row for row in rows
+        }.values())
+        session.execute(staging.insert(), rows)
+        matches = and_(
+            FoodItem.name == staging.c.name,
+            or_(staging.c.brand.is_(None), func.coalesce(FoodItem.brand, "") == staging.c.brand),
+        )
+
+        # Price history: INSERT INTO food_prices ... SELECT ... FROM staging JOIN food_items
+        insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+        history = insert(FoodPrice.__table__).from_select(
+            ["food_item_id", "store", "effective_date", "price", "price_per_unit"],
+            select(
+                FoodItem.id,
+                staging.c.store,
+                staging.c.effective_date,
+                staging.c.price,
+                staging.c.price / FoodItem.serving_size * 100,
+            ).select_from(staging).join(FoodItem, matches),
+        )
+        session.execute(history.on_conflict_do_update(
+            index_elements=["food_item_id", "store", "effective_date"],
+            set_={"price": history.excluded.price, "price_per_unit": history.excluded.price_per_unit},
+        ))
+
+        # The catalog holds one current price per food: its latest row in the whole
+        # history, so a backdated feed or another store's older prices don't win.
+        # On the same day its current store, then store name, breaks the tie.
+        fed = select(FoodItem.id).select_from(staging).join(FoodItem, matches)
+        latest = select(
+            FoodPrice.food_item_id.label("id"),
+            FoodPrice.store,
+            FoodPrice.price,
+            func.row_number().over(
+                partition_by=FoodPrice.food_item_id,
+                order_by=[
+                    FoodPrice.effective_date.desc(),
+                    case((FoodPrice.store == FoodItem.store, 0), else_=1),
+                    FoodPrice.store,
+                ],
+            ).label("recency"),
+        ).join(FoodItem, FoodItem.id == FoodPrice.food_item_id).where(
+            FoodPrice.food_item_id.in_(fed)
+        ).subquery("latest")
+
+        # Catalog prices: UPDATE food_items ... FROM (latest history row per fed food),
+        # leaving foods whose current price didn't change alone
+        updated = session.execute(
+            update(FoodItem.__table__)
+            .where(
+                FoodItem.id == latest.c.id,
+                latest.c.recency == 1,
+                or_(FoodItem.price != latest.c.price, FoodItem.store.is_distinct_from(latest.c.store)),
+            )
+            .values(
+                price=latest.c.price,
+                price_per_unit=latest.c.price / FoodItem.serving_size * 100,
+                store=latest.c.store,
+                updated_at=func.now(),
+            )
+        ).rowcount
 
-def fix_food_data():
+        # Days whose planned foods just changed price
+        refresh_daily_nutrition(session, plan_days_with_foods(session, fed))
+
+        unmatched = session.execute(
+            select(staging.c.name, staging.c.brand)
+            .select_from(staging.outerjoin(FoodItem, matches))
+            .where(FoodItem.id.is_(None))
+        ).all()
+    finally:
+        staging.drop(connection)
+    return updated, unmatched
+
+def fix_food_data(feed_path=None, store=DEFAULT_STORE, effective_date=None):
     session = SessionLocal()
     try:
-        # Define realistic prices for common foods
-        price_updates = {
-            # Proteins
-            "Chicken breast, raw": 3.99,
-            "Salmon, Atlantic, raw": 12.99,
-            "Ground beef, 80/20, raw": 4.99,
-            "Tofu, firm": 2.99,
-            "Pork chop, raw": 4.99,
-            "Tuna, canned in water": 1.99,
-            "Ribeye steak, raw": 15.99,
-            "Turkey breast, raw": 4.99,
-            "Lamb chop, raw": 12.99,
-            "Duck breast, raw": 9.99,
-            "Bison, ground, raw": 8.99,
-            "Chicken thigh, raw": 2.99,
-            "Pork tenderloin, raw": 5.99,
-            
-            # Eggs and Dairy
-            "Egg, whole, raw": 0.33,  # per egg
-            "Greek yogurt, plain": 3.99,
-            "Milk, whole": 3.49,
-            "Cheese, cheddar": 5.99,
-            "Cottage cheese, 2%": 3.99,
-            
-            # Grains
-            "White rice, cooked": 0.99,
-            "Oatmeal, plain": 2.99,
-            "Bread, whole wheat": 3.49,
-            "Quinoa, cooked": 4.99,
-            "Pasta, wheat, cooked": 1.99,
-            
-            # Vegetables
-            "Broccoli, raw": 2.49,
-            "Sweet potato, raw": 1.49,
-            "Carrots, raw": 1.29,
-            "Bell pepper, red": 0.99,
-            "Avocado": 1.49,
-            "Cauliflower, raw": 2.99,
-            "Kale, raw": 2.49,
-            
-            # Fruits
-            "Banana, raw": 0.29,
-            "Apple, raw": 0.79,
-            "Orange, raw": 0.69,
-            "Blueberries, raw": 3.99,
-            "Strawberries, raw": 3.49,
-            
-            # Legumes
-            "Black beans, cooked": 1.29,
-            "Chickpeas, cooked": 1.49,
-            "Lentils, cooked": 1.99,
-            
-            # Nuts and Seeds
-            "Almonds": 7.99,
-            "Peanut butter": 3.99,
-            "Chia seeds": 6.99,
-            
-            # Other
-            "Olive oil": 8.99,
-            "Honey": 4.99
-        }
-
-        print("\nUpdating food prices...")
-        foods = session.query(FoodItem).all()
-        for food in foods:
-            # Update price if we have a specific price for this food
-            if food.name in price_updates:
-                food.price = price_updates[food.name]
-                food.price_per_unit = (food.price / food.serving_size) * 100
-                print(f"Updated price for {food.name} to ${food.price:.2f}")
+        effective_date = effective_date or date.today()
+        if feed_path:
+            print(f"\nLoading price feed {feed_path}...")
+            rows, skipped = read_price_feed(feed_path, store, effective_date)
+        else:
+            rows = [
+                {"name": name, "brand": None, "store": store, "effective_date": effective_date, "price": price}
+                for name, price in DEFAULT_PRICES.items()
+            ]
+            skipped = 0
 
+        print(f"\nUpdating food prices...")
+        updated, unmatched = apply_price_feed(session, rows)
+        # Tell running API processes to drop their cached catalog
+        bump_catalog_version(session)
         session.commit()
+
+        print(f"Updated {updated} foods from {len(rows)} feed rows ({skipped} invalid rows skipped)")
+        for name, brand in unmatched[:20]:
+            print(f"No food matches {name}" + (f" ({brand})" if brand else ""))
+        if len(unmatched) > 20:
+            print(f"...and {len(unmatched) - 20} more unmatched rows")
         print("\nPrice updates completed successfully!")
         
     except Exception as e:
         print(f"Error updating prices: {str(e)}")
         session.rollback()
+        # A failed nightly feed must fail its cron job or CI step
+        sys.exit(1)
     finally:
         session.close()
 
 if __name__ == "__main__":
-    fix_food_data() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Apply a store price feed to the food catalog")
+    parser.add_argument("feed", nargs="?", help="CSV or JSON price feed (default: built-in prices)")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="Store for feed rows that don't name one")
+    parser.add_argument("--date", type=date.fromisoformat, help="Effective date (default: today)")
+    args = parser.parse_args()
+    fix_food_data(args.feed, args.store, args.date)
@@ -1,68 +1,24 @@
+import argparse
 import asyncio
-import aiohttp
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import csv
+import io
+import itertools
+import json
+import re
+import zipfile
 import sys
 import os
-from typing import Dict
+from typing import Dict, Iterator, List, Optional
 
 # Add the parent directory to the Python path so we can import our app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from app.models.food_item import FoodItem
-from app.database import engine, SessionLocal
-
-def get_nutrient_value(nutrients, nutrient_name):
-    """Extract nutrient value from nutrients list. Returns amount per 100g."""
-    nutrient_map = {
-        "Protein": ["Protein"],
-        "Carbohydrate": ["Carbohydrate, by difference"],
-        "Total lipid (fat)": ["Total lipid (fat)"],
-        "Fiber": ["Fiber, total dietary"],
-        "Sugar": ["Total Sugars", "Sugars, Total"]  # Updated to match USDA API field names
-    }
-    
-    usda_names = nutrient_map.get(nutrient_name, [nutrient_name])
-    
-    # Debug print for sugar
-    if nutrient_name == "Sugar":
-        print(f"\nLooking for sugar in nutrient names:")
-        for nutrient in nutrients:
-            nutrient_data = nutrient.get("nutrient", {})
-            name = nutrient_data.get("name", "")
-            amount = nutrient.get("amount", 0)
-            print(f"Found nutrient: {name} = {amount}")
-    
-    for nutrient in nutrients:
-        nutrient_data = nutrient.get("nutrient", {})
-        name = nutrient_data.get("name", "")
-        if name in usda_names:
-            val = nutrient.get("amount", 0)
-            if nutrient_name == "Sugar":
-                print(f"Found sugar value: {val}")
-            return val
-    return 0
-
-def get_energy_value(nutrients):
-    """
-    Extract energy value from nutrients, handling different formats and units.
-    In nutrition, 'calories' typically refers to kilocalories (kcal).
-    1 kcal = 1 Calorie = 1,000 small calories = 4.184 kJ
-    """
-    # First try to find kilocalories (kcal)
-    for nutrient in nutrients:
-        nutrient_data = nutrient.get("nutrient", {})
-        if "Energy" in nutrient_data.get("name", "") and nutrient_data.get("unitName", "") == "KCAL":
-            return nutrient.get("amount", 0)  # USDA provides this in kcal
-    
-    # If no kcal found, try to find kJ and convert to kcal
-    for nutrient in nutrients:
-        nutrient_data = nutrient.get("nutrient", {})
-        if "Energy" in nutrient_data.get("name", "") and nutrient_data.get("unitName", "") == "kJ":
-            # Convert kilojoules to kilocalories (1 kcal = 4.184 kJ)
-            return nutrient.get("amount", 0) / 4.184
-    
-    return 0
+from app.cache import bump_catalog_version
+from app.database import SessionLocal
+from app.food_groups import classify_food
+from app.ingest import chunked, fill_food_rows
+from app.scripts.fdc_client import FdcClient
+from app.scripts.fdc_nutrients import extract_from_entries, extract_nutrient_columns, extract_nutrients
 
 def get_serving_size(food):
     """Extract serving size information from food data. Returns serving size in grams."""
@@ -83,58 +39,38 @@ def get_serving_size(food):
     
     return 100.0  # Default to 100g if no serving size information found
 
-async def fetch_food_data(session: aiohttp.ClientSession, food_name: str, fdc_id: str, api_key: str) -> Dict:
+def _fdc_category(food: Dict) -> Optional[str]:
+    """Category description of an API/JSON food record, whichever kind it has."""
+    category = food.get("foodCategory")
+    if isinstance(category, dict):
+        category = category.get("description")
+    if not category:
+        category = (food.get("wweiaFoodCategory") or {}).get("wweiaFoodCategoryDescription")
+    return category or food.get("brandedFoodCategory")
+
+async def fetch_food_data(client: FdcClient, food_name: str, fdc_id: str) -> Dict:
     """Fetch food data for a single food item."""
-    url = f"https://api.nal.usda.gov/fdc/v1/food/{fdc_id}"
-    headers = {"Content-Type": "application/json"}
-    params = {"api_key": api_key}
-    
+    food = await client.fetch_food(fdc_id)
+    if food is None:
+        print(f"Failed to fetch {food_name}")
+        return None
+
     try:
-        async with session.get(url, headers=headers, params=params) as response:
-            if response.status == 200:
-                food = await response.json()
-                nutrients = food.get("foodNutrients", [])
-                
-                print(f"\nProcessing food: {food_name}")
-                
-                # Get raw nutrient values
-                calories = get_energy_value(nutrients)
-                protein = get_nutrient_value(nutrients, "Protein")
-                carbs = get_nutrient_value(nutrients, "Carbohydrate")
-                fats = get_nutrient_value(nutrients, "Total lipid (fat)")
-                fiber = get_nutrient_value(nutrients, "Fiber")
-                sugar = get_nutrient_value(nutrients, "Sugar")
-                
-                print(f"Extracted sugar value: {sugar}")
-                
-                # Normalize to per 100g if values seem too high
-                # This handles cases where the API returns values per 1000g instead of 100g
-                if calories > 900 or protein > 100 or carbs > 100 or fats > 100:
-                    calories /= 10
-                    protein /= 10
-                    carbs /= 10
-                    fats /= 10
-                    fiber /= 10
-                    sugar /= 10
-                    print(f"Normalized sugar value: {sugar}")
-                
-                return {
-                    "name": food_name,
-                    "brand": "Generic",
-                    "serving_size": 100.0,  # Always store per 100g in database
-                    "calories": calories,
-                    "protein": protein,
-                    "carbohydrates": carbs,
-                    "fats": fats,
-                    "fiber": fiber,
-                    "sugar": sugar,
-                    "price": 5.00,  # Default price, update manually
-                    "store": "Local Grocery",
-                    "price_per_unit": 5.00
-                }
-            else:
-                print(f"Failed to fetch {food_name}: {response.status}")
-                return None
+        # One pass over foodNutrients, normalized to per 100g
+        nutrients = extract_nutrients(food.get("foodNutrients", []), normalize=True)
+        if nutrients["calories"] is None:
+            nutrients["calories"] = 0.0
+        
+        return {
+            "name": food_name,
+            "brand": "Generic",
+            "serving_size": 100.0,  # Always store per 100g in database
+            **nutrients,
+            "price": 5.00,  # Default price, update manually
+            "store": "Local Grocery",
+            "price_per_unit": 5.00,
+            "food_group": classify_food(food_name, _fdc_category(food)),
+        }
     except Exception as e:
         print(f"Error processing {food_name}: {str(e)}")
         return None
@@ -215,64 +151,41 @@ async def get_usda_foods():
         "Raisins": "168165"
     }
     
-    API_KEY = "hiaHEVhgwW2Z9PxFrp2KYsJyVScvXeOYUdDBkx03"
+    API_KEY = os.getenv("FDC_API_KEY", "hiaHEVhgwW2Z9PxFrp2KYsJyVScvXeOYUdDBkx03")
     
-    async with aiohttp.ClientSession() as session:
+    # The client bounds concurrency and request rate, so gathering everything is safe
+    async with FdcClient(API_KEY) as client:
         tasks = [
-            fetch_food_data(session, food_name, fdc_id, API_KEY)
+            fetch_food_data(client, food_name, fdc_id)
             for food_name, fdc_id in common_foods.items()
         ]
         foods_data = await asyncio.gather(*tasks)
+        stats = client.stats
+        print(f"\nFetched {len(tasks)} foods: {stats['cached']} from cache, "
+              f"{stats['revalidated']} revalidated, {stats['network']} requests, {stats['retries']} retries")
+        for failure in client.failures:
+            print(f"Gave up on FDC id {failure['fdc_id']}: {failure['error']}")
         return [food for food in foods_data if food is not None]
 
 def import_foods():
     """Import foods into the database and update existing ones with missing values."""
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    session = SessionLocal()
     
     try:
-        # Get all existing foods
-        existing_foods = {food.name: food for food in session.query(FoodItem).all()}
         foods = asyncio.run(get_usda_foods())
         
-        new_foods = []
-        updated_count = 0
-        
-        for food_data in foods:
-            food_name = food_data["name"]
-            if food_name in existing_foods:
-                # Update existing food if it has any null values
-                existing_food = existing_foods[food_name]
-                updated = False
-                
-                # Check each nutrient field and update if null
-                nutrient_fields = ['sugar', 'fiber', 'protein', 'carbohydrates', 'fats', 'calories']
-                for field in nutrient_fields:
-                    current_value = getattr(existing_food, field)
-                    new_value = food_data.get(field)
-                    if (current_value is None or current_value == 0) and new_value:
-                        setattr(existing_food, field, new_value)
-                        updated = True
-                
-                if updated:
-                    print(f"Updating {food_name} with missing nutrient values")
-                    updated_count += 1
-            else:
-                # Add new food
-                food_item = FoodItem(**food_data)
-                new_foods.append(food_item)
-                print(f"Adding new food: {food_data['name']}")
+        # Only the incoming rows are touched: new foods are inserted and null
+        # or zero nutrients on existing ones are filled in, one statement per batch
+        changed = 0
+        for batch in chunked(foods, 1000):
+            changed += fill_food_rows(session, batch)
+        # Tell running API processes to drop their cached catalog
+        bump_catalog_version(session)
+        session.commit()
         
-        if new_foods:
-            session.bulk_save_objects(new_foods)
-        
-        if updated_count > 0 or new_foods:
-            session.commit()
+        if changed:
             print(f"\nSummary:")
-            if new_foods:
-                print(f"- Added {len(new_foods)} new foods")
-            if updated_count > 0:
-                print(f"- Updated {updated_count} existing foods with missing values")
+            print(f"- Added or filled in {changed} of {len(foods)} fetched foods")
         else:
             print("\nNo changes needed - all foods are up to date!")
         
@@ -282,7 +195,263 @@ def import_foods():
     finally:
         session.close()
 
+def _food_from_fdc(
+    name: str, brand: str, nutrients: Dict[str, Optional[float]], category: Optional[str] = None
+) -> Optional[Dict]:
+    """Build a food row from extracted per-100g nutrients.
+
+    Returns None for foods without any energy value, which are mostly
+    incomplete records.
+    """
+    if nutrients["calories"] is None:
+        return None
+    return {
+        "name": name,
+        "brand": brand,
+        "serving_size": 100.0,  # FDC bulk amounts are already per 100g
+        **nutrients,
+        "price": 5.00,  # Default price, update manually
+        "store": "Local Grocery",
+        "price_per_unit": 5.00,
+        "food_group": classify_food(name, category),
+    }
+
+class FdcArchive:
+    """Read access to an FDC bulk download: a .zip, an extracted directory or a .json file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.isdir(path):
+            self.members = [
+                os.path.relpath(os.path.join(root, name), path)
+                for root, _, names in os.walk(path) for name in names
+            ]
+            self.zip = None
+        elif zipfile.is_zipfile(path):
+            self.zip = zipfile.ZipFile(path)
+            self.members = self.zip.namelist()
+        else:
+            self.zip = None
+            self.members = [os.path.basename(path)]
+            self.path = os.path.dirname(path) or "."
+
+    def find(self, filename: str) -> Optional[str]:
+        return next((m for m in self.members if os.path.basename(m) == filename), None)
+
+    def open_text(self, member: str):
+        if self.zip is not None:
+            return io.TextIOWrapper(self.zip.open(member), encoding="utf-8", newline="")
+        return open(os.path.join(self.path, member), encoding="utf-8", newline="")
+
+    def is_csv(self) -> bool:
+        return self.find("food.csv") is not None
+
+def _iter_csv(archive: FdcArchive, filename: str) -> Iterator[Dict[str, str]]:
+    member = archive.find(filename)
+    if member is None:
+        return
+    with archive.open_text(member) as f:
+        yield from csv.DictReader(f)
+
+def _group_by_fdc_id(rows: Iterator[Dict[str, str]], filename: str):
+    """Group consecutive rows by fdc_id, insisting on ascending order so joins can stream."""
+    last = None
+    for fdc_id, group in itertools.groupby(rows, key=lambda row: int(row["fdc_id"])):
+        if last is not None and fdc_id <= last:
+            raise ValueError(f"{filename} is not sorted by fdc_id ({fdc_id} after {last})")
+        last = fdc_id
+        yield fdc_id, list(group)
+
+def _merge_join(fdc_id: int, stream, pending):
+    """Advance a grouped stream to fdc_id and return that food's rows.
+
+    pending is a one-element list holding the group read ahead from stream.
+    """
+    while pending[0] is not None and pending[0][0] < fdc_id:
+        pending[0] = next(stream, None)
+    if pending[0] is not None and pending[0][0] == fdc_id:
+        return pending[0][1]
+    return []
+
+def iter_fdc_csv_foods(archive: FdcArchive, data_types: Optional[List[str]] = None):
+    """Yield food rows from the CSV download, joining nutrients to foods in one forward pass.
+
+    food.csv, food_nutrient.csv and branded_food.csv are all ordered by
+    fdc_id, so only one food's nutrients are held in memory at a time.
+    The category tables are small and loaded whole.
+    """
+    # food_category_id points into food_category.csv, or for survey foods into the WWEIA table
+    categories = {row["id"]: row["description"] for row in _iter_csv(archive, "food_category.csv")}
+    wweia_categories = {
+        row["wweia_food_category"]: row["wweia_food_category_description"]
+        for row in _iter_csv(archive, "wweia_food_category.csv")
+    }
+    nutrients = _group_by_fdc_id(_iter_csv(archive, "food_nutrient.csv"), "food_nutrient.csv")
+    branded = _group_by_fdc_id(_iter_csv(archive, "branded_food.csv"), "branded_food.csv")
+    pending_nutrients = [next(nutrients, None)]
+    pending_branded = [next(branded, None)]
+
+    last = None
+    for row in _iter_csv(archive, "food.csv"):
+        fdc_id = int(row["fdc_id"])
+        if last is not None and fdc_id <= last:
+            raise ValueError(f"food.csv is not sorted by fdc_id ({fdc_id} after {last})")
+        last = fdc_id
+        food_nutrients = _merge_join(fdc_id, nutrients, pending_nutrients)
+        brand_rows = _merge_join(fdc_id, branded, pending_branded)
+        if data_types and row["data_type"] not in data_types:
+            yield None
+            continue
+
+        values = extract_from_entries(
+            (int(nutrient["nutrient_id"]), nutrient["amount"] or None, "")
+            for nutrient in food_nutrients
+        )
+        brand = "Generic"
+        category_id = row.get("food_category_id")
+        if row["data_type"] == "survey_fndds_food":
+            category = wweia_categories.get(category_id)
+        else:
+            category = categories.get(category_id)
+        if brand_rows:
+            brand = brand_rows[0].get("brand_name") or brand_rows[0].get("brand_owner") or brand
+            category = brand_rows[0].get("branded_food_category") or category
+        yield _food_from_fdc(row["description"], brand, values, category)
+
+_JSON_SEPARATORS = re.compile(r"[\s,]*")
+
+def _iter_json_array(stream, chunk_size: int = 1 << 20):
+    """Yield the elements of the first JSON array in a text stream, one at a time."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while "[" not in buffer:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        buffer += chunk
+    buffer = buffer[buffer.index("[") + 1:]
+    pos = 0
+    while True:
+        pos = _JSON_SEPARATORS.match(buffer, pos).end()
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            if pos == len(buffer):
+                raise json.JSONDecodeError("Need more data", buffer, pos)
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                raise
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            continue
+        yield item
+
+# JSON "dataType" values mapped to the CSV data_type names used on the command line
+_JSON_DATA_TYPES = {
+    "Foundation": "foundation_food",
+    "SR Legacy": "sr_legacy_food",
+    "Survey (FNDDS)": "survey_fndds_food",
+    "Branded": "branded_food",
+    "Experimental": "experimental_food",
+}
+
+def iter_fdc_json_foods(archive: FdcArchive, data_types: Optional[List[str]] = None, page_size: int = 1000):
+    """Yield food rows from the JSON download without loading the file whole."""
+    for member in archive.members:
+        if not member.endswith(".json"):
+            continue
+        with archive.open_text(member) as f:
+            for page in chunked(_iter_json_array(f), page_size):
+                columns = extract_nutrient_columns(page)
+                for i, food in enumerate(page):
+                    if data_types and _JSON_DATA_TYPES.get(food.get("dataType")) not in data_types:
+                        yield None
+                        continue
+                    nutrients = {
+                        field: values[i] if values[i] == values[i] else None  # NaN means unknown
+                        for field, values in columns.items()
+                    }
+                    brand = food.get("brandName") or food.get("brandOwner") or "Generic"
+                    yield _food_from_fdc(food.get("description", ""), brand, nutrients, _fdc_category(food))
+
+def _load_checkpoint(path: str, archive_path: str) -> Dict:
+    if os.path.exists(path):
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("archive") == os.path.abspath(archive_path):
+            return checkpoint
+    return {"archive": os.path.abspath(archive_path), "position": 0, "inserted": 0, "skipped": 0}
+
+def _save_checkpoint(path: str, checkpoint: Dict):
+    # Write then rename so a crash never leaves a half-written checkpoint
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def import_fdc_archive(
+    archive_path: str,
+    data_types: Optional[List[str]] = None,
+    batch_size: int = 10000,
+    checkpoint_path: Optional[str] = None,
+    restart: bool = False,
+):
+    """Import foods from a local FDC bulk download, resuming from the last checkpoint.
+
+    Foods already in the catalog (by name and brand) only get missing
+    nutrients filled in, so replaying a batch after a crash is harmless.
+    """
+    archive = FdcArchive(archive_path)
+    checkpoint_path = checkpoint_path or archive_path.rstrip(os.sep) + ".checkpoint.json"
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = _load_checkpoint(checkpoint_path, archive_path)
+    if checkpoint["position"]:
+        print(f"Resuming after {checkpoint['position']} foods")
+
+    foods = iter_fdc_csv_foods(archive, data_types) if archive.is_csv() else iter_fdc_json_foods(archive, data_types)
+    positioned = enumerate(foods, start=1)
+    # Foods up to the checkpoint are still parsed (the join has to stream past them) but not written
+    positioned = itertools.dropwhile(lambda item: item[0] <= checkpoint["position"], positioned)
+
+    session = SessionLocal()
+    try:
+        for batch in chunked(positioned, batch_size):
+            rows = [food for _, food in batch if food is not None]
+            written = fill_food_rows(session, rows)
+            bump_catalog_version(session)
+            session.commit()
+            checkpoint["position"] = batch[-1][0]
+            checkpoint["inserted"] += written
+            checkpoint["skipped"] += len(batch) - len(rows)
+            _save_checkpoint(checkpoint_path, checkpoint)
+            print(f"Processed {checkpoint['position']} foods ({checkpoint['inserted']} added or filled)")
+    finally:
+        session.close()
+
+    print(f"\nSummary:")
+    print(f"- Processed {checkpoint['position']} foods from {archive_path}")
+    print(f"- Added or filled in {checkpoint['inserted']} foods, skipped {checkpoint['skipped']} without energy data or of other types")
+    # A finished import needs no checkpoint; re-running it only fills what's missing
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
 if __name__ == "__main__":
-    print("Starting USDA food import and update...")
-    import_foods()
+    parser = argparse.ArgumentParser(description="Import foods from USDA FoodData Central")
+    parser.add_argument("--fdc-archive", help="Local FDC bulk download (zipped CSV or JSON) to import offline")
+    parser.add_argument("--data-type", action="append", dest="data_types",
+                        help="Only import this FDC data_type, e.g. sr_legacy_food (repeatable)")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <archive>.checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any checkpoint and start over")
+    args = parser.parse_args()
+
+    if args.fdc_archive:
+        print(f"Starting offline FDC import from {args.fdc_archive}...")
+        import_fdc_archive(args.fdc_archive, args.data_types, args.batch_size, args.checkpoint, args.restart)
+    else:
+        print("Starting USDA food import and update...")
+        import_foods()
     print("Import/update complete!") 
\ No newline at end of file
@@ -0,0 +1,36 @@
+import sys
+import os
+
+# Add the parent directory to the Python path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from sqlalchemy import func
+
+from app.database import SessionLocal
+from app.models.daily_nutrition import DailyNutrition
+from app.rollups import rebuild_daily_nutrition
+
+def rebuild():
+    """Recompute the daily_nutrition rollup from every meal plan in one transaction.
+
+    The API routes, price feeds and imports keep it current as they write;
+    this is for a rollup changed or lost outside them (a manual UPDATE, a
+    restored backup).
+    """
+    session = SessionLocal()
+    try:
+        rebuild_daily_nutrition(session)
+        session.commit()
+        days, rows = session.query(
+            func.count(func.distinct(DailyNutrition.day)), func.count()
+        ).select_from(DailyNutrition).one()
+        print(f"Rebuilt daily nutrition: {rows} rows over {days} days")
+    except Exception as e:
+        print(f"Error rebuilding daily nutrition: {str(e)}")
+        session.rollback()
+        sys.exit(1)
+    finally:
+        session.close()
+
+if __name__ == "__main__":
+    rebuild()
@@ -1,61 +1,144 @@
+import argparse
+import csv
+import json
 import sys
 import os
+import time
+
+import numpy as np
 
 # Add the parent directory to the Python path so we can import our app modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from sqlalchemy import select
+
 from app.models.food_item import FoodItem
 from app.database import SessionLocal
 
-def verify_foods():
-    """Verify nutritional data for all foods in the database."""
+CHUNK_SIZE = 50000
+# Offending ids kept per rule; counts are always exact
+DEFAULT_MAX_IDS = 1000
+
+COLUMNS = ("id", "calories", "protein", "carbohydrates", "fats", "fiber", "sugar", "price", "serving_size")
+
+
+def _out_of_range(field, low, high):
+    # NaN (NULL) compares False both ways, so unknown values never fail a range check
+    return lambda c: (c[field] < low) | (c[field] > high)
+
+
+def _calorie_mismatch(c):
+    # 4 kcal/g protein, 4 kcal/g carbs, 9 kcal/g fat; allow for rounding
+    calculated = c["protein"] * 4 + c["carbohydrates"] * 4 + c["fats"] * 9
+    return np.abs(calculated - c["calories"]) > 20
+
+
+# (rule, description, chunk columns -> boolean mask of failing rows)
+RULES = [
+    ("missing_calories", "calories is NULL", lambda c: np.isnan(c["calories"])),
+    ("missing_macros", "protein, carbohydrates or fats is NULL",
+     lambda c: np.isnan(c["protein"]) | np.isnan(c["carbohydrates"]) | np.isnan(c["fats"])),
+    ("calories_range", "calories outside 0-900 kcal per 100g", _out_of_range("calories", 0, 900)),
+    ("protein_range", "protein outside 0-100g", _out_of_range("protein", 0, 100)),
+    ("carbohydrates_range", "carbohydrates outside 0-100g", _out_of_range("carbohydrates", 0, 100)),
+    ("fats_range", "fats outside 0-100g", _out_of_range("fats", 0, 100)),
+    ("fiber_range", "fiber outside 0-50g", _out_of_range("fiber", 0, 50)),
+    ("sugar_range", "sugar outside 0-100g", _out_of_range("sugar", 0, 100)),
+    ("sugar_over_carbohydrates", "sugar exceeds carbohydrates", lambda c: c["sugar"] > c["carbohydrates"]),
+    ("macro_sum", "protein + carbohydrates + fats over 100g",
+     lambda c: c["protein"] + c["carbohydrates"] + c["fats"] > 100),
+    ("calorie_mismatch", "calories differ from 4/4/9 Atwater estimate by more than 20 kcal", _calorie_mismatch),
+    ("price_range", "price is not positive", lambda c: ~(c["price"] > 0)),
+    ("serving_size_range", "serving_size is not positive", lambda c: ~(c["serving_size"] > 0)),
+]
+
+
+def iter_chunks(session, chunk_size=CHUNK_SIZE):
+    """Yield the catalog as {column: float64 array} chunks, NaN for NULL.
+
+    stream_results uses a server-side cursor, so memory stays bounded
+    by chunk_size regardless of the table size.
+    """
+    table = FoodItem.__table__
+    result = session.connection().execution_options(stream_results=True).execute(
+        select(*(table.c[name] for name in COLUMNS))
+    )
+    for partition in result.partitions(chunk_size):
+        # Plain tuples: numpy probes Row objects for array protocols, which is slow
+        data = np.array(list(map(tuple, partition)), dtype=np.float64)
+        yield {name: data[:, i] for i, name in enumerate(COLUMNS)}
+
+
+def validate(session, chunk_size=CHUNK_SIZE, max_ids=DEFAULT_MAX_IDS):
+    """Run every rule over the catalog and return the report dict."""
+    counts = {rule: 0 for rule, _, _ in RULES}
+    ids = {rule: [] for rule, _, _ in RULES}
+    checked = failed = 0
+    with np.errstate(invalid="ignore"):
+        for chunk in iter_chunks(session, chunk_size):
+            any_failed = np.zeros(len(chunk["id"]), dtype=bool)
+            for rule, _, check in RULES:
+                mask = check(chunk)
+                any_failed |= mask
+                counts[rule] += int(np.count_nonzero(mask))
+                room = max_ids - len(ids[rule])
+                if room > 0:
+                    ids[rule].extend(chunk["id"][mask][:room].astype(np.int64).tolist())
+            checked += len(chunk["id"])
+            failed += int(np.count_nonzero(any_failed))
+
+    return {
+        "checked": checked,
+        "failed": failed,
+        "rules": [
+            {"rule": rule, "description": description, "count": counts[rule], "ids": ids[rule]}
+            for rule, description, _ in RULES
+        ],
+    }
+
+
+def write_report(report, out, fmt):
+    if fmt == "json":
+        json.dump(report, out, indent=2)
+        out.write("\n")
+    else:
+        # One line per offending id, plus a summary line per failing rule
+        writer = csv.writer(out)
+        writer.writerow(["rule", "count", "food_id"])
+        for entry in report["rules"]:
+            if entry["count"]:
+                writer.writerow([entry["rule"], entry["count"], ""])
+                writer.writerows([entry["rule"], "", food_id] for food_id in entry["ids"])
+
+
+def verify_foods(fmt="json", output=None, chunk_size=CHUNK_SIZE, max_ids=DEFAULT_MAX_IDS):
+    """Validate nutritional data for all foods; returns 1 if any rule fails."""
     session = SessionLocal()
     try:
-        foods = session.query(FoodItem).all()
-        print(f"\nVerifying {len(foods)} foods:")
-        print("-" * 80)
-        print(f"{'Name':<30} {'Cal':<8} {'Pro':<8} {'Carb':<8} {'Fat':<8} {'Fiber':<8}")
-        print("-" * 80)
-        
-        for food in foods:
-            # Basic sanity checks
-            issues = []
-            
-            # Check for realistic calorie values (0-900 kcal per 100g)
-            if not 0 <= food.calories <= 900:
-                issues.append(f"Unusual calories: {food.calories:.1f}")
-            
-            # Check macronutrient ranges
-            if not 0 <= food.protein <= 100:
-                issues.append(f"Unusual protein: {food.protein:.1f}g")
-            if not 0 <= food.carbohydrates <= 100:
-                issues.append(f"Unusual carbs: {food.carbohydrates:.1f}g")
-            if not 0 <= food.fats <= 100:
-                issues.append(f"Unusual fats: {food.fats:.1f}g")
-            if not 0 <= food.fiber <= 50:
-                issues.append(f"Unusual fiber: {food.fiber:.1f}g")
-            
-            # Check if macronutrients sum is reasonable (should be less than 100g per 100g)
-            macro_sum = food.protein + food.carbohydrates + food.fats
-            if macro_sum > 100:
-                issues.append(f"High macro sum: {macro_sum:.1f}g")
-            
-            # Verify calorie calculation (4 kcal/g protein, 4 kcal/g carbs, 9 kcal/g fat)
-            calculated_calories = (food.protein * 4) + (food.carbohydrates * 4) + (food.fats * 9)
-            calorie_diff = abs(calculated_calories - food.calories)
-            if calorie_diff > 20:  # Allow for some rounding differences
-                issues.append(f"Calorie mismatch: reported={food.calories:.1f}, calculated={calculated_calories:.1f}")
-            
-            # Print food data
-            print(f"{food.name:<30} {food.calories:<8.1f} {food.protein:<8.1f} {food.carbohydrates:<8.1f} {food.fats:<8.1f} {food.fiber:<8.1f}")
-            
-            # Print any issues found
-            if issues:
-                print("  ⚠️  " + ", ".join(issues))
-                print()
-        
+        started = time.perf_counter()
+        report = validate(session, chunk_size, max_ids)
+        elapsed = time.perf_counter() - started
     finally:
         session.close()
 
+    if output:
+        with open(output, "w", newline="") as f:
+            write_report(report, f, fmt)
+    else:
+        write_report(report, sys.stdout, fmt)
+
+    print(f"Checked {report['checked']} foods in {elapsed:.2f}s, {report['failed']} with issues", file=sys.stderr)
+    for entry in report["rules"]:
+        if entry["count"]:
+            print(f"  {entry['rule']}: {entry['count']}", file=sys.stderr)
+    return 1 if report["failed"] else 0
+
 if __name__ == "__main__":
-    verify_foods() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Validate the food catalog (exits 1 when any rule fails)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", help="Write the report here instead of stdout")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-ids", type=int, default=DEFAULT_MAX_IDS,
+                        help="Offending ids to list per rule (counts are always complete)")
+    args = parser.parse_args()
+    sys.exit(verify_foods(args.format, args.output, args.chunk_size, args.max_ids))
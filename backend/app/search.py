@@ -0,0 +1,266 @@
+import os
+import re
+import threading
+from typing import List
+
+import numpy as np
+from sqlalchemy import func, literal
+from sqlalchemy.orm import Session
+
+from .cache import catalog_version, on_external_catalog_change
+from .models.food_item import FoodItem
+
+# "auto" searches with pg_trgm on PostgreSQL and the in-process index
+# elsewhere; "memory" always uses the in-process index.
+SEARCH_MODE = os.getenv("SEARCH_MODE", "auto")
+# Share of the query's trigrams a name must contain to count as a match
+MIN_SIMILARITY = 0.4
+# Candidates re-ranked in Python per query
+CANDIDATES_PER_RESULT = 10
+
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str, prefix: bool = False) -> set:
+    """pg_trgm style trigrams: each word padded with two leading spaces and one trailing.
+
+    With prefix, the last word is left open so "chick" matches "chicken".
+    """
+    words = normalize(text).split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f"  {word}" if prefix and i == len(words) - 1 else f"  {word} "
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+# Normalized names only contain these, so a trigram packs into 16 bits (37**3 < 2**16)
+_ALPHABET = " 0123456789abcdefghijklmnopqrstuvwxyz"
+_CODES = np.zeros(256, dtype=np.int64)
+_CODES[np.frombuffer(_ALPHABET.encode(), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+_BASE = len(_ALPHABET)
+
+
+def _gram_code(gram: str) -> int:
+    return (_ALPHABET.index(gram[0]) * _BASE + _ALPHABET.index(gram[1])) * _BASE + _ALPHABET.index(gram[2])
+
+
+class NgramIndex:
+    """Trigram inverted index over food names for typo-tolerant autocomplete.
+
+    Postings are int32 arrays of positions into `ids`, so scoring a query
+    is one concatenate + bincount over the postings of its trigrams.
+    Names added after the build go to small per-trigram lists alongside;
+    a renamed or deleted food's old position is just marked dead.
+    """
+
+    def __init__(self, rows):
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = [normalize(row[1]) for row in rows]
+        self.lengths = np.array([len(row[1]) for row in rows], dtype=np.int32)
+        self.live = np.ones(len(self.ids), dtype=bool)
+        self.positions = {food_id: i for i, food_id in enumerate(self.ids.tolist())}
+        self.added = {}
+        self.dead = 0
+        self.lock = threading.Lock()
+
+        # Pad every word the way trigrams() does and lay all names end to end;
+        # the trigrams of the whole buffer are then computed in one pass.
+        padded = ["".join(f"  {word} " for word in name.split()) for name in self.names]
+        text = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8)
+        docs = np.repeat(np.arange(len(padded), dtype=np.int64), [len(p) for p in padded])
+        chars = _CODES[text]
+        codes = (chars[:-2] * _BASE + chars[1:-1]) * _BASE + chars[2:]
+        # Windows ending in two spaces straddle words (or names) and aren't real trigrams
+        valid = (chars[1:-1] != 0) | (chars[2:] != 0)
+        codes, docs = codes[valid].astype(np.uint16), docs[:-2][valid]
+        # A stable sort on 16-bit codes is a radix sort and keeps each posting in doc order
+        order = np.argsort(codes, kind="stable")
+        grams, docs = codes[order], docs[order]
+        # Drop trigrams repeated within a name
+        first = np.ones(len(grams), dtype=bool)
+        first[1:] = (grams[1:] != grams[:-1]) | (docs[1:] != docs[:-1])
+        grams, docs = grams[first], docs[first]
+        bounds = np.flatnonzero(np.diff(grams)) + 1
+        self.postings = dict(zip(
+            grams[np.concatenate(([0], bounds))].tolist() if len(grams) else [],
+            np.split(docs.astype(np.int32), bounds),
+        ))
+
+    def _grow(self):
+        capacity = max(len(self.ids) * 2, 1024)
+        self.ids = np.resize(self.ids, capacity)
+        self.lengths = np.resize(self.lengths, capacity)
+        self.live = np.resize(self.live, capacity)
+
+    def _drop(self, food_id: int):
+        position = self.positions.pop(food_id, None)
+        if position is not None:
+            self.live[position] = False
+            self.dead += 1
+
+    def upsert(self, food_id: int, name: str):
+        with self.lock:
+            position = self.positions.get(food_id)
+            if position is not None and self.names[position] == normalize(name):
+                return
+            self._drop(food_id)
+            position = len(self.names)
+            if position == len(self.ids):
+                self._grow()
+            self.ids[position] = food_id
+            self.lengths[position] = len(name)
+            self.live[position] = True
+            self.names.append(normalize(name))
+            self.positions[food_id] = position
+            for gram in trigrams(name):
+                self.added.setdefault(_gram_code(gram), []).append(position)
+
+    def remove(self, food_id: int):
+        with self.lock:
+            self._drop(food_id)
+
+    def needs_rebuild(self) -> bool:
+        """Whether enough names died that the postings are mostly waste."""
+        return self.dead > max(1000, len(self.names) // 4)
+
+    def search(self, query: str, limit: int) -> List[int]:
+        """Ids of the best matches: prefix matches first, then substrings, then by similarity."""
+        needle = normalize(query)
+        grams = trigrams(query, prefix=True)
+        codes = [_gram_code(gram) for gram in grams]
+        with self.lock:
+            postings = [self.postings[code] for code in codes if code in self.postings]
+            postings += [np.array(self.added[code], dtype=np.int32) for code in codes if code in self.added]
+            if not needle or not postings:
+                return []
+            size = len(self.names)
+            shared = np.bincount(np.concatenate(postings), minlength=size)
+            similarity = np.where(self.live[:size], shared / len(grams), 0)
+            return self._rank(needle, similarity, limit)
+
+    def _rank(self, needle: str, similarity, limit: int) -> List[int]:
+        candidates = np.flatnonzero(similarity >= MIN_SIMILARITY)
+        keep = limit * CANDIDATES_PER_RESULT
+        if len(candidates) > keep:
+            # Shorter names first among equals, as they're the closer completions
+            score = similarity[candidates] - self.lengths[candidates] * 1e-6
+            candidates = candidates[np.argpartition(-score, keep)[:keep]]
+
+        def rank(doc):
+            name = self.names[doc]
+            return (
+                not name.startswith(needle),
+                needle not in name,
+                -similarity[doc],
+                self.lengths[doc],
+                self.ids[doc],
+            )
+
+        return [int(self.ids[doc]) for doc in sorted(candidates.tolist(), key=rank)[:limit]]
+
+
+_index = None
+# One build at a time; searches arriving during it wait rather than build their own
+_index_lock = threading.Lock()
+# While a build runs: the writes made meanwhile, replayed onto the new index
+# before it's published, and whether a reset has made the build stale
+_pending = None
+_stale = False
+_changes_lock = threading.Lock()
+
+
+def _search_index(db: Session) -> NgramIndex:
+    """The process-wide index, built once from the database on first use."""
+    global _index, _pending, _stale
+    # Resets the index (through the listener below) if another process changed the catalog
+    catalog_version(db)
+    with _index_lock:
+        while True:
+            with _changes_lock:
+                if _index is not None and not _index.needs_rebuild():
+                    return _index
+                _pending, _stale = [], False
+            built = NgramIndex(db.query(FoodItem.id, FoodItem.name).all())
+            with _changes_lock:
+                if not _stale:
+                    # Writes committed after the read above aren't in it
+                    for food_id, name in _pending:
+                        if name is None:
+                            built.remove(food_id)
+                        else:
+                            built.upsert(food_id, name)
+                    _index, _pending = built, None
+                    return built
+            # Reset during the build, e.g. by a bulk change: its read may be out of date
+
+
+def index_name(food: FoodItem):
+    """Reflect a created or renamed food in the index, if it has been built."""
+    with _changes_lock:
+        if _pending is not None:
+            _pending.append((food.id, food.name))
+        index = _index
+    if index is not None:
+        index.upsert(food.id, food.name)
+
+
+def unindex_name(food_id: int):
+    with _changes_lock:
+        if _pending is not None:
+            _pending.append((food_id, None))
+        index = _index
+    if index is not None:
+        index.remove(food_id)
+
+
+def reset_search_index():
+    """Drop the index after bulk changes; it's rebuilt on next use."""
+    global _index, _stale
+    with _changes_lock:
+        _index = None
+        if _pending is not None:
+            _stale = True
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_database(db: Session, query: str, limit: int) -> List[FoodItem]:
+    # Every predicate is on lower(name) so ix_food_items_name_trgm serves them all
+    needle = query.lower()
+    name = func.lower(FoodItem.name)
+    escaped = _escape_like(needle)
+    is_prefix = name.like(f"{escaped}%", escape="\\")
+    is_substring = name.like(f"%{escaped}%", escape="\\")
+    similarity = func.word_similarity(needle, name)
+    return (
+        db.query(FoodItem)
+        .filter(is_substring | literal(needle).op("<%")(name))
+        .order_by(
+            is_prefix.desc(), is_substring.desc(), similarity.desc(),
+            func.length(FoodItem.name), FoodItem.id,
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def search_foods(db: Session, query: str, limit: int) -> List[FoodItem]:
+    """Typo-tolerant prefix/substring search over food names, best match first."""
+    if SEARCH_MODE != "memory" and db.get_bind().dialect.name == "postgresql":
+        return _search_database(db, query, limit)
+
+    ids = _search_index(db).search(query, limit)
+    if not ids:
+        return []
+    found = {item.id: item for item in db.query(FoodItem).filter(FoodItem.id.in_(ids))}
+    return [found[item_id] for item_id in ids if item_id in found]
+
+
+on_external_catalog_change(reset_search_index)
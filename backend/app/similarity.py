@@ -0,0 +1,134 @@
+import threading
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .cache import catalog_version, on_external_catalog_change
+from .models.food_item import FoodItem
+
+# Per-100g nutrients compared by /food-items/{id}/similar
+PROFILE = ("calories", "protein", "carbohydrates", "fats", "fiber", "sugar")
+
+
+class SimilarityIndex:
+    """Normalized float32 nutrient profiles of the catalog, one row per food.
+
+    Each nutrient is scaled by the catalog's mean and standard deviation
+    when the index is built, so they weigh alike in the distance. Unknown
+    fiber/sugar sit at the mean. Rows are updated in place as foods change;
+    deletes move the last row into the gap.
+    """
+
+    def __init__(self, foods):
+        raw = np.array([[getattr(food, name) for name in PROFILE] for food in foods], dtype=np.float64)
+        raw = raw.reshape(-1, len(PROFILE))
+        with np.errstate(invalid="ignore"):
+            self.mean = np.nan_to_num(np.nanmean(raw, axis=0)) if len(raw) else np.zeros(len(PROFILE))
+            std = np.nan_to_num(np.nanstd(raw, axis=0)) if len(raw) else np.ones(len(PROFILE))
+        self.scale = np.where(std > 0, std, 1.0)
+
+        capacity = max(len(raw), 1024)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.prices = np.zeros(capacity, dtype=np.float32)
+        self.profiles = np.zeros((capacity, len(PROFILE)), dtype=np.float32)
+        self.size = len(raw)
+        self.ids[:self.size] = [food.id for food in foods]
+        self.prices[:self.size] = [food.price_per_unit for food in foods]
+        self.profiles[:self.size] = self._normalize(raw)
+        self.positions = {food_id: i for i, food_id in enumerate(self.ids[:self.size].tolist())}
+        self.lock = threading.Lock()
+
+    def _normalize(self, raw):
+        return np.nan_to_num((raw - self.mean) / self.scale)
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        self.ids = np.resize(self.ids, capacity)
+        self.prices = np.resize(self.prices, capacity)
+        self.profiles = np.resize(self.profiles, (capacity, len(PROFILE)))
+
+    def upsert(self, food):
+        raw = np.array([getattr(food, name) for name in PROFILE], dtype=np.float64)
+        with self.lock:
+            position = self.positions.get(food.id)
+            if position is None:
+                if self.size == len(self.ids):
+                    self._grow()
+                position = self.size
+                self.size += 1
+                self.positions[food.id] = position
+                self.ids[position] = food.id
+            self.prices[position] = food.price_per_unit
+            self.profiles[position] = self._normalize(raw)
+
+    def remove(self, food_id: int):
+        with self.lock:
+            position = self.positions.pop(food_id, None)
+            if position is None:
+                return
+            last = self.size - 1
+            if position != last:
+                self.ids[position] = self.ids[last]
+                self.prices[position] = self.prices[last]
+                self.profiles[position] = self.profiles[last]
+                self.positions[int(self.ids[position])] = position
+            self.size = last
+
+    def nearest(self, food_id: int, k: int, cheaper: bool = False) -> Optional[List[int]]:
+        """Ids of the k closest profiles, nearest first; None if food_id isn't indexed."""
+        with self.lock:
+            position = self.positions.get(food_id)
+            if position is None:
+                return None
+            difference = self.profiles[:self.size] - self.profiles[position]
+            distances = np.einsum("ij,ij->i", difference, difference)
+            if cheaper:
+                candidates = self.prices[:self.size] < self.prices[position]
+            else:
+                candidates = np.ones(self.size, dtype=bool)
+            candidates[position] = False
+
+            matches = np.flatnonzero(candidates)
+            if len(matches) > k:
+                matches = matches[np.argpartition(distances[matches], k)[:k]]
+            matches = matches[np.argsort(distances[matches], kind="stable")]
+            return self.ids[matches].tolist()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def similarity_index(db: Session) -> SimilarityIndex:
+    """The process-wide index, built from the database on first use."""
+    global _index
+    # Resets the index (through the listener below) if another process changed the catalog
+    catalog_version(db)
+    with _index_lock:
+        if _index is None:
+            columns = [getattr(FoodItem, name) for name in PROFILE]
+            _index = SimilarityIndex(db.query(FoodItem.id, FoodItem.price_per_unit, *columns).all())
+        return _index
+
+
+def index_food(food: FoodItem):
+    """Reflect a created or updated food in the index, if it has been built."""
+    if _index is not None:
+        _index.upsert(food)
+
+
+def unindex_food(food_id: int):
+    if _index is not None:
+        _index.remove(food_id)
+
+
+def reset_similarity_index():
+    """Drop the index after bulk changes; it's rebuilt on next use."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+# Changes made by scripts or other workers never reach index_food/unindex_food
+on_external_catalog_change(reset_similarity_index)
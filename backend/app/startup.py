@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+import random
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from .database import Base, async_engine, engine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# How the schema is trusted at startup:
+#   alembic     check once that the database is at the migrations' head revision
+#   create_all  create missing tables from the models (local SQLite databases)
+#   none        assume it's right
+#   auto        create_all on SQLite, alembic elsewhere
+SCHEMA_MODE = os.getenv("SCHEMA_MODE", "auto")
+# Comma-separated hot paths to warm before reporting ready:
+#   statements  run the common reads once, filling SQLAlchemy's compiled cache and the pools
+#   catalog     build the cached catalog aggregates and in-process indexes
+PREWARM = [name.strip() for name in os.getenv("PREWARM", "").split(",") if name.strip()]
+# Backoff between attempts while the database is unreachable, with jitter so a
+# rolling restart's workers don't retry in lockstep
+STARTUP_RETRY_SECONDS = float(os.getenv("STARTUP_RETRY_SECONDS", "1"))
+STARTUP_RETRY_MAX_SECONDS = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", "30"))
+
+log = logging.getLogger("app.startup")
+
+STATEMENT_PATHS = [
+    "/food-items/?limit=1",
+    "/food-items/?limit=1&format=columnar&fields=name",
+    "/food-items/0",
+    "/meal-plans/?limit=1",
+    "/meal-plans/0",
+    "/nutrition/daily",
+]
+CATALOG_PATHS = [
+    "/food-items/metrics",
+    "/food-items/stats",
+    "/food-items/groups/summary",
+    "/food-items/search?q=a",
+    "/food-items/0/similar",
+]
+
+
+class SchemaMismatch(Exception):
+    pass
+
+
+def _alembic_heads():
+    """Head revisions of the migration scripts, or None when alembic isn't installed."""
+    try:
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+    except ImportError:
+        return None
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def check_schema() -> str:
+    """Verify (or create) the schema over one connection; returns what was done."""
+    mode = SCHEMA_MODE
+    if mode == "auto":
+        mode = "create_all" if engine.dialect.name == "sqlite" else "alembic"
+    with engine.connect() as connection:
+        if mode == "create_all":
+            Base.metadata.create_all(bind=connection)
+            connection.commit()
+            return "created"
+        if mode == "none":
+            connection.execute(text("SELECT 1"))
+            return "unchecked"
+
+        # A missing revision table is a schema problem, not an outage, so it isn't retried
+        if not inspect(connection).has_table("alembic_version"):
+            raise SchemaMismatch("database has no alembic_version table; run alembic upgrade head")
+        current = set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+    heads = _alembic_heads()
+    if heads is None:
+        return f"at {', '.join(sorted(current))} (alembic not installed, head not checked)"
+    if current != heads:
+        raise SchemaMismatch(
+            f"database is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"code expects {', '.join(sorted(heads))}; run alembic upgrade head"
+        )
+    return f"at head {', '.join(sorted(heads))}"
+
+
+async def prewarm(app, names):
+    """Request the hot read paths once in-process, so the first real requests don't pay for them."""
+    paths = []
+    if "statements" in names:
+        paths += STATEMENT_PATHS
+    if "catalog" in names:
+        paths += CATALOG_PATHS
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://prewarm") as client:
+        for path in paths:
+            # 404s are fine: the route, its statements and the pool still got exercised
+            await client.get(path)
+    if "catalog" in names:
+        from .database import SessionLocal
+        from .optimizer import food_matrix
+
+        def build_matrix():
+            with SessionLocal() as db:
+                food_matrix(db)
+
+        await run_in_threadpool(build_matrix)
+
+
+async def _start(app):
+    readiness = app.state.readiness
+    delay = STARTUP_RETRY_SECONDS
+    while True:
+        try:
+            readiness["schema"] = await run_in_threadpool(check_schema)
+            readiness["database"] = "ok"
+            break
+        except SchemaMismatch as e:
+            # Retrying won't help until the database is migrated and this worker restarted
+            readiness["database"] = "ok"
+            readiness["schema"] = str(e)
+            log.error("Schema check failed: %s", e)
+            return
+        except (DBAPIError, OSError) as e:
+            readiness["database"] = f"unavailable: {str(getattr(e, 'orig', None) or e).strip()}"
+            log.warning("Database not reachable, retrying in %.1fs: %s", delay, readiness["database"])
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+
+    if PREWARM:
+        readiness["prewarm"] = "running"
+        try:
+            await prewarm(app, PREWARM)
+            readiness["prewarm"] = f"done ({', '.join(PREWARM)})"
+        except Exception as e:
+            # A cold cache is slower, not broken
+            readiness["prewarm"] = f"failed: {e}"
+            log.warning("Prewarm failed: %s", e)
+    app.state.ready = True
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Start accepting connections at once; check the database and prewarm in the background.
+
+    Nothing touches the database at import time, so a worker boots even
+    while the database is down and reports it through /ready instead.
+    """
+    app.state.ready = False
+    app.state.readiness = {"database": "pending", "schema": "pending", "prewarm": "off" if not PREWARM else "pending"}
+    task = asyncio.create_task(_start(app))
+    try:
+        yield
+    finally:
+        task.cancel()
+        await async_engine.dispose()
+        engine.dispose()
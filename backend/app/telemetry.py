@@ -0,0 +1,198 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+# Off by default; when off neither the middleware nor the engine listeners
+# are installed, so requests pay nothing for it
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+# Statements slower than this are logged to "app.sql.slow"; 0 logs none
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Requests running more statements than this are logged, which is how N+1 loads show up
+QUERY_COUNT_WARNING = int(os.getenv("QUERY_COUNT_WARNING", "50"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+slow_query_log = logging.getLogger("app.sql.slow")
+request_log = logging.getLogger("app.requests")
+
+
+class RequestStats:
+    """SQL work done on behalf of one request."""
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware; sync routes and run_sync see it too, as the
+# threadpool and greenlets run in a copy of the request's context
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_sql_stats", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in Prometheus' shape."""
+
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_lock = threading.Lock()
+_request_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", LATENCY_BUCKETS,
+)
+_request_statements = Histogram(
+    "http_request_sql_statements", "SQL statements executed per request, by route.", STATEMENT_BUCKETS,
+)
+_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in SQL per request, by route.", LATENCY_BUCKETS,
+)
+_totals = {"statements": 0, "db_seconds": 0.0, "slow": 0}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+    slow = SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS
+    with _lock:
+        _totals["statements"] += 1
+        _totals["db_seconds"] += elapsed
+        _totals["slow"] += bool(slow)
+    if slow:
+        slow_query_log.warning("Slow query (%.1f ms): %s", elapsed * 1000, " ".join(statement.split())[:2000])
+
+
+def _on_error(context):
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine):
+    """Count and time every statement run through engine (sync or the sync side of an async one)."""
+    engine = getattr(engine, "sync_engine", engine)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+
+def _route_template(scope) -> str:
+    """The matched route's path ("/food-items/{item_id}"), so labels stay few."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return "unmatched"
+    templates = getattr(app.state, "route_templates", None)
+    if templates is None:
+        templates = app.state.route_templates = {
+            getattr(route, "endpoint", None): route.path for route in app.routes
+        }
+    return templates.get(endpoint, "unmatched")
+
+
+class RequestMetricsMiddleware:
+    """Record latency and SQL work per request, and report them in a Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'app;dur={elapsed:.1f}, '
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries"'
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - started
+            labels = (scope["method"], _route_template(scope), str(status))
+            with _lock:
+                _request_seconds.observe(labels, elapsed)
+                _request_statements.observe(labels[:2], stats.statements)
+                _request_db_seconds.observe(labels[:2], stats.db_seconds)
+            if stats.statements > QUERY_COUNT_WARNING:
+                request_log.warning(
+                    "%s %s ran %d SQL statements (%.1f ms in the database)",
+                    scope["method"], scope["path"], stats.statements, stats.db_seconds * 1000,
+                )
+
+
+def render_metrics() -> str:
+    """Everything recorded so far, in the Prometheus text exposition format."""
+    with _lock:
+        lines = _request_seconds.render(("method", "route", "status"))
+        lines += _request_statements.render(("method", "route"))
+        lines += _request_db_seconds.render(("method", "route"))
+        lines += [
+            "# HELP sql_statements_total SQL statements executed.",
+            "# TYPE sql_statements_total counter",
+            f"sql_statements_total {_totals['statements']}",
+            "# HELP sql_seconds_total Time spent executing SQL.",
+            "# TYPE sql_seconds_total counter",
+            f"sql_seconds_total {_totals['db_seconds']}",
+            f"# HELP sql_slow_statements_total Statements slower than {SLOW_QUERY_MS:g} ms.",
+            "# TYPE sql_slow_statements_total counter",
+            f"sql_slow_statements_total {_totals['slow']}",
+        ]
+    return "\n".join(lines) + "\n"
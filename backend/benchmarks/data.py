@@ -0,0 +1,145 @@
+"""Synthetic, seeded data for the benchmarks: catalogs, meal plans and script fixtures.
+
+Everything is generated from a numpy Generator, so the same seed gives
+byte-identical catalogs, fixtures and request sequences across runs.
+"""
+import csv
+import io
+import zipfile
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List
+
+import numpy as np
+
+from app.food_groups import FOOD_GROUPS
+
+ADJECTIVES = [
+    "organic", "roasted", "smoked", "raw", "frozen", "canned", "baked", "grilled", "fresh", "dried",
+    "spicy", "sweet", "salted", "unsalted", "low fat", "whole", "sliced", "ground", "crunchy", "creamy",
+]
+NOUNS = [
+    "chicken breast", "salmon", "tofu", "lentils", "oatmeal", "almonds", "broccoli", "banana", "yogurt",
+    "cheddar", "rice", "quinoa", "spinach", "black beans", "peanut butter", "turkey", "pasta", "apple",
+    "sweet potato", "cottage cheese", "tuna", "granola", "chickpeas", "blueberries", "kale", "bread",
+]
+BRANDS = ["Generic", "Acme", "Green Valley", "Harvest", "Nature's Best", "Store Brand", "Prairie", None]
+STORES = ["Local Grocery", "Fresh Market", "Bulk Barn", "Corner Store"]
+MEAL_TYPES = ["Breakfast", "Lunch", "Dinner", "Snack"]
+
+# Search prefixes and typos the search scenario cycles through
+SEARCH_QUERIES = [
+    "chick", "chiken", "salm", "lent", "oat", "almnd", "broc", "banan", "yog", "ched", "quin",
+    "spin", "blak bean", "peanut", "turk", "swet pot", "cottage", "granol", "blueb", "roasted alm",
+]
+
+
+def food_rows(count: int, seed: int) -> Iterator[List[Dict]]:
+    """Yield the catalog as lists of 10k row dicts shaped like FOOD_COLUMNS."""
+    rng = np.random.default_rng(seed)
+    chunk = 10000
+    for start in range(0, count, chunk):
+        n = min(chunk, count - start)
+        adjectives = rng.integers(len(ADJECTIVES), size=n)
+        nouns = rng.integers(len(NOUNS), size=n)
+        brands = rng.integers(len(BRANDS), size=n)
+        stores = rng.integers(len(STORES), size=n)
+        groups = rng.integers(len(FOOD_GROUPS), size=n)
+        protein = rng.uniform(0, 35, n).round(1)
+        carbohydrates = rng.uniform(0, 80, n).round(1)
+        fats = rng.uniform(0, 40, n).round(1)
+        fiber = rng.uniform(0, 12, n).round(1)
+        sugar = rng.uniform(0, 30, n).round(1)
+        # Mostly consistent with the macros, with some noise for verify_foods to find
+        calories = (protein * 4 + carbohydrates * 4 + fats * 9) * rng.normal(1, 0.08, n)
+        price = rng.uniform(0.3, 15, n).round(2)
+        missing_fiber = rng.random(n) < 0.1
+        yield [
+            {
+                "name": f"{ADJECTIVES[adjectives[i]]} {NOUNS[nouns[i]]} {start + i}",
+                "brand": BRANDS[brands[i]],
+                "serving_size": 100.0,
+                "calories": float(max(calories[i], 0)),
+                "protein": float(protein[i]),
+                "carbohydrates": float(carbohydrates[i]),
+                "fats": float(fats[i]),
+                "fiber": None if missing_fiber[i] else float(fiber[i]),
+                "sugar": float(sugar[i]),
+                "price": float(price[i]),
+                "store": STORES[stores[i]],
+                "food_group": FOOD_GROUPS[groups[i]],
+                "price_per_unit": float(price[i]),
+            }
+            for i in range(n)
+        ]
+
+
+def meal_plans(count: int, food_count: int, seed: int, days: int = 365):
+    """Yield (plan row, food rows) pairs spread over the `days` before today."""
+    rng = np.random.default_rng(seed + 1)
+    today = datetime.combine(date.today(), datetime.min.time())
+    for i in range(count):
+        sizes = int(rng.integers(2, 8))
+        food_ids = rng.integers(1, food_count + 1, size=sizes)
+        quantities = rng.uniform(0.25, 3, size=sizes).round(2)
+        meal_types = rng.integers(len(MEAL_TYPES), size=sizes)
+        plan = {
+            "name": f"plan {i}",
+            "date": today - timedelta(days=int(rng.integers(days)), minutes=int(rng.integers(1440))),
+        }
+        foods = [
+            {"food_item_id": int(food_ids[j]), "quantity": float(quantities[j]), "meal_type": MEAL_TYPES[meal_types[j]]}
+            for j in range(sizes)
+        ]
+        yield plan, foods
+
+
+def fdc_archive(count: int, seed: int) -> bytes:
+    """A zipped FDC CSV download of `count` foods for import_usda_foods --fdc-archive."""
+    rng = np.random.default_rng(seed + 2)
+    categories = ["Poultry Products", "Dairy and Egg Products", "Vegetables and Vegetable Products",
+                  "Fruits and Fruit Juices", "Legumes and Legume Products", "Cereal Grains and Pasta"]
+    nutrient_ids = [1008, 1003, 1005, 1004, 1079, 2000]
+
+    def table(header, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        writer.writerows(rows)
+        return buffer.getvalue()
+
+    foods, nutrients, branded = [], [], []
+    for i in range(count):
+        fdc_id = 100000 + i
+        data_type = "branded_food" if i % 3 == 0 else "sr_legacy_food"
+        foods.append([fdc_id, data_type, f"FDC {NOUNS[i % len(NOUNS)]} {i}", 1 + i % len(categories)])
+        amounts = rng.uniform(0, 50, size=len(nutrient_ids)).round(2)
+        amounts[0] *= 10
+        nutrients.extend([fdc_id, nutrient_id, amount] for nutrient_id, amount in zip(nutrient_ids, amounts))
+        if data_type == "branded_food":
+            branded.append([fdc_id, BRANDS[i % (len(BRANDS) - 1)], "", "Snacks"])
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("FoodData_Central/food.csv", table(["fdc_id", "data_type", "description", "food_category_id"], foods))
+        z.writestr("FoodData_Central/food_nutrient.csv", table(["fdc_id", "nutrient_id", "amount"], nutrients))
+        z.writestr("FoodData_Central/branded_food.csv",
+                   table(["fdc_id", "brand_name", "brand_owner", "branded_food_category"], branded))
+        z.writestr("FoodData_Central/food_category.csv",
+                   table(["id", "code", "description"], [[i + 1, "", name] for i, name in enumerate(categories)]))
+    return archive.getvalue()
+
+
+def price_feed(count: int, food_count: int, seed: int) -> str:
+    """A CSV price feed for fix_food_data, matching `count` seeded foods by name and brand."""
+    rng = np.random.default_rng(seed + 3)
+    wanted = set(rng.choice(food_count, size=min(count, food_count), replace=False).tolist())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["name", "brand", "store", "price"])
+    position = 0
+    for rows in food_rows(food_count, seed):
+        for row in rows:
+            if position in wanted:
+                writer.writerow([row["name"], row["brand"] or "", rng.choice(STORES), round(float(rng.uniform(0.3, 15)), 2)])
+            position += 1
+    return buffer.getvalue()
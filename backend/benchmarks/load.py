@@ -0,0 +1,231 @@
+"""Concurrent request scenarios for every food item, meal plan and nutrition route."""
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from app.food_groups import FOOD_GROUPS
+from app.pagination import encode_cursor
+
+from . import data
+
+COLUMNAR_FIELDS = "name,calories,protein,price,protein_per_dollar"
+SORTS = ["id", "calories", "-protein", "price", "-protein_per_dollar", "name"]
+BULK_ROWS = 500
+BULK_PLANS = 20
+
+
+class Scenario:
+    """One route under load.
+
+    request(i, rng, ctx) returns (method, url, httpx keyword arguments) for
+    the i-th request; ctx is shared between scenarios so writes can act on
+    what earlier ones created. weight scales the run's request count, for
+    routes too slow to call hundreds of times.
+    """
+
+    def __init__(self, name: str, request: Callable, weight: float = 1.0,
+                 on_response: Optional[Callable] = None):
+        self.name = name
+        self.request = request
+        self.weight = weight
+        self.on_response = on_response
+
+
+def _collect(key):
+    def on_response(response, ctx):
+        if response.status_code < 400:
+            body = response.json()
+            ctx.setdefault(key, []).extend(item["id"] for item in (body if isinstance(body, list) else [body]))
+    return on_response
+
+
+def _new_food(name: str, rng) -> Dict:
+    protein, carbohydrates, fats = rng.uniform(0, 30, 3).round(1).tolist()
+    return {
+        "name": name,
+        "brand": "Bench",
+        "calories": protein * 4 + carbohydrates * 4 + fats * 9,
+        "protein": protein,
+        "carbohydrates": carbohydrates,
+        "fats": fats,
+        "price": round(float(rng.uniform(0.5, 10)), 2),
+        "store": "Local Grocery",
+    }
+
+
+def _new_plan(name: str, rng, ctx) -> Dict:
+    return {
+        "name": name,
+        "foods": [
+            {
+                "food_id": int(rng.integers(1, ctx["rows"] + 1)),
+                "quantity": round(float(rng.uniform(0.25, 3)), 2),
+                "meal_type": data.MEAL_TYPES[int(rng.integers(len(data.MEAL_TYPES)))],
+            }
+            for _ in range(int(rng.integers(2, 6)))
+        ],
+    }
+
+
+def _pop(ctx, key):
+    """Take one id created by an earlier scenario (0, a 404, once they run out)."""
+    ids = ctx.get(key)
+    return ids.pop() if ids else 0
+
+
+def scenarios() -> List[Scenario]:
+    """Reads first, while the caches reflect the seeded catalog, then writes."""
+    rows = lambda ctx: ctx["rows"]
+    plans = lambda ctx: ctx["plans"]
+    food_id = lambda rng, ctx: int(rng.integers(1, rows(ctx) + 1))
+    plan_id = lambda rng, ctx: int(rng.integers(1, plans(ctx) + 1))
+    today = date.today()
+
+    def cursor_page(i, rng, ctx):
+        after = food_id(rng, ctx)
+        return "GET", f"/food-items/?limit=100&cursor={encode_cursor({'sort': 'id', 'value': after, 'id': after})}", {}
+
+    def daily(i, rng, ctx):
+        start = today - timedelta(days=int(rng.integers(365)))
+        return "GET", f"/nutrition/daily?from={start}&to={start + timedelta(days=29)}", {}
+
+    return [
+        Scenario("GET /food-items/ (filtered page)", lambda i, rng, ctx: (
+            "GET", f"/food-items/?limit=100&sort={SORTS[i % len(SORTS)]}&min_calories={int(rng.integers(500))}", {},
+        )),
+        Scenario("GET /food-items/ (cursor page)", cursor_page),
+        Scenario("GET /food-items/ (columnar)", lambda i, rng, ctx: (
+            "GET", f"/food-items/?limit=1000&format=columnar&fields={COLUMNAR_FIELDS}"
+                   f"&food_group={FOOD_GROUPS[i % len(FOOD_GROUPS)]}&min_protein={int(rng.integers(20))}", {},
+        )),
+        Scenario("GET /food-items/{id}", lambda i, rng, ctx: ("GET", f"/food-items/{food_id(rng, ctx)}", {})),
+        Scenario("GET /food-items/metrics", lambda i, rng, ctx: ("GET", "/food-items/metrics", {})),
+        Scenario("GET /food-items/stats", lambda i, rng, ctx: ("GET", "/food-items/stats", {})),
+        Scenario("GET /food-items/groups/summary", lambda i, rng, ctx: (
+            "GET", f"/food-items/groups/summary?store={data.STORES[i % len(data.STORES)]}", {},
+        ), weight=0.2),
+        Scenario("GET /food-items/search", lambda i, rng, ctx: (
+            "GET", f"/food-items/search?q={data.SEARCH_QUERIES[int(rng.integers(len(data.SEARCH_QUERIES)))]}", {},
+        )),
+        Scenario("GET /food-items/{id}/similar", lambda i, rng, ctx: (
+            "GET", f"/food-items/{food_id(rng, ctx)}/similar?k=10&cheaper={'true' if i % 2 else 'false'}", {},
+        )),
+        Scenario("GET /meal-plans/", lambda i, rng, ctx: (
+            "GET", f"/meal-plans/?limit=50&cursor={encode_cursor({'id': plan_id(rng, ctx)})}", {},
+        )),
+        Scenario("GET /meal-plans/{id}", lambda i, rng, ctx: ("GET", f"/meal-plans/{plan_id(rng, ctx)}", {})),
+        Scenario("GET /nutrition/daily", daily),
+        Scenario("POST /meal-plans/optimize", lambda i, rng, ctx: ("POST", "/meal-plans/optimize", {"json": {
+            "min_protein": int(rng.integers(50, 150)),
+            "min_calories": 1800,
+            "max_calories": 2600,
+            "min_fiber": 25,
+            "step_grams": 50 if i % 2 else None,
+        }}), weight=0.1),
+        Scenario("POST /food-items/", lambda i, rng, ctx: (
+            "POST", "/food-items/", {"json": _new_food(f"bench food {ctx['run']} {i}", rng)},
+        ), on_response=_collect("foods")),
+        Scenario("PUT /food-items/{id}", lambda i, rng, ctx: (
+            "PUT", f"/food-items/{ctx['foods'][i % len(ctx['foods'])] if ctx.get('foods') else 0}",
+            {"json": _new_food(f"bench food {ctx['run']} updated {i}", rng)},
+        )),
+        Scenario("PATCH /food-items/{id}", lambda i, rng, ctx: (
+            "PATCH", f"/food-items/{food_id(rng, ctx)}", {"json": {"price": round(float(rng.uniform(0.5, 10)), 2)}},
+        )),
+        Scenario("PATCH /food-items/ (bulk)", lambda i, rng, ctx: ("PATCH", "/food-items/", {"json": {
+            "ids": [int(food_id) for food_id in rng.integers(1, rows(ctx) + 1, BULK_ROWS)],
+            "changes": {"price": round(float(rng.uniform(0.5, 10)), 2)},
+        }}), weight=0.1),
+        Scenario("DELETE /food-items/{id}", lambda i, rng, ctx: ("DELETE", f"/food-items/{_pop(ctx, 'foods')}", {})),
+        Scenario("POST /food-items/bulk", lambda i, rng, ctx: ("POST", "/food-items/bulk?format=ndjson", {
+            "content": "\n".join(
+                json.dumps(_new_food(f"bench bulk {ctx['run']} {i} {j}", rng)) for j in range(BULK_ROWS)
+            ),
+        }), weight=0.1),
+        Scenario("POST /meal-plans/", lambda i, rng, ctx: (
+            "POST", "/meal-plans/", {"json": _new_plan(f"bench plan {i}", rng, ctx)},
+        ), on_response=_collect("plans_created")),
+        Scenario("POST /meal-plans/bulk", lambda i, rng, ctx: (
+            "POST", "/meal-plans/bulk", {"json": [_new_plan(f"bench bulk plan {i}", rng, ctx) for _ in range(BULK_PLANS)]},
+        ), weight=0.2),
+        Scenario("DELETE /meal-plans/{id}", lambda i, rng, ctx: (
+            "DELETE", f"/meal-plans/{_pop(ctx, 'plans_created')}", {},
+        )),
+    ]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """Throughput and latency percentiles (ms) of one scenario."""
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0, 0, 0)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0,
+        "mean_ms": float(ms.mean()) if len(ms) else 0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()) if len(ms) else 0,
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, total: int,
+                       concurrency: int, ctx: Dict, seed: int) -> Dict:
+    rng = np.random.default_rng(seed)
+    count = max(1, int(total * scenario.weight))
+    # Built up front so request generation stays out of the timings
+    requests = [scenario.request(i, rng, ctx) for i in range(count)]
+    latencies, statuses = [], {}
+    errors = 0
+    position = 0
+
+    async def worker():
+        nonlocal position, errors
+        while position < len(requests):
+            method, url, kwargs = requests[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                latencies.append(time.perf_counter() - started)
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+            if scenario.on_response:
+                scenario.on_response(response, ctx)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    result["statuses"] = {str(status): n for status, n in sorted(statuses.items())}
+    return result
+
+
+async def run_load(app, base_url: Optional[str], ctx: Dict, total: int, concurrency: int,
+                   seed: int, only: Optional[str] = None, log=print) -> Dict:
+    """Run every scenario in order against the app in-process, or a server at base_url."""
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=120)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120)
+    results = {}
+    async with client:
+        for number, scenario in enumerate(scenarios()):
+            if only and only not in scenario.name:
+                continue
+            result = await run_scenario(client, scenario, total, concurrency, ctx, seed + number)
+            results[scenario.name] = result
+            log(f"  {scenario.name:<36} {result['throughput']:8.1f} req/s  "
+                f"p50 {result['p50_ms']:7.1f}ms  p95 {result['p95_ms']:7.1f}ms  "
+                f"p99 {result['p99_ms']:7.1f}ms  errors {result['errors']}")
+    return results
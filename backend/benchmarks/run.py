@@ -0,0 +1,278 @@
+"""Benchmark the API routes and the maintenance scripts on synthetic catalogs.
+
+Run from backend/:
+
+    python -m benchmarks.run run --sizes 10000 100000 1000000 --output results.json
+    python -m benchmarks.run compare baseline.json results.json --threshold 0.2
+
+Each catalog size runs in its own process against its own database. By
+default that's a SQLite file. It is seeded once per (size, plans, seed),
+kept under the cache directory, and copied fresh for every run, so writes
+never leak between runs. Pass --database-url to use PostgreSQL instead;
+that database's tables are dropped and reseeded for every size. Pass --url
+to drive a running server, which must use the same database, instead of
+the app in-process.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "nutrition-tracker", "benchmarks")
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+# Fixture sizes for the script timings
+IMPORT_FOODS = 20000
+FEED_ROWS = 10000
+
+# Metrics compared against a baseline: (key, True if higher is worse)
+ROUTE_METRICS = [("p50_ms", True), ("p95_ms", True), ("p99_ms", True), ("throughput", False)]
+
+
+def _log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_script(args, env):
+    """Run one maintenance script as its CLI would be run; returns seconds and exit code."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    result = {"seconds": time.perf_counter() - started, "exit_code": completed.returncode}
+    if completed.returncode not in (0, 1):
+        result["stderr"] = completed.stderr[-2000:]
+    return result
+
+
+def time_scripts(workdir, rows, seed):
+    from . import data
+
+    archive = os.path.join(workdir, "fdc.zip")
+    with open(archive, "wb") as f:
+        f.write(data.fdc_archive(IMPORT_FOODS, seed))
+    feed = os.path.join(workdir, "prices.csv")
+    with open(feed, "w", newline="") as f:
+        f.write(data.price_feed(FEED_ROWS, rows, seed))
+
+    env = dict(os.environ)
+    results = {}
+    # verify_foods exits 1 when it finds issues, which the synthetic catalog has on purpose
+    for name, args in [
+        ("verify_foods", ["app/scripts/verify_foods.py", "--output", os.devnull]),
+        ("fix_food_data", ["app/scripts/fix_food_data.py", feed]),
+        ("import_usda_foods", ["app/scripts/import_usda_foods.py", "--fdc-archive", archive, "--restart"]),
+        ("rebuild_daily_nutrition", ["app/scripts/rebuild_daily_nutrition.py"]),
+    ]:
+        results[name] = _time_script(args, env)
+        _log(f"  {name:<36} {results[name]['seconds']:8.2f}s  exit {results[name]['exit_code']}")
+    results["import_usda_foods"]["foods"] = IMPORT_FOODS
+    results["fix_food_data"]["feed_rows"] = FEED_ROWS
+    return results
+
+
+def worker(args):
+    """Benchmark one catalog size; DATABASE_URL is already set by the parent process."""
+    from .seed import seed_database
+
+    result = {"rows": args.rows, "meal_plans": args.meal_plans}
+    if args.seed_only or not args.seeded:
+        _log(f"Seeding {args.rows} foods and {args.meal_plans} meal plans...")
+        result["seed"] = seed_database(args.rows, args.meal_plans, args.seed)
+        if args.seed_only:
+            return result
+
+    from app.main import app
+    from .load import run_load
+
+    _log(f"Load: {args.requests} requests per route, concurrency {args.concurrency}")
+    ctx = {"rows": args.rows, "plans": args.meal_plans, "run": int(time.time())}
+    result["routes"] = asyncio.run(run_load(
+        app, args.url, ctx, args.requests, args.concurrency, args.seed, args.only, log=_log,
+    ))
+    if not args.skip_scripts:
+        _log("Scripts:")
+        with tempfile.TemporaryDirectory() as workdir:
+            result["scripts"] = time_scripts(workdir, args.rows, args.seed)
+    return result
+
+
+def _spawn_worker(args, rows, database_url, output, extra):
+    command = [
+        sys.executable, "-m", "benchmarks.run", "worker",
+        "--rows", str(rows), "--meal-plans", str(args.meal_plans), "--seed", str(args.seed),
+        "--requests", str(args.requests), "--concurrency", str(args.concurrency),
+        "--output", output, *extra,
+    ]
+    if args.url:
+        command += ["--url", args.url]
+    if args.only:
+        command += ["--only", args.only]
+    if args.skip_scripts:
+        command.append("--skip-scripts")
+    env = {**os.environ, "DATABASE_URL": database_url}
+    env.pop("ASYNC_DATABASE_URL", None)
+    subprocess.run(command, cwd=BACKEND_DIR, env=env, check=True)
+    with open(output) as f:
+        return json.load(f)
+
+
+def run(args):
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "postgresql" if args.database_url else "sqlite",
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "meal_plans": args.meal_plans,
+        },
+        "sizes": {},
+    }
+    os.makedirs(args.cache_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            _log(f"\n== {rows} foods ==")
+            output = os.path.join(workdir, f"{rows}.json")
+            if args.database_url:
+                result = _spawn_worker(args, rows, args.database_url, output, [])
+            else:
+                # Seed a pristine copy once, then benchmark a scratch copy of it
+                pristine = os.path.join(args.cache_dir, f"catalog-{rows}-{args.meal_plans}-{args.seed}.db")
+                seeding = {}
+                if args.reseed or not os.path.exists(pristine):
+                    if os.path.exists(pristine):
+                        os.remove(pristine)
+                    seeding = _spawn_worker(args, rows, f"sqlite:///{pristine}", output, ["--seed-only"])
+                scratch = os.path.join(workdir, f"catalog-{rows}.db")
+                shutil.copyfile(pristine, scratch)
+                result = _spawn_worker(args, rows, f"sqlite:///{scratch}", output, ["--seeded"])
+                if "seed" in seeding:
+                    result["seed"] = seeding["seed"]
+            results["sizes"][str(rows)] = result
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    _log(f"\nWrote {args.output}")
+
+
+def _changes(baseline, current, threshold, min_delta_ms):
+    """(label, metric, baseline, current, change, regressed) for every comparable number."""
+    for size, base_size in baseline["sizes"].items():
+        size_result = current["sizes"].get(size)
+        if size_result is None:
+            continue
+        for route, base in base_size.get("routes", {}).items():
+            now = size_result.get("routes", {}).get(route)
+            if now is None:
+                continue
+            for metric, higher_is_worse in ROUTE_METRICS:
+                old, new = base[metric], now[metric]
+                if not old:
+                    continue
+                change = (new - old) / old
+                if higher_is_worse:
+                    # Sub-millisecond moves are noise, however large in relative terms
+                    regressed = change > threshold and new - old >= min_delta_ms
+                else:
+                    regressed = change < -threshold
+                yield f"{size} {route}", metric, old, new, change, regressed
+            if now["errors"] > base["errors"]:
+                yield f"{size} {route}", "errors", base["errors"], now["errors"], None, True
+        for script, base in base_size.get("scripts", {}).items():
+            now = size_result.get("scripts", {}).get(script)
+            if now is None:
+                continue
+            old, new = base["seconds"], now["seconds"]
+            change = (new - old) / old if old else 0
+            yield f"{size} {script}", "seconds", old, new, change, change > threshold and new - old >= min_delta_ms / 1000
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions = 0
+    for label, metric, old, new, change, regressed in _changes(baseline, current, args.threshold, args.min_delta_ms):
+        regressions += regressed
+        if regressed or args.verbose:
+            change_text = f"{change:+.1%}" if change is not None else ""
+            print(f"{'REGRESSION' if regressed else 'ok':<10} {label:<52} {metric:<10} "
+                  f"{old:10.2f} -> {new:10.2f} {change_text}")
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the nutrition tracker API and scripts")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def load_options(command):
+        command.add_argument("--meal-plans", type=int, default=20000)
+        command.add_argument("--requests", type=int, default=500, help="Requests per route (scaled down for slow ones)")
+        command.add_argument("--concurrency", type=int, default=16)
+        command.add_argument("--seed", type=int, default=42)
+        command.add_argument("--url", help="Drive a running server here instead of the app in-process")
+        command.add_argument("--only", help="Only run routes whose name contains this")
+        command.add_argument("--skip-scripts", action="store_true")
+
+    run_parser = commands.add_parser("run", help="Seed, benchmark and write results JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Catalog sizes")
+    run_parser.add_argument("--database-url", help="Benchmark this (PostgreSQL) database; its tables are dropped")
+    run_parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Where seeded SQLite catalogs are kept")
+    run_parser.add_argument("--reseed", action="store_true", help="Regenerate cached SQLite catalogs")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    load_options(run_parser)
+
+    worker_parser = commands.add_parser("worker", help=argparse.SUPPRESS)
+    worker_parser.add_argument("--rows", type=int, required=True)
+    worker_parser.add_argument("--output", required=True)
+    worker_parser.add_argument("--seed-only", action="store_true")
+    worker_parser.add_argument("--seeded", action="store_true", help="The database is already seeded")
+    load_options(worker_parser)
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions against a baseline results file")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative change (0.2 = 20%%)")
+    compare_parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                                help="Ignore latency increases smaller than this")
+    compare_parser.add_argument("--verbose", action="store_true", help="Print every metric, not just regressions")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        run(args)
+    elif args.command == "worker":
+        result = worker(args)
+        with open(args.output, "w") as f:
+            json.dump(result, f)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
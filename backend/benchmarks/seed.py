@@ -0,0 +1,62 @@
+"""Create and fill a benchmark database through the app's own engine and bulk paths."""
+import time
+
+from sqlalchemy import text
+
+from app.cache import bump_catalog_version
+from app.database import Base, SessionLocal, engine
+from app.ingest import upsert_food_rows
+from app.models import catalog_version, daily_nutrition, food_item, food_price, meal_plan  # noqa: F401 -- registers the tables
+from app.models.meal_plan import MealPlan, meal_plan_foods
+from app.rollups import rebuild_daily_nutrition
+
+from . import data
+
+PLAN_CHUNK = 5000
+
+
+def seed_database(rows: int, plans: int, seed: int) -> dict:
+    """Recreate every table and load `rows` foods and `plans` meal plans; returns timings."""
+    timings = {}
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        # COPY on PostgreSQL, batched INSERT ... ON CONFLICT elsewhere, as /food-items/bulk does
+        for chunk in data.food_rows(rows, seed):
+            upsert_food_rows(session, chunk)
+            session.commit()
+        timings["foods_seconds"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        # Fresh table, so ids can be assigned up front and the food rows inserted alongside
+        plan_rows, food_rows = [], []
+        for plan_id, (plan, foods) in enumerate(data.meal_plans(plans, rows, seed), start=1):
+            plan_rows.append({"id": plan_id, **plan})
+            food_rows.extend({"meal_plan_id": plan_id, **food} for food in foods)
+            if len(plan_rows) >= PLAN_CHUNK:
+                session.execute(MealPlan.__table__.insert(), plan_rows)
+                session.execute(meal_plan_foods.insert(), food_rows)
+                plan_rows, food_rows = [], []
+        if plan_rows:
+            session.execute(MealPlan.__table__.insert(), plan_rows)
+            session.execute(meal_plan_foods.insert(), food_rows)
+        if engine.dialect.name == "postgresql":
+            session.execute(text(
+                "SELECT setval(pg_get_serial_sequence('meal_plans', 'id'), GREATEST(MAX(id), 1)) FROM meal_plans"
+            ))
+        rebuild_daily_nutrition(session)
+        # Running API processes (with --url) drop their caches
+        bump_catalog_version(session)
+        session.commit()
+        timings["meal_plans_seconds"] = time.perf_counter() - started
+    finally:
+        session.close()
+
+    with engine.connect() as connection:
+        # Fresh planner statistics, as a long-lived database would have
+        connection.execute(text("ANALYZE"))
+        connection.commit()
+    return timings
@@ -1,13 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import food_items
-from app.database import engine
-from app.models import food_item
+from app.startup import lifespan
 
-# Create database tables
-food_item.Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="Nutrition Tracker API")
+app = FastAPI(title="Nutrition Tracker API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -16,6 +12,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # Include routers
@@ -0,0 +1,69 @@
+"""The app against a throwaway SQLite database, recreated for every test."""
+import os
+import tempfile
+import time
+
+import pytest
+
+# Read by app.database at import, so set before any test imports the app
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='nutrition-tests-'), 'test.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["ENV_FILE"] = os.devnull
+os.environ["SCHEMA_MODE"] = "create_all"
+os.environ["PREWARM"] = ""
+
+FOOD = {
+    "name": "Broccoli, raw",
+    "serving_size": 100,
+    "calories": 34,
+    "protein": 2.8,
+    "carbohydrates": 6.6,
+    "fats": 0.4,
+    "fiber": 2.6,
+    "sugar": 1.7,
+    "price": 2.49,
+    "store": "Local Grocery",
+}
+
+
+def food(**changes):
+    """A valid create payload; FOOD with changes applied."""
+    return {**FOOD, **changes}
+
+
+@pytest.fixture
+def db():
+    from app import cache
+    from app.database import Base, SessionLocal, engine
+    from app.main import app  # noqa: F401 -- registers every table
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    # Catalog versions restart with the database, so in-process state can't tell
+    # a new database from an unchanged one; reset it by hand
+    cache._external_change()
+    cache._seen_version = None
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        while test_client.get("/ready").status_code != 200:
+            time.sleep(0.01)
+        yield test_client
+
+
+@pytest.fixture
+def broccoli(db):
+    from app.models.food_item import FoodItem
+
+    item = FoodItem(**FOOD, price_per_unit=FOOD["price"], food_group="vegetables")
+    db.add(item)
+    db.commit()
+    return item
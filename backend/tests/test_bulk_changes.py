@@ -0,0 +1,105 @@
+"""PATCH and DELETE on /food-items/ (bulk) and PATCH /food-items/{id}."""
+import pytest
+
+from app.schemas.food_item import BULK_MAX_IDS
+
+from conftest import food
+
+
+@pytest.fixture
+def ids(client):
+    """Four foods at two stores, returned as {name: id}."""
+    rows = [
+        food(name="Broccoli, raw"),
+        food(name="Kale, raw", store="Corner Shop"),
+        food(name="Oats", store="Corner Shop", price=1.0),
+        food(name="Lentils", price=1.5),
+    ]
+    return {row["name"]: client.post("/food-items/", json=row).json()["id"] for row in rows}
+
+
+def result(response):
+    """A bulk response with its ids sorted, as RETURNING gives no order."""
+    body = response.json()
+    return {**body, "ids": sorted(body["ids"])}
+
+
+def catalog(client):
+    return {item["name"]: item for item in client.get("/food-items/").json()}
+
+
+def test_bulk_patch_by_ids(client, ids):
+    response = client.patch("/food-items/", json={
+        "ids": [ids["Broccoli, raw"], ids["Oats"]], "changes": {"price": 4.0, "serving_size": 200},
+    })
+    assert result(response) == {"updated": 2, "ids": sorted([ids["Broccoli, raw"], ids["Oats"]])}
+    foods = catalog(client)
+    assert foods["Oats"]["price"] == 4.0
+    # Derived columns follow the new price and serving size
+    assert foods["Oats"]["price_per_unit"] == pytest.approx(2.0)
+    assert foods["Oats"]["calories_per_dollar"] == pytest.approx(34 / 4.0)
+    assert foods["Kale, raw"]["price"] == 2.49
+
+
+def test_bulk_patch_by_filters_and_ids(client, ids):
+    assert client.patch("/food-items/?store=Corner Shop", json={"changes": {"fiber": 9}}).json()["updated"] == 2
+    # ids and filters both apply
+    response = client.patch("/food-items/?store=Corner Shop", json={
+        "ids": [ids["Broccoli, raw"], ids["Oats"]], "changes": {"fiber": 1},
+    })
+    assert response.json() == {"updated": 1, "ids": [ids["Oats"]]}
+    assert {name: item["fiber"] for name, item in catalog(client).items()} == {
+        "Broccoli, raw": 2.6, "Kale, raw": 9, "Oats": 1, "Lentils": 2.6,
+    }
+
+
+def test_bulk_patch_needs_ids_or_filters_and_changes(client, ids):
+    assert client.patch("/food-items/", json={"changes": {"price": 1.0}}).status_code == 400
+    assert client.patch("/food-items/", json={"ids": [ids["Oats"]], "changes": {}}).status_code == 400
+    assert client.patch("/food-items/", json={"ids": [ids["Oats"]], "changes": {"price": None}}).status_code == 422
+    too_many = list(range(BULK_MAX_IDS + 1))
+    assert client.patch("/food-items/", json={"ids": too_many, "changes": {"price": 1.0}}).status_code == 422
+
+
+def test_bulk_patch_collision_changes_nothing(client, ids):
+    response = client.patch("/food-items/", json={
+        "ids": [ids["Oats"], ids["Lentils"]], "changes": {"name": "Grain", "price": 9.0},
+    })
+    assert response.status_code == 409
+    foods = catalog(client)
+    assert foods["Oats"]["price"] == 1.0 and foods["Lentils"]["price"] == 1.5
+
+
+def test_bulk_patch_of_nothing(client, ids):
+    assert client.patch("/food-items/", json={"ids": [999], "changes": {"price": 1.0}}).json() == {
+        "updated": 0, "ids": [],
+    }
+
+
+def test_bulk_delete(client, ids):
+    plan = client.post("/meal-plans/", json={"name": "Lunch", "foods": [
+        {"food_id": ids["Kale, raw"], "quantity": 1, "meal_type": "Lunch"},
+        {"food_id": ids["Lentils"], "quantity": 1, "meal_type": "Lunch"},
+    ]}).json()
+    response = client.request("DELETE", "/food-items/?store=Corner Shop")
+    assert result(response) == {"deleted": 2, "ids": sorted([ids["Kale, raw"], ids["Oats"]])}
+    assert set(catalog(client)) == {"Broccoli, raw", "Lentils"}
+    # The plan's rows for deleted foods went with them
+    assert [item["name"] for item in client.get(f"/meal-plans/{plan['id']}").json()["foods"]] == ["Lentils"]
+    response = client.request("DELETE", "/food-items/", json={"ids": [ids["Lentils"], 999]})
+    assert response.json() == {"deleted": 1, "ids": [ids["Lentils"]]}
+
+
+def test_bulk_delete_needs_ids_or_filters(client, ids):
+    assert client.request("DELETE", "/food-items/").status_code == 400
+    assert len(catalog(client)) == 4
+
+
+def test_patch_one_food(client, ids):
+    response = client.patch(f"/food-items/{ids['Oats']}", json={"price": 2.0, "fiber": None})
+    assert response.status_code == 200
+    item = response.json()
+    assert (item["price"], item["price_per_unit"], item["fiber"], item["store"]) == (2.0, 2.0, None, "Corner Shop")
+    assert client.patch(f"/food-items/{ids['Oats']}", json={"name": "Lentils"}).status_code == 409
+    assert client.patch("/food-items/999", json={"price": 2.0}).status_code == 404
+    assert client.patch(f"/food-items/{ids['Oats']}", json={"calories": None}).status_code == 422
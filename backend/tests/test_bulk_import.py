@@ -0,0 +1,56 @@
+"""POST /food-items/bulk: streamed upserts keyed by name and brand."""
+import json
+
+from conftest import food
+
+
+def bulk(client, *rows):
+    body = "".join(json.dumps(row) + "\n" for row in rows)
+    response = client.post("/food-items/bulk?format=ndjson", content=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def stored_group(client, name):
+    return next(item["food_group"] for item in client.get("/food-items/").json() if item["name"] == name)
+
+
+def test_new_food_without_group_is_classified(client):
+    bulk(client, food())
+    assert stored_group(client, "Broccoli, raw") == "vegetables"
+
+
+def test_reingest_without_group_keeps_stored_group(client):
+    bulk(client, food(name="Mystery bar", food_group="nuts"))
+    bulk(client, food(name="Mystery bar", price=3.0))
+    assert stored_group(client, "Mystery bar") == "nuts"
+
+
+def test_reingest_with_group_replaces_it(client):
+    bulk(client, food(name="Mystery bar", food_group="nuts"))
+    bulk(client, food(name="Mystery bar", food_group="grains"))
+    assert stored_group(client, "Mystery bar") == "grains"
+
+
+def test_repeated_rows_count_once(client):
+    result = bulk(client, food(price=1.0), food(name="Kale, raw"), food(price=2.0))
+    assert (result["received"], result["written"]) == (3, 2)
+    assert {item["name"]: item["price"] for item in client.get("/food-items/").json()} == {
+        "Broccoli, raw": 2.0, "Kale, raw": 2.49,
+    }
+
+
+def test_bulk_load_records_its_versions(client, monkeypatch):
+    from functools import partial
+
+    from app import cache, ingest
+
+    client.get("/food-items/")  # this process has now seen the catalog's version
+    resets = []
+    monkeypatch.setattr(cache, "_external_change", lambda: resets.append(True))
+    # Several committed chunks, each bumping the catalog version
+    monkeypatch.setattr(ingest, "chunked", partial(ingest.chunked, size=2))
+    bulk(client, *(food(name=f"Food {i}") for i in range(5)))
+    assert client.post("/food-items/", json=food(name="Kale, raw")).status_code == 200
+    # Every version came from this process, so nothing was mistaken for an outside change
+    assert resets == []
@@ -0,0 +1,99 @@
+"""ETags and cached catalog reads are invalidated by every kind of write."""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.cache import bump_catalog_version
+from app.database import SessionLocal
+from app.models.food_item import FoodItem
+from app.routes import food_items
+
+from conftest import food
+
+
+def get(client, path, etag=None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get(path, params=params, headers=headers)
+
+
+@pytest.fixture
+def item(client):
+    return client.post("/food-items/", json=food()).json()
+
+
+def test_unchanged_catalog_answers_304(client, item):
+    for path in ["/food-items/", "/food-items/metrics", "/food-items/stats", f"/food-items/{item['id']}"]:
+        first = get(client, path)
+        again = get(client, path, first.headers["ETag"])
+        assert again.status_code == 304, path
+        assert again.content == b""
+
+
+WRITES = {
+    "create": lambda client, item: client.post("/food-items/", json=food(name="Kale, raw")),
+    "put": lambda client, item: client.put(f"/food-items/{item['id']}", json=food(price=9.0)),
+    "patch": lambda client, item: client.patch(f"/food-items/{item['id']}", json={"price": 9.0}),
+    "delete": lambda client, item: client.delete(f"/food-items/{item['id']}"),
+    "bulk patch": lambda client, item: client.patch("/food-items/", json={"ids": [item["id"]], "changes": {"price": 9.0}}),
+    "bulk delete": lambda client, item: client.request("DELETE", "/food-items/", json={"ids": [item["id"]]}),
+    "bulk create": lambda client, item: client.post(
+        "/food-items/bulk?format=ndjson", content=json.dumps(food(name="Kale, raw")) + "\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("write", WRITES)
+def test_every_write_changes_the_etag(client, item, write):
+    before = {path: get(client, path) for path in ["/food-items/", "/food-items/metrics", "/food-items/stats"]}
+    assert WRITES[write](client, item).status_code == 200
+    for path, response in before.items():
+        after = get(client, path, response.headers["ETag"])
+        assert after.status_code == 200, path
+        assert after.headers["ETag"] != response.headers["ETag"]
+        assert after.content != response.content, path
+
+
+def test_change_by_another_process_is_noticed(client, item):
+    listed = get(client, "/food-items/")
+    metrics = get(client, "/food-items/metrics")
+    single = get(client, f"/food-items/{item['id']}")
+    # As fix_food_data or another worker would: write, bump the version, commit
+    with SessionLocal() as session:
+        session.query(FoodItem).update({"price": 9.0, "price_per_unit": 9.0})
+        bump_catalog_version(session)
+        session.commit()
+    assert get(client, "/food-items/", listed.headers["ETag"]).json()[0]["price"] == 9.0
+    assert get(client, "/food-items/metrics", metrics.headers["ETag"]).json()["average_cost_per_100g"] == 9.0
+    assert get(client, f"/food-items/{item['id']}", single.headers["ETag"]).json()["price"] == 9.0
+
+
+
+def test_gzip_has_its_own_etag(client):
+    for i in range(20):
+        client.post("/food-items/", json=food(name=f"Food {i}"))
+    plain = client.get("/food-items/", headers={"Accept-Encoding": "identity"})
+    gzipped = client.get("/food-items/", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] != gzipped.headers["ETag"]
+    assert plain.json() == gzipped.json()
+
+
+def test_responses_render_off_the_event_loop(client, item, monkeypatch):
+    threads_with_loop = []
+    real_with_gzip = food_items._with_gzip
+
+    def with_gzip(rendered):
+        try:
+            asyncio.get_running_loop()
+            threads_with_loop.append(threading.current_thread().name)
+        except RuntimeError:
+            pass
+        return real_with_gzip(rendered)
+
+    monkeypatch.setattr(food_items, "_with_gzip", with_gzip)
+    for path in ["/food-items/", "/food-items/metrics", "/food-items/stats", f"/food-items/{item['id']}"]:
+        assert get(client, path).status_code == 200
+    assert threads_with_loop == []
@@ -0,0 +1,185 @@
+"""FdcClient against a local stand-in for the FoodData Central API."""
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from app.scripts import fdc_client
+from app.scripts.fdc_client import FdcClient
+
+FOOD = {"fdcId": 171705, "description": "Broccoli, raw", "foodNutrients": []}
+
+
+class StandInServer:
+    """Serves scripted (status, headers, body) responses per path and records requests."""
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                server.requests.append({"path": url.path, "query": parse_qs(url.query), "headers": dict(self.headers)})
+                scripted = server.responses.get(url.path) or [(404, {}, {"error": "not found"})]
+                status, headers, body = scripted.pop(0) if len(scripted) > 1 else scripted[0]
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/fdc/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, args=(0.01,), daemon=True)
+
+    def requests_for(self, fdc_id):
+        return [request for request in self.requests if request["path"] == f"/fdc/v1/food/{fdc_id}"]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    stand_in = StandInServer()
+    stand_in.thread.start()
+    monkeypatch.setenv("FDC_BASE_URL", stand_in.url)
+    yield stand_in
+    stand_in.httpd.shutdown()
+    stand_in.httpd.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the client's backoff delays without waiting them out."""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(fdc_client.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def fetch(client_kwargs, *fdc_ids):
+    async def run():
+        async with FdcClient("test-key", **client_kwargs) as client:
+            bodies = [await client.fetch_food(fdc_id) for fdc_id in fdc_ids]
+            return client, bodies
+    return asyncio.run(run())
+
+
+def test_uses_fdc_base_url_and_api_key(server, tmp_path):
+    server.responses["/fdc/v1/food/171705"] = [(200, {}, FOOD)]
+    client, [body] = fetch({"cache_dir": str(tmp_path)}, "171705")
+    assert body == FOOD
+    [request] = server.requests_for("171705")
+    assert request["query"]["api_key"] == ["test-key"]
+    assert client.stats["network"] == 1
+
+
+def test_retries_server_errors_with_backoff(server, tmp_path, sleeps):
+    server.responses["/fdc/v1/food/1"] = [(503, {}, None), (502, {}, None), (200, {}, FOOD)]
+    client, [body] = fetch({"cache_dir": str(tmp_path), "backoff": 0.5}, "1")
+    assert body == FOOD
+    assert len(server.requests_for("1")) == 3
+    assert client.stats["retries"] == 2
+    # Exponential, with jitter between half and one and a half times the step
+    assert 0.25 <= sleeps[0] <= 0.75 and 0.5 <= sleeps[1] <= 1.5
+
+
+def test_honours_retry_after_on_429(server, tmp_path, sleeps):
+    server.responses["/fdc/v1/food/1"] = [(429, {"Retry-After": "7"}, None), (200, {}, FOOD)]
+    client, [body] = fetch({"cache_dir": str(tmp_path)}, "1")
+    assert body == FOOD
+    assert sleeps == [7.0]
+
+
+def test_gives_up_after_max_retries(server, tmp_path, sleeps):
+    server.responses["/fdc/v1/food/1"] = [(500, {}, None)]
+    client, [body] = fetch({"cache_dir": str(tmp_path), "max_retries": 2}, "1")
+    assert body is None
+    assert len(server.requests_for("1")) == 3
+    assert client.failures == [{"fdc_id": "1", "error": "HTTP 500"}]
+
+
+def test_records_invalid_json_bodies(server, tmp_path, sleeps):
+    # An empty 200 body, as from a dropped connection
+    server.responses["/fdc/v1/food/1"] = [(200, {}, None)]
+    server.responses["/fdc/v1/food/2"] = [(200, {}, FOOD)]
+    client, bodies = fetch({"cache_dir": str(tmp_path), "max_retries": 1}, "1", "2")
+    assert bodies == [None, FOOD]
+    assert len(server.requests_for("1")) == 2
+    [failure] = client.failures
+    assert failure["fdc_id"] == "1" and failure["error"].startswith("Invalid JSON")
+
+
+def test_does_not_retry_client_errors(server, tmp_path, sleeps):
+    client, [body] = fetch({"cache_dir": str(tmp_path)}, "404404")
+    assert body is None
+    assert len(server.requests_for("404404")) == 1
+    assert client.failures == [{"fdc_id": "404404", "error": "HTTP 404"}]
+    assert sleeps == []
+
+
+def test_retries_network_errors(monkeypatch, tmp_path, sleeps):
+    # Nothing listens on a port that was just released
+    closed = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    port = closed.server_port
+    closed.server_close()
+    monkeypatch.setenv("FDC_BASE_URL", f"http://127.0.0.1:{port}")
+    client, [body] = fetch({"cache_dir": str(tmp_path), "max_retries": 1}, "1")
+    assert body is None
+    assert client.stats["retries"] == 1
+    assert client.failures[0]["error"].startswith("ConnectError")
+
+
+def test_fresh_cache_entries_skip_the_network(server, tmp_path):
+    server.responses["/fdc/v1/food/1"] = [(200, {"ETag": '"v1"'}, FOOD)]
+    fetch({"cache_dir": str(tmp_path)}, "1")
+    client, [body] = fetch({"cache_dir": str(tmp_path)}, "1")
+    assert body == FOOD
+    assert len(server.requests_for("1")) == 1
+    assert client.stats == {"network": 0, "cached": 1, "revalidated": 0, "retries": 0}
+
+
+def test_stale_cache_entries_are_revalidated(server, tmp_path):
+    last_modified = "Wed, 01 Oct 2026 00:00:00 GMT"
+    server.responses["/fdc/v1/food/1"] = [
+        (200, {"ETag": '"v1"', "Last-Modified": last_modified}, FOOD),
+        (304, {}, None),
+    ]
+    fetch({"cache_dir": str(tmp_path)}, "1")
+    with open(os.path.join(tmp_path, "1.json")) as f:
+        first_fetched_at = json.load(f)["fetched_at"]
+    time.sleep(0.01)
+
+    client, [body] = fetch({"cache_dir": str(tmp_path), "max_age": 0}, "1")
+    assert body == FOOD
+    revalidation = server.requests_for("1")[1]["headers"]
+    assert revalidation["If-None-Match"] == '"v1"'
+    assert revalidation["If-Modified-Since"] == last_modified
+    assert client.stats["revalidated"] == 1
+    with open(os.path.join(tmp_path, "1.json")) as f:
+        assert json.load(f)["fetched_at"] > first_fetched_at
+
+
+def test_changed_records_replace_the_cache_entry(server, tmp_path):
+    updated = {**FOOD, "description": "Broccoli, raw (updated)"}
+    server.responses["/fdc/v1/food/1"] = [(200, {"ETag": '"v1"'}, FOOD), (200, {"ETag": '"v2"'}, updated)]
+    fetch({"cache_dir": str(tmp_path)}, "1")
+    client, [body] = fetch({"cache_dir": str(tmp_path), "max_age": 0}, "1")
+    assert body == updated
+    with open(os.path.join(tmp_path, "1.json")) as f:
+        assert json.load(f)["etag"] == '"v2"'
@@ -0,0 +1,19 @@
+"""food_group on single-food writes."""
+from conftest import food
+
+
+def test_group_is_guessed_on_create_unless_given(client):
+    guessed = client.post("/food-items/", json=food()).json()
+    given = client.post("/food-items/", json=food(name="Trail mix", food_group="nuts")).json()
+    assert (guessed["food_group"], given["food_group"]) == ("vegetables", "nuts")
+
+
+def test_put_keeps_the_stored_group_unless_given(client):
+    item_id = client.post("/food-items/", json=food(food_group="grains")).json()["id"]
+    # A rename that would guess differently still keeps the stored group
+    kept = client.put(f"/food-items/{item_id}", json=food(name="Kale, raw", price=3.0))
+    assert kept.status_code == 200
+    assert (kept.json()["food_group"], kept.json()["price"]) == ("grains", 3.0)
+    changed = client.put(f"/food-items/{item_id}", json=food(food_group="vegetables")).json()
+    assert changed["food_group"] == "vegetables"
+    assert client.get(f"/food-items/{item_id}").json()["food_group"] == "vegetables"
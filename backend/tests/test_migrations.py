@@ -0,0 +1,68 @@
+"""The alembic chain upgrades and downgrades an SQLite database."""
+import math
+import os
+
+import pytest
+from sqlalchemy import create_engine, inspect
+
+pytest.importorskip("alembic")
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+from app import database  # noqa: E402
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+# The first revision alters the food_items table create_all made before migrations existed
+BASE_SCHEMA = [
+    """CREATE TABLE food_items (
+        id INTEGER NOT NULL PRIMARY KEY, name VARCHAR NOT NULL, brand VARCHAR,
+        serving_size FLOAT NOT NULL, calories FLOAT NOT NULL, protein FLOAT NOT NULL,
+        carbohydrates FLOAT NOT NULL, fats FLOAT NOT NULL, fiber FLOAT,
+        price FLOAT NOT NULL, price_per_unit FLOAT NOT NULL, store VARCHAR,
+        created_at DATETIME DEFAULT (CURRENT_TIMESTAMP), updated_at DATETIME
+    )""",
+    "CREATE INDEX ix_food_items_id ON food_items (id)",
+    "CREATE INDEX ix_food_items_name ON food_items (name)",
+    """INSERT INTO food_items
+        (name, serving_size, calories, protein, carbohydrates, fats, fiber, price, price_per_unit)
+        VALUES ('Broccoli, raw', 100, 34, 2.8, 6.6, 0.4, 2.6, 2.0, 2.0)""",
+]
+METRICS = {"calories_per_dollar", "protein_per_dollar", "fiber_to_sugar_ratio"}
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        for statement in BASE_SCHEMA:
+            connection.exec_driver_sql(statement)
+    # alembic/env.py connects to whatever app.database points at
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+    yield engine
+    engine.dispose()
+
+
+def food_columns(engine):
+    return {column["name"] for column in inspect(engine).get_columns("food_items")}
+
+
+def test_upgrade_downgrade_upgrade(engine):
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+
+    command.upgrade(config, "head")
+    assert METRICS <= food_columns(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE food_items SET sugar = 0")
+        calories_per_dollar, ratio = connection.exec_driver_sql(
+            "SELECT calories_per_dollar, fiber_to_sugar_ratio FROM food_items"
+        ).one()
+    assert calories_per_dollar == 17.0
+    assert ratio == math.inf
+
+    command.downgrade(config, "create_meal_plans_001")
+    assert not METRICS & food_columns(engine)
+    command.upgrade(config, "head")
+    assert METRICS <= food_columns(engine)
@@ -0,0 +1,48 @@
+"""POST /meal-plans/optimize against a cached food matrix."""
+from app.cache import bump_catalog_version
+from app.database import SessionLocal
+from app.models.food_item import FoodItem
+
+from conftest import food
+
+
+def optimize(client, **request):
+    response = client.post("/meal-plans/optimize", json={"min_protein": 20, **request})
+    assert response.status_code == 200
+    return response.json()
+
+
+def add(client, **changes):
+    return client.post("/food-items/", json=food(**changes)).json()["id"]
+
+
+def test_cheapest_basket_meets_the_targets(client):
+    cheap = add(client, name="Lentils, dry", protein=25, price=0.5)
+    add(client, name="Chicken breast", protein=31, price=3.0)
+    basket = optimize(client)
+    assert [item["food_id"] for item in basket["foods"]] == [cheap]
+    assert basket["totals"]["protein"] >= 20 - 1e-6
+
+
+def test_food_deleted_behind_the_cache_is_left_out(client):
+    cheap = add(client, name="Lentils, dry", protein=25, price=0.5)
+    dear = add(client, name="Chicken breast", protein=31, price=3.0)
+    optimize(client)
+    # Deleted without bumping the catalog version, so the cached matrix still holds it
+    with SessionLocal() as session:
+        session.query(FoodItem).filter(FoodItem.id == cheap).delete()
+        session.commit()
+    basket = optimize(client)
+    assert [item["food_id"] for item in basket["foods"]] == [dear]
+
+
+def test_matrix_follows_changes_by_another_process(client):
+    cheap = add(client, name="Lentils, dry", protein=25, price=0.5)
+    dear = add(client, name="Chicken breast", protein=31, price=3.0)
+    optimize(client)
+    with SessionLocal() as session:
+        session.query(FoodItem).filter(FoodItem.id == cheap).update({"price": 90.0, "price_per_unit": 90.0})
+        bump_catalog_version(session)
+        session.commit()
+    basket = optimize(client)
+    assert [item["food_id"] for item in basket["foods"]] == [dear]
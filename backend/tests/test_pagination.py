@@ -0,0 +1,72 @@
+"""Keyset pagination of GET /food-items: every row exactly once, in order."""
+import math
+
+import pytest
+
+from conftest import food
+
+# Ties and NULLs on purpose: fiber repeats and is sometimes missing, and
+# sugar-free foods with fiber have an infinite fiber_to_sugar_ratio
+FIBER = [2.0, None, 2.0, 0.5, None, 3.0, 2.0, 0.0, None, 3.0, 1.5]
+SUGAR = [1.0, 2.0, 0.0, 0.5, None, 0.0, 4.0, 0.0, 1.0, 1.5, 3.0]
+
+
+@pytest.fixture
+def foods(client):
+    rows = [
+        food(name=f"Food {i:02d}", fiber=fiber, sugar=sugar, calories=float(i % 3))
+        for i, (fiber, sugar) in enumerate(zip(FIBER, SUGAR))
+    ]
+    for row in rows:
+        assert client.post("/food-items/", json=row).status_code == 200
+    ids = [item["id"] for item in client.get("/food-items/", params={"limit": 100}).json()]
+    return [{**row, "id": food_id} for row, food_id in zip(rows, ids)]
+
+
+def ratio(row):
+    if row["fiber"] is None or row["sugar"] is None:
+        return None
+    if row["sugar"] == 0:
+        return math.inf if row["fiber"] > 0 else 0
+    return row["fiber"] / row["sugar"]
+
+
+def expected_order(foods, field, descending):
+    """NULLs sort as the largest value; ties go by id."""
+    value = ratio if field == "fiber_to_sugar_ratio" else (lambda row: row[field])
+
+    def key(row):
+        v = value(row)
+        return (v is None, v if v is not None else 0, row["id"])
+
+    ordered = sorted(foods, key=key)
+    return [row["id"] for row in (reversed(ordered) if descending else ordered)]
+
+
+def walk(client, sort, **params):
+    ids, params = [], {"sort": sort, "limit": 3, **params}
+    while True:
+        response = client.get("/food-items/", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        ids += page["id"] if params.get("format") == "columnar" else [item["id"] for item in page]
+        if "X-Next-Cursor" not in response.headers:
+            return ids
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize("field", ["fiber", "sugar", "calories", "fiber_to_sugar_ratio", "name"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_pages_cover_every_row_in_order(client, foods, field, descending):
+    sort = f"-{field}" if descending else field
+    assert walk(client, sort) == expected_order(foods, field, descending)
+
+
+def test_columnar_pages_follow_the_same_cursor(client, foods):
+    assert walk(client, "-fiber", format="columnar", fields="id,name") == expected_order(foods, "fiber", True)
+
+
+def test_cursor_must_match_the_sort(client, foods):
+    cursor = client.get("/food-items/", params={"sort": "fiber", "limit": 3}).headers["X-Next-Cursor"]
+    assert client.get("/food-items/", params={"sort": "sugar", "cursor": cursor}).status_code == 400
+    assert client.get("/food-items/", params={"cursor": "not a cursor"}).status_code == 400
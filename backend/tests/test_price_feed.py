@@ -0,0 +1,63 @@
+"""apply_price_feed: history rows and the catalog's current price."""
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.models.food_item import FoodItem
+from app.models.food_price import FoodPrice
+from app.scripts.fix_food_data import apply_price_feed
+
+
+def feed_row(price, effective_date, store="Local Grocery", name="Broccoli, raw"):
+    return {"name": name, "brand": None, "store": store, "effective_date": effective_date, "price": price}
+
+
+def catalog_price(db):
+    return db.execute(select(FoodItem.price, FoodItem.store, FoodItem.price_per_unit)).one()
+
+
+def history(db):
+    return db.execute(
+        select(FoodPrice.store, FoodPrice.effective_date, FoodPrice.price)
+        .order_by(FoodPrice.effective_date, FoodPrice.store)
+    ).all()
+
+
+def test_latest_feed_row_sets_catalog_price(db, broccoli):
+    updated, unmatched = apply_price_feed(db, [
+        feed_row(3.0, date(2026, 10, 5)),
+        feed_row(3.5, date(2026, 10, 12)),
+        feed_row(9.0, date(2026, 10, 1), name="Unknown food"),
+    ])
+    assert updated == 1
+    assert [tuple(row) for row in unmatched] == [("Unknown food", None)]
+    assert catalog_price(db) == (3.5, "Local Grocery", pytest.approx(3.5))
+    assert len(history(db)) == 2
+
+
+def test_backdated_feed_keeps_newer_price(db, broccoli):
+    apply_price_feed(db, [feed_row(3.5, date(2026, 10, 12))])
+    updated, _ = apply_price_feed(db, [feed_row(1.0, date(2026, 10, 1))])
+    assert updated == 0
+    assert catalog_price(db) == (3.5, "Local Grocery", pytest.approx(3.5))
+    # The old price is still recorded
+    assert [tuple(row) for row in history(db)] == [
+        ("Local Grocery", date(2026, 10, 1), 1.0),
+        ("Local Grocery", date(2026, 10, 12), 3.5),
+    ]
+
+
+def test_older_feed_from_another_store_keeps_newer_price(db, broccoli):
+    apply_price_feed(db, [feed_row(3.5, date(2026, 10, 12))])
+    apply_price_feed(db, [feed_row(1.0, date(2026, 10, 11), store="Corner Shop")])
+    assert tuple(catalog_price(db))[:2] == (3.5, "Local Grocery")
+    apply_price_feed(db, [feed_row(2.0, date(2026, 10, 13), store="Corner Shop")])
+    assert tuple(catalog_price(db))[:2] == (2.0, "Corner Shop")
+
+
+def test_same_day_rerun_corrects_price(db, broccoli):
+    apply_price_feed(db, [feed_row(3.5, date(2026, 10, 12))])
+    apply_price_feed(db, [feed_row(3.25, date(2026, 10, 12))])
+    assert catalog_price(db).price == 3.25
+    assert len(history(db)) == 1
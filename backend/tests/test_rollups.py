@@ -0,0 +1,130 @@
+"""The daily_nutrition rollup stays equal to a full rebuild after every kind of write."""
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.database import SessionLocal
+from app.models.daily_nutrition import DailyNutrition
+from app.models.meal_plan import MealPlan
+from app.rollups import rebuild_daily_nutrition
+from app.scripts.fix_food_data import apply_price_feed
+
+from conftest import food
+
+TODAY = datetime.utcnow().date()
+
+
+def rollup(session):
+    rows = session.execute(select(
+        DailyNutrition.day, DailyNutrition.meal_type, DailyNutrition.foods,
+        DailyNutrition.calories, DailyNutrition.protein, DailyNutrition.carbohydrates,
+        DailyNutrition.fats, DailyNutrition.fiber, DailyNutrition.sugar, DailyNutrition.cost,
+    ))
+    # Rounded, as a refresh and a rebuild may sum in different orders
+    return sorted(tuple(round(value, 6) if isinstance(value, float) else value for value in row) for row in rows)
+
+
+def assert_rollup_matches_rebuild():
+    with SessionLocal() as session:
+        stored = rollup(session)
+        rebuild_daily_nutrition(session)
+        rebuilt = rollup(session)
+        session.rollback()
+    assert stored == rebuilt
+    return stored
+
+
+@pytest.fixture
+def planned(client):
+    """Three foods planned over three days, returned as {name: id}."""
+    ids = {
+        name: client.post("/food-items/", json=food(name=name, calories=calories)).json()["id"]
+        for name, calories in [("Broccoli, raw", 34), ("Kale, raw", 49), ("Oats", 389)]
+    }
+    plans = [
+        ("Monday", [("Broccoli, raw", 2, "Lunch"), ("Oats", 1, "Breakfast")]),
+        ("Tuesday", [("Kale, raw", 1.5, "Dinner"), ("Broccoli, raw", 1, "Dinner")]),
+        ("Wednesday", [("Oats", 0.5, "Breakfast")]),
+    ]
+    for offset, (name, foods) in enumerate(plans):
+        plan = client.post("/meal-plans/", json={"name": name, "foods": [
+            {"food_id": ids[food_name], "quantity": quantity, "meal_type": meal_type}
+            for food_name, quantity, meal_type in foods
+        ]}).json()
+        # Spread the plans over days, then rebuild as a migration or repair would
+        with SessionLocal() as session:
+            session.execute(update(MealPlan).where(MealPlan.id == plan["id"]).values(
+                date=datetime.utcnow() - timedelta(days=offset)
+            ))
+            rebuild_daily_nutrition(session)
+            session.commit()
+    return ids
+
+
+def daily_calories(client):
+    days = client.get("/nutrition/daily").json()
+    return {date.fromisoformat(day["date"]): day["calories"] for day in days}
+
+
+def test_plans_roll_up_by_day(client, planned):
+    assert assert_rollup_matches_rebuild()
+    assert daily_calories(client) == pytest.approx({
+        TODAY: 34 * 2 + 389,
+        TODAY - timedelta(days=1): 49 * 1.5 + 34,
+        TODAY - timedelta(days=2): 389 * 0.5,
+    })
+
+
+def test_patch_refreshes_days_planning_the_food(client, planned):
+    client.patch(f"/food-items/{planned['Broccoli, raw']}", json={"calories": 50, "price": 4.0})
+    assert_rollup_matches_rebuild()
+    assert daily_calories(client)[TODAY] == pytest.approx(50 * 2 + 389)
+
+
+def test_put_refreshes_days_planning_the_food(client, planned):
+    client.put(f"/food-items/{planned['Oats']}", json=food(name="Oats", calories=100))
+    assert_rollup_matches_rebuild()
+    assert daily_calories(client)[TODAY - timedelta(days=2)] == pytest.approx(50)
+
+
+def test_delete_removes_the_food_from_its_days(client, planned):
+    client.delete(f"/food-items/{planned['Oats']}")
+    stored = assert_rollup_matches_rebuild()
+    # Wednesday only planned oats
+    assert TODAY - timedelta(days=2) not in {row[0] for row in stored}
+    assert daily_calories(client)[TODAY] == pytest.approx(34 * 2)
+
+
+def test_bulk_patch_and_delete_refresh(client, planned):
+    client.patch("/food-items/", json={"ids": list(planned.values()), "changes": {"calories": 10}})
+    assert_rollup_matches_rebuild()
+    client.request("DELETE", "/food-items/", json={"ids": [planned["Kale, raw"]]})
+    assert_rollup_matches_rebuild()
+    assert daily_calories(client)[TODAY - timedelta(days=1)] == pytest.approx(10)
+
+
+def test_bulk_upsert_refreshes(client, planned):
+    body = json.dumps(food(name="Kale, raw", calories=20)) + "\n"
+    client.post("/food-items/bulk?format=ndjson", content=body)
+    assert_rollup_matches_rebuild()
+    assert daily_calories(client)[TODAY - timedelta(days=1)] == pytest.approx(20 * 1.5 + 34)
+
+
+def test_price_feed_refreshes_cost(client, planned):
+    with SessionLocal() as session:
+        apply_price_feed(session, [
+            {"name": "Broccoli, raw", "brand": None, "store": "Local Grocery", "effective_date": TODAY, "price": 5.0},
+        ])
+        session.commit()
+    stored = assert_rollup_matches_rebuild()
+    lunch = next(row for row in stored if row[:2] == (TODAY, "Lunch"))
+    assert lunch[-1] == pytest.approx(5.0 * 2)
+
+
+def test_meal_plan_delete_refreshes(client, planned):
+    plans = client.get("/meal-plans/").json()
+    client.delete(f"/meal-plans/{plans[0]['id']}")
+    assert_rollup_matches_rebuild()
+    assert TODAY not in daily_calories(client)
@@ -0,0 +1,68 @@
+"""GET /food-items/search and the in-process index behind it on SQLite."""
+from app import search
+from app.database import SessionLocal
+from app.models.food_item import FoodItem
+
+from conftest import FOOD, food
+
+
+def names(client, q):
+    response = client.get("/food-items/search", params={"q": q})
+    assert response.status_code == 200
+    return [item["name"] for item in response.json()]
+
+
+def test_index_follows_writes(client):
+    assert names(client, "brocoli") == []
+    item = client.post("/food-items/", json=food()).json()
+    assert names(client, "brocoli") == ["Broccoli, raw"]
+    client.patch(f"/food-items/{item['id']}", json={"name": "Kale, raw"})
+    assert names(client, "brocoli") == []
+    assert names(client, "kale") == ["Kale, raw"]
+    client.delete(f"/food-items/{item['id']}")
+    assert names(client, "kale") == []
+
+
+def add_food(name):
+    with SessionLocal() as session:
+        item = FoodItem(**{**FOOD, "name": name}, price_per_unit=FOOD["price"])
+        session.add(item)
+        session.commit()
+        session.refresh(item)
+        return item
+
+
+def test_write_during_build_is_replayed(db, broccoli, monkeypatch):
+    real_index = search.NgramIndex
+    builds = []
+
+    def building(rows):
+        # Committed after the build read the catalog but before it's published
+        if not builds:
+            search.index_name(add_food("Kale, raw"))
+            search.unindex_name(broccoli.id)
+        builds.append(rows)
+        return real_index(rows)
+
+    monkeypatch.setattr(search, "NgramIndex", building)
+    index = search._search_index(db)
+    assert len(builds) == 1
+    assert [db.get(FoodItem, food_id).name for food_id in index.search("kale", 5)] == ["Kale, raw"]
+    assert index.search("broccoli", 5) == []
+
+
+def test_reset_during_build_rebuilds(db, broccoli, monkeypatch):
+    real_index = search.NgramIndex
+    builds = []
+
+    def building(rows):
+        if not builds:
+            add_food("Kale, raw")
+            search.reset_search_index()
+        builds.append(rows)
+        return real_index(rows)
+
+    monkeypatch.setattr(search, "NgramIndex", building)
+    index = search._search_index(db)
+    assert len(builds) == 2
+    assert len(index.search("kale", 5)) == 1
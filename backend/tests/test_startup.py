@@ -0,0 +1,54 @@
+"""Schema checks at startup and what /ready reports."""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app import startup
+from app.database import engine
+from app.main import app
+
+
+@pytest.fixture
+def alembic_mode(db, monkeypatch):
+    monkeypatch.setattr(startup, "SCHEMA_MODE", "alembic")
+    yield
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def stamp(*revisions):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+        for revision in revisions:
+            connection.execute(text("INSERT INTO alembic_version VALUES (:revision)"), {"revision": revision})
+
+
+def test_missing_revision_table_is_a_mismatch(alembic_mode):
+    with pytest.raises(startup.SchemaMismatch, match="no alembic_version table"):
+        startup.check_schema()
+
+
+def test_old_revision_is_a_mismatch(alembic_mode):
+    stamp("aee011dcff56")
+    with pytest.raises(startup.SchemaMismatch, match="database is at aee011dcff56"):
+        startup.check_schema()
+
+
+def test_head_revision_passes(alembic_mode):
+    heads = startup._alembic_heads()
+    if heads is None:
+        pytest.skip("alembic not installed")
+    stamp(*heads)
+    assert startup.check_schema().startswith("at head")
+
+
+def test_ready_reports_the_mismatch(alembic_mode):
+    deadline = time.monotonic() + 5
+    with TestClient(app) as client:
+        # Retrying a mismatch, as if the database were down, would leave it pending
+        while (response := client.get("/ready")).json()["schema"] == "pending" and time.monotonic() < deadline:
+            time.sleep(0.01)
+    assert response.status_code == 503
+    assert "alembic_version" in response.json()["schema"]
@@ -16,7 +16,7 @@ import {
   SimpleGrid,
 } from '@chakra-ui/react';
 import { InfoIcon } from '@chakra-ui/icons';
-import axios from 'axios';
+import { analyticsService } from '../services/api';
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -47,7 +47,6 @@ ChartJS.register(
 );
 
 const Analytics = () => {
-  const [foods, setFoods] = useState([]);
   const [timeRange, setTimeRange] = useState('all');
   const [metrics, setMetrics] = useState({
     averageProteinCost: 0,
@@ -62,97 +61,32 @@ const Analytics = () => {
   });
 
   useEffect(() => {
-    fetchFoods();
+    fetchMetrics();
   }, []);
 
-  useEffect(() => {
-    calculateMetrics();
-  }, [foods, timeRange]);
-
-  const fetchFoods = async () => {
+  // Both aggregates are computed by the API over the whole catalog
+  const fetchMetrics = async () => {
     try {
-      const response = await axios.get('http://localhost:8000/food-items');
-      setFoods(response.data);
+      const [foodMetrics, stats] = await Promise.all([
+        analyticsService.getFoodMetrics(),
+        analyticsService.getNutritionStats(),
+      ]);
+      setMetrics({
+        averageProteinCost: foodMetrics.average_protein_cost,
+        averageCalorieCost: foodMetrics.average_calorie_cost,
+        mostEfficientProtein: foodMetrics.most_efficient_protein || { name: '', value: 0 },
+        mostEfficientCalories: foodMetrics.most_efficient_calories || { name: '', value: 0 },
+        bestNutrientDensity: foodMetrics.best_nutrient_density || { name: '', value: 0 },
+        averageCostPer100g: foodMetrics.average_cost_per_100g,
+        topProteinFoods: foodMetrics.top_protein_foods,
+        topCalorieFoods: foodMetrics.top_calorie_foods,
+        avgMacros: stats.avg_macros,
+      });
     } catch (error) {
-      console.error('Error fetching foods:', error);
+      console.error('Error fetching metrics:', error);
     }
   };
 
-  const calculateMetrics = () => {
-    if (foods.length === 0) return;
-
-    // Calculate average protein cost
-    const avgProteinCost = foods.reduce((sum, food) => 
-      sum + (food.protein_per_dollar), 0) / foods.length;
-
-    // Calculate average calorie cost
-    const avgCalorieCost = foods.reduce((sum, food) => 
-      sum + (food.calories_per_dollar), 0) / foods.length;
-
-    // Find most efficient protein source
-    const bestProtein = foods.reduce((best, food) => 
-      food.protein_per_dollar > (best?.value || 0) 
-        ? { name: food.name, value: food.protein_per_dollar }
-        : best
-    , { name: '', value: 0 });
-
-    // Find most efficient calorie source
-    const bestCalories = foods.reduce((best, food) => 
-      food.calories_per_dollar > (best?.value || 0)
-        ? { name: food.name, value: food.calories_per_dollar }
-        : best
-    , { name: '', value: 0 });
-
-    // Calculate nutrient density score (protein + fiber per calorie)
-    const nutrientDensity = foods.map(food => ({
-      name: food.name,
-      value: (food.protein + food.fiber) / (food.calories || 1)
-    }));
-    const bestDensity = nutrientDensity.reduce((best, food) => 
-      food.value > (best?.value || 0) ? food : best
-    , { name: '', value: 0 });
-
-    // Calculate average cost per 100g
-    const avgCost = foods.reduce((sum, food) => 
-      sum + food.price, 0) / foods.length;
-
-    // Get top 5 protein-rich foods
-    const topProteinFoods = [...foods]
-      .sort((a, b) => b.protein_per_dollar - a.protein_per_dollar)
-      .slice(0, 5);
-
-    // Get top 5 calorie-efficient foods
-    const topCalorieFoods = [...foods]
-      .sort((a, b) => b.calories_per_dollar - a.calories_per_dollar)
-      .slice(0, 5);
-
-    // Calculate average macronutrient ratios
-    const avgMacros = foods.reduce((acc, food) => {
-      acc.protein += food.protein;
-      acc.carbs += food.carbohydrates;
-      acc.fats += food.fats;
-      acc.fiber += food.fiber;
-      return acc;
-    }, { protein: 0, carbs: 0, fats: 0, fiber: 0 });
-
-    const total = Object.values(avgMacros).reduce((sum, val) => sum + val, 0);
-    Object.keys(avgMacros).forEach(key => {
-      avgMacros[key] = (avgMacros[key] / total * 100).toFixed(1);
-    });
-
-    setMetrics({
-      averageProteinCost: avgProteinCost,
-      averageCalorieCost: avgCalorieCost,
-      mostEfficientProtein: bestProtein,
-      mostEfficientCalories: bestCalories,
-      bestNutrientDensity: bestDensity,
-      averageCostPer100g: avgCost,
-      topProteinFoods,
-      topCalorieFoods,
-      avgMacros,
-    });
-  };
-
   // Bar chart data for protein efficiency
   const proteinEfficiencyData = {
     labels: metrics.topProteinFoods?.map(food => food.name) || [],
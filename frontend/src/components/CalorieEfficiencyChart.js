@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Box, Heading, Button, SimpleGrid, HStack, Wrap, WrapItem } from '@chakra-ui/react';
 import { Bubble } from 'react-chartjs-2';
-import axios from 'axios';
+import { columnsToRows, foodService } from '../services/api';
 import {
   Chart as ChartJS,
   LinearScale,
@@ -24,52 +24,22 @@ ChartJS.register(
   zoomPlugin
 );
 
+// Display names and colors of the server's food groups
 const FOOD_GROUPS = {
-  proteins: {
-    name: 'Proteins',
-    foods: ['Chicken breast', 'Salmon', 'Ground beef', 'Tofu', 'Pork chop', 'Tuna', 'Ribeye steak', 'Turkey breast', 'Lamb chop', 'Duck breast', 'Bison', 'Chicken thigh', 'Pork tenderloin', 'Egg'],
-    color: '#F56565'
-  },
-  dairy: {
-    name: 'Dairy',
-    foods: ['Greek yogurt', 'Milk', 'Cheese', 'Cottage cheese'],
-    color: '#4299E1'
-  },
-  grains: {
-    name: 'Grains',
-    foods: ['White rice', 'Oatmeal', 'Bread', 'Quinoa', 'Pasta'],
-    color: '#ECC94B'
-  },
-  vegetables: {
-    name: 'Vegetables',
-    foods: ['Broccoli', 'Sweet potato', 'Carrots', 'Bell pepper', 'Avocado', 'Cauliflower', 'Kale'],
-    color: '#48BB78'
-  },
-  fruits: {
-    name: 'Fruits',
-    foods: ['Banana', 'Apple', 'Orange', 'Blueberries', 'Strawberries'],
-    color: '#9F7AEA'
-  },
-  legumes: {
-    name: 'Legumes',
-    foods: ['Black beans', 'Chickpeas', 'Lentils'],
-    color: '#ED8936'
-  },
-  nuts: {
-    name: 'Nuts & Seeds',
-    foods: ['Almonds', 'Peanut butter', 'Chia seeds'],
-    color: '#A0522D'
-  },
-  other: {
-    name: 'Other',
-    foods: ['Olive oil', 'Honey'],
-    color: '#A0AEC0'
-  }
+  proteins: { name: 'Proteins', color: '#F56565' },
+  dairy: { name: 'Dairy', color: '#4299E1' },
+  grains: { name: 'Grains', color: '#ECC94B' },
+  vegetables: { name: 'Vegetables', color: '#48BB78' },
+  fruits: { name: 'Fruits', color: '#9F7AEA' },
+  legumes: { name: 'Legumes', color: '#ED8936' },
+  nuts: { name: 'Nuts & Seeds', color: '#A0522D' },
+  other: { name: 'Other', color: '#A0AEC0' }
 };
 
 const CalorieEfficiencyChart = () => {
   const [foodData, setFoodData] = useState([]);
   const [activeGroups, setActiveGroups] = useState(Object.keys(FOOD_GROUPS));
+  const [groupCounts, setGroupCounts] = useState({});
   const chartRef = React.useRef(null);
 
   const resetZoom = () => {
@@ -79,16 +49,32 @@ const CalorieEfficiencyChart = () => {
   };
 
   useEffect(() => {
+    foodService.getFoodGroupSummary()
+      .then(summary => setGroupCounts(
+        Object.fromEntries(summary.map(group => [group.food_group, group.count]))
+      ))
+      .catch(error => console.error('Error fetching food groups:', error));
+  }, []);
+
+  // Only the active groups are fetched, already classified by the server
+  useEffect(() => {
+    if (activeGroups.length === 0) {
+      setFoodData([]);
+      return;
+    }
     const fetchData = async () => {
       try {
-        const response = await axios.get('http://localhost:8000/food-items');
-        setFoodData(response.data);
+        const columns = await foodService.getFoodColumns(
+          ['name', 'food_group', 'calories', 'price', 'protein', 'carbohydrates', 'fats'],
+          { food_group: activeGroups.join(',') }
+        );
+        setFoodData(columnsToRows(columns));
       } catch (error) {
         console.error('Error fetching food data:', error);
       }
     };
     fetchData();
-  }, []);
+  }, [activeGroups]);
 
   const toggleFoodGroup = (group) => {
     setActiveGroups(prev => {
@@ -99,22 +85,12 @@ const CalorieEfficiencyChart = () => {
     });
   };
 
-  const getFoodGroup = (foodName) => {
-    return Object.entries(FOOD_GROUPS).find(([_, group]) => 
-      group.foods.some(food => foodName.toLowerCase().includes(food.toLowerCase()))
-    )?.[0] || 'other';
-  };
-
-  const filteredFoodData = foodData.filter(food => 
-    activeGroups.includes(getFoodGroup(food.name))
-  );
-
   // Prepare data for the bubble plot
   const data = {
     datasets: [
       {
         label: 'Foods',
-        data: filteredFoodData.map(food => ({
+        data: foodData.map(food => ({
           x: food.calories, // Calories per 100g
           y: food.price, // Price per 100g
           r: Math.max(8, food.protein * 0.7), // Minimum bubble size of 8, then scales with protein
@@ -125,8 +101,8 @@ const CalorieEfficiencyChart = () => {
           price: food.price,
           calories: food.calories
         })),
-        backgroundColor: filteredFoodData.map(food => {
-          const group = FOOD_GROUPS[getFoodGroup(food.name)];
+        backgroundColor: foodData.map(food => {
+          const group = FOOD_GROUPS[food.food_group];
           return group ? group.color : '#A0AEC0';
         }),
       },
@@ -243,7 +219,7 @@ const CalorieEfficiencyChart = () => {
               }}
               onClick={() => toggleFoodGroup(key)}
             >
-              {group.name}
+              {group.name}{groupCounts[key] !== undefined ? ` (${groupCounts[key]})` : ''}
             </Button>
           </WrapItem>
         ))}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo, useCallback } from 'react';
+import React, { useState, useMemo, useCallback } from 'react';
 import {
   Box,
   VStack,
@@ -31,7 +31,7 @@ import {
   CircularProgressLabel,
   Tooltip,
 } from '@chakra-ui/react';
-import { Select } from 'chakra-react-select';
+import { AsyncSelect } from 'chakra-react-select';
 import { foodService, mealPlanService } from '../services/api';
 
 const MEAL_TYPES = ['Breakfast', 'Lunch', 'Dinner', 'Snack'];
@@ -119,7 +119,20 @@ const MacroSummary = React.memo(({ meals }) => {
   );
 });
 
-const MealSection = React.memo(({ mealType, foods, meals, onAddFood, onRemoveFood }) => {
+const toFoodOption = (food) => ({
+  value: food.id,
+  label: food.brand && food.brand !== 'Generic' ? `${food.name} (${food.brand})` : food.name,
+  food: food
+});
+
+// Ask the backend for matches instead of loading the whole catalog
+const loadFoodOptions = async (inputValue) => {
+  if (!inputValue.trim()) return [];
+  const foods = await foodService.searchFoods(inputValue);
+  return foods.map(toFoodOption);
+};
+
+const MealSection = React.memo(({ mealType, meals, onAddFood, onRemoveFood }) => {
   const [selectedFood, setSelectedFood] = useState(null);
   const [quantity, setQuantity] = useState(100);  // Default to 100g
 
@@ -128,15 +141,6 @@ const MealSection = React.memo(({ mealType, foods, meals, onAddFood, onRemoveFoo
     [meals, mealType]
   );
   
-  const foodOptions = useMemo(() => 
-    foods.map(food => ({
-      value: food.id,
-      label: food.brand && food.brand !== 'Generic' ? `${food.name} (${food.brand})` : food.name,
-      food: food
-    })),
-    [foods]
-  );
-
   const customStyles = useMemo(() => ({
     control: (provided) => ({
       ...provided,
@@ -175,30 +179,23 @@ const MealSection = React.memo(({ mealType, foods, meals, onAddFood, onRemoveFoo
     }
   }, [selectedFood, quantity, mealType, onAddFood]);
 
-  const filterOption = useCallback((option, inputValue) => {
-    if (!inputValue) return true;
-    const label = option.label.toLowerCase();
-    const search = inputValue.toLowerCase();
-    return label.includes(search);
-  }, []);
-
   return (
     <Box p={4} borderWidth={1} borderRadius="lg" bg="white">
       <Heading size="sm" mb={4}>{mealType}</Heading>
       <VStack spacing={4} align="stretch">
         <HStack>
           <Box flex="1">
-            <Select
+            <AsyncSelect
               placeholder="Search foods..."
               value={selectedFood}
               onChange={setSelectedFood}
-              options={foodOptions}
+              loadOptions={loadFoodOptions}
+              cacheOptions
               isClearable
               isSearchable={true}
-              openMenuOnFocus={true}
               chakraStyles={customStyles}
-              noOptionsMessage={() => "No foods found"}
-              filterOption={filterOption}
+              noOptionsMessage={({ inputValue }) => inputValue ? "No foods found" : "Type to search foods"}
+              filterOption={null}
             />
           </Box>
           <NumberInput
@@ -261,33 +258,11 @@ const MealSection = React.memo(({ mealType, foods, meals, onAddFood, onRemoveFoo
 });
 
 const MealPlanner = () => {
-  const [foods, setFoods] = useState([]);
   const [meals, setMeals] = useState([]);
   const [planName, setPlanName] = useState('');
   const [isLoading, setIsLoading] = useState(false);
   const toast = useToast();
 
-  useEffect(() => {
-    const fetchFoods = async () => {
-      try {
-        setIsLoading(true);
-        const data = await foodService.getAllFoods();
-        setFoods(data);
-      } catch (error) {
-        toast({
-          title: 'Error fetching foods',
-          description: error.message,
-          status: 'error',
-          duration: 3000,
-        });
-      } finally {
-        setIsLoading(false);
-      }
-    };
-
-    fetchFoods();
-  }, [toast]);
-
   const handleAddFood = useCallback((food) => {
     setMeals(prevMeals => [...prevMeals, food]);
   }, []);
@@ -362,7 +337,6 @@ const MealPlanner = () => {
         <MealSection
           key={mealType}
           mealType={mealType}
-          foods={foods}
           meals={meals}
           onAddFood={handleAddFood}
           onRemoveFood={handleRemoveFood}
@@ -10,22 +10,58 @@ const apiClient = axios.create({
   },
 });
 
-// Add response interceptor for error handling
+// Add response interceptor for error handling; requests made with
+// withHeaders get the whole response (for pagination headers)
 apiClient.interceptors.response.use(
-  (response) => response.data,
+  (response) => (response.config.withHeaders ? response : response.data),
   (error) => {
     const message = error.response?.data?.detail || error.message || 'An error occurred';
     return Promise.reject({ message });
   }
 );
 
+// Turn a columnar response ({field: [values...]}) back into row objects
+export const columnsToRows = (columns) => {
+  const fields = Object.keys(columns);
+  const count = fields.length ? columns[fields[0]].length : 0;
+  return Array.from({ length: count }, (_, i) =>
+    Object.fromEntries(fields.map(field => [field, columns[field][i]]))
+  );
+};
+
+// Most rows the API returns per page
+const PAGE_SIZE = 1000;
+
 // Food items related API calls
 export const foodService = {
   getAllFoods: () => apiClient.get('/food-items'),
+  searchFoods: (q, limit = 20) => apiClient.get('/food-items/search', { params: { q, limit } }),
+  // Only the listed fields, one array per field; much smaller than full objects.
+  // Follows X-Next-Cursor, so every matching food is included, not just a page
+  getFoodColumns: async (fields, filters = {}) => {
+    const columns = Object.fromEntries(fields.map(field => [field, []]));
+    let cursor;
+    do {
+      const response = await apiClient.get('/food-items', {
+        params: { ...filters, format: 'columnar', fields: fields.join(','), limit: PAGE_SIZE, cursor },
+        withHeaders: true,
+      });
+      fields.forEach(field => columns[field].push(...response.data[field]));
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return columns;
+  },
+  getFoodGroupSummary: (filters = {}) => apiClient.get('/food-items/groups/summary', { params: filters }),
   getFoodById: (id) => apiClient.get(`/food-items/${id}`),
   createFood: (data) => apiClient.post('/food-items', data),
   updateFood: (id, data) => apiClient.put(`/food-items/${id}`, data),
+  patchFood: (id, changes) => apiClient.patch(`/food-items/${id}`, changes),
   deleteFood: (id) => apiClient.delete(`/food-items/${id}`),
+  // Bulk variants take ids and/or the list filters; at least one is required
+  patchFoods: (changes, { ids, ...filters } = {}) =>
+    apiClient.patch('/food-items/', { ids, changes }, { params: filters }),
+  deleteFoods: ({ ids, ...filters } = {}) =>
+    apiClient.delete('/food-items/', { data: ids ? { ids } : undefined, params: filters }),
 };
 
 // Meal plans related API calls